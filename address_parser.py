@@ -0,0 +1,122 @@
+"""
+Rule-based address parser for Kiwi Cabs AI IVR
+Turns a well-formed spoken address ("63 hobart st miramar", "flat 2 slash 55
+melrose road") into the same clean/full strings the LLM parser produces, by
+tokenising unit, number, street, street type and suburb and checking them
+against the gazetteer's street/suburb lists. Callers only need the LLM when
+the confidence here is low.
+"""
+
+import os
+import re
+import threading
+
+import gazetteer
+import street_matcher
+from shared_cache import canonicalize_query
+
+# Below this parse_address falls back to the LLM
+ADDRESS_PARSER_CONFIDENCE = float(os.getenv("ADDRESS_PARSER_CONFIDENCE", "0.85"))
+
+# A street and suburb we both recognise, but never seen together
+_UNLISTED_PAIR_PENALTY = 0.9
+# A fuzzy-corrected name may be the wrong street - keep it below the threshold
+_FUZZY_PENALTY = 0.8
+
+_NUMBER_RE = re.compile(
+    r"^(?:(?:unit|flat|apartment)\s+(?P<unit_word>\w+)\s+(?:at\s+)?|(?P<unit>\w+)/)?"
+    r"(?P<number>\d+)(?P<suffix>[a-z])?$"
+)
+
+_lock = threading.Lock()
+_street_suburbs = None
+
+
+def _get_street_suburbs():
+    """canonical street name -> set of suburbs it's listed in"""
+    global _street_suburbs
+    if _street_suburbs is not None:
+        return _street_suburbs
+    with _lock:
+        if _street_suburbs is None:
+            street_suburbs = {}
+            for street, suburb in gazetteer.known_names(gazetteer.KIND_STREET):
+                street_suburbs.setdefault(canonicalize_query(street), set()).add(suburb)
+            _street_suburbs = street_suburbs
+    return _street_suburbs
+
+
+def _format_house(number_text):
+    """'unit 2 at 55' / '2/55' / '12a' → '2/55' / '2/55' / '12A', or None"""
+    match = _NUMBER_RE.match(number_text or "")
+    if not match:
+        return None
+    house = match.group("number") + (match.group("suffix") or "").upper()
+    unit = match.group("unit_word") or match.group("unit")
+    return f"{unit.upper()}/{house}" if unit else house
+
+
+def parse_address_local(text):
+    """
+    Parse a street address without the LLM.
+
+    Returns a dict with "clean_address" ("2/55 Melrose Road, Melrose"),
+    "full_address" ("2/55 Melrose Road, Melrose, Wellington 6023, New Zealand"),
+    the parsed "house", "street", "street_type", "suburb", "city", "postcode",
+    the street-corrected "corrected_text", "exact" when the street (and
+    suburb) were said as listed, and a "confidence" in 0-1. Only an exact
+    parse should skip the LLM. A result with confidence 0 still carries
+    corrected_text for the LLM to work from.
+    """
+    correction = street_matcher.correct_address(text)
+    result = {
+        "clean_address": None,
+        "full_address": None,
+        "house": None,
+        "street": correction["street"],
+        "street_type": None,
+        "suburb": correction["suburb"],
+        "city": None,
+        "postcode": None,
+        "corrected_text": correction["text"],
+        "exact": correction["exact"],
+        "confidence": 0.0,
+    }
+
+    house = _format_house(correction["number"])
+    # Against the seed list alone, a near miss may be a real street we don't have
+    street = correction["street"] if correction["exact"] or gazetteer.street_list_complete() else None
+    if not house or not street:
+        # No house number means it's not an exact address - let the LLM/Google decide
+        return result
+
+    listed_suburbs = _get_street_suburbs().get(canonicalize_query(street), set())
+    suburb = correction["suburb"]
+    confidence = correction["confidence"]
+    if not correction["exact"]:
+        confidence *= _FUZZY_PENALTY
+    if not suburb:
+        # Only a complete street list can say a street is in just one suburb
+        if len(listed_suburbs) != 1 or not gazetteer.street_list_complete():
+            return result
+        suburb = next(iter(listed_suburbs))
+    elif suburb not in listed_suburbs:
+        confidence *= _UNLISTED_PAIR_PENALTY
+
+    info = gazetteer.suburb_info(suburb)
+    if not info:
+        return result
+    suburb, city, postcode = info
+
+    city_part = f"{city} {postcode}" if postcode else city
+    result.update(
+        clean_address=f"{house} {street}, {suburb}",
+        full_address=f"{house} {street}, {suburb}, {city_part}, New Zealand",
+        house=house,
+        street_type=street.split()[-1] if street.split()[-1].lower() in street_matcher.STREET_TYPES else None,
+        suburb=suburb,
+        city=city,
+        postcode=postcode or None,
+        confidence=round(confidence, 3),
+    )
+    return result
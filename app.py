@@ -7,15 +7,32 @@ from flask import Flask, request, Response, jsonify, redirect
 from datetime import datetime, timedelta
 import re
 import urllib.parse
+from xml.sax.saxutils import escape
 import time
 import base64
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, TimeoutError as FuturesTimeout
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import googlemaps
-from googlemaps.convert import decode_polyline
+from array import array
 import pytz
 from zoneinfo import ZoneInfo
+from shared_cache import cache_get, cache_set, cache_stats, canonicalize_query
+from single_flight import single_flight, single_flight_stats
+from rate_limiter import rate_limited_call, background_priority, with_current_priority, usage_stats
+import gazetteer
+import eta_estimator
+from route_geometry import (
+    decode_polyline_flat, simplify_route, pack_route, unpack_route, point_count, point_at
+)
+import street_matcher
+import address_parser
+import intent_classifier
+import turn_extractor
+import speech_tokenizer
+from llm_client import chat_completion, stream_chat_completion, llm_stats, LLM_SMALL_MODEL, LLM_LARGE_MODEL
+from model_tiers import run_tiers, model_tier_stats
 
 # New Zealand timezone
 NZ_TZ = pytz.timezone('Pacific/Auckland')
@@ -53,10 +70,177 @@ if GOOGLE_MAPS_API_KEY:
 else:
     print("⚠️ Google Maps API key not configured")
 
-def validate_and_format_address(address, address_type="general"):
-    """Validate and format address using Google Maps"""
-    if not gmaps:
-        return address
+# Geocode results barely change, so keep them for a long time across all workers
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+# LLM address parses: long-lived, but shorter than geocodes in case the prompt changes
+PARSE_ADDRESS_CACHE_TTL = int(os.getenv("PARSE_ADDRESS_CACHE_TTL", str(7 * 24 * 3600)))
+# Rejected (non-exact) addresses are only remembered for the length of a call or two
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", "900"))
+
+
+def geocode_address(search_address, cached_only=False):
+    """Geocode via the offline gazetteer, then the shared cache, only calling Google on a miss
+    (never with cached_only - for when there's no time left to wait on Google)"""
+    local_result = gazetteer.lookup(search_address)
+    if local_result:
+        print(f"⚡ Gazetteer hit: {search_address} → {local_result['formatted_address']}")
+        return [local_result]
+
+    cache_key = canonicalize_query(search_address)
+    cached = cache_get("geocode", cache_key)
+    if cached is not None:
+        print(f"⚡ Geocode cache hit: {search_address}")
+        return cached
+
+    if not gmaps or cached_only:
+        return []
+
+    # Identical lookups already in flight on another thread share that call
+    return single_flight(("geocode", cache_key), _geocode_with_google, search_address, cache_key)
+
+
+def _geocode_with_google(search_address, cache_key):
+    results = rate_limited_call("geocode", gmaps.geocode, search_address, region="nz")
+    if results:
+        # Only the top few candidates are ever looked at
+        cache_set("geocode", cache_key, results[:5], GEOCODE_CACHE_TTL)
+    return results
+
+
+def coords_to_lat_lng(coords):
+    """(lat, lng) for TaxiCaller-style coords, or (None, None) when unknown"""
+    if not coords or list(coords) == [0, 0]:
+        return None, None
+    return coords[1] / 1000000, coords[0] / 1000000
+
+
+def coords_from_lat_lng(lat, lng):
+    """TaxiCaller-style [lng*1e6, lat*1e6] coords from stored lat/lng, or None"""
+    if lat is None or lng is None:
+        return None
+    return [int(round(lng * 1000000)), int(round(lat * 1000000))]
+
+
+def address_suggestions(text, results=None, limit=2):
+    """Exact addresses near a rejected query that the re-prompt can offer"""
+    suggestions = []
+    for result in (results or [])[1:]:
+        if is_exact_address(result):
+            suggestions.append(clean_address_for_speech(result["formatted_address"]))
+
+    # The street matcher may know which street they were after even without a number
+    correction = street_matcher.correct_address(text)
+    if correction["street"] and correction["confidence"] >= street_matcher.STREET_MATCH_CONFIDENCE:
+        local_result = gazetteer.lookup(correction["text"])
+        if local_result:
+            suggestions.append(clean_address_for_speech(local_result["formatted_address"]))
+        else:
+            suggestions.append(correction["text"])
+
+    unique = []
+    for suggestion in suggestions:
+        if suggestion and suggestion.lower() not in (u.lower() for u in unique):
+            unique.append(suggestion)
+    return unique[:limit]
+
+
+def rejected_address(text):
+    """The cached rejection for text ({"suggestions": [...]}), or None if it wasn't rejected"""
+    return cache_get("rejected_address", canonicalize_query(text))
+
+
+def remember_rejected_address(text, results=None, resolved_query=None):
+    """Negative-cache text as not exact and return the suggestions to offer the caller
+
+    resolved_query is the cleaned-up address that actually failed validation, so
+    the raw utterance inherits the suggestions already worked out for it.
+    """
+    suggestions = []
+    if resolved_query:
+        earlier = rejected_address(resolved_query)
+        if earlier:
+            suggestions = earlier.get("suggestions", [])
+    for suggestion in address_suggestions(text, results):
+        if suggestion not in suggestions:
+            suggestions.append(suggestion)
+    suggestions = suggestions[:2]
+
+    cache_set("rejected_address", canonicalize_query(text), {"suggestions": suggestions}, NEGATIVE_CACHE_TTL)
+    print(f"🚫 Remembered rejected address: {text} (suggestions: {suggestions})")
+    return suggestions
+
+
+def address_reprompt_response(question, action, suggestions=None, redirect_url=None):
+    """TwiML asking for an address again, offering any suggestions first
+
+    The suggestions are kept in the call's session so a "yes" or "the first
+    one" on the next turn picks one (see offered_address_choice).
+    """
+    offer = ""
+    if suggestions:
+        offer = f"Did you mean {' or '.join(escape(s) for s in suggestions)}? "
+    call_sid = request.form.get("CallSid", "")
+    if call_sid:
+        user_sessions.setdefault(call_sid, {})["offered_addresses"] = list(suggestions or [])
+    redirect_xml = f"\n    <Redirect>{redirect_url}</Redirect>" if redirect_url else ""
+    response = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        Sorry, Address not recognized. {offer}{question}
+    </Say>
+    <Gather input="speech" action="{action}" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">I am listening.</Say>
+    </Gather>{redirect_xml}
+</Response>"""
+    return Response(response, mimetype="text/xml")
+
+
+_OFFER_ORDINALS = [
+    (re.compile(r"\b(?:first|1st|number one|former)\b"), 0),
+    (re.compile(r"\b(?:second|2nd|number two|latter|last one|other one)\b"), 1),
+]
+_OFFER_ACCEPTED = re.compile(r"^(?:yes|yeah|yep|yup|sure|correct|that'?s (?:it|right|the one))\b")
+
+
+def offered_address_choice(session, speech_text):
+    """The suggestion a "yes" / "the first one" picks from the last re-prompt, or None
+
+    Offers only last one turn - whatever the caller says, they're cleared.
+    """
+    offered = session.pop("offered_addresses", None)
+    if not offered:
+        return None
+    text = (speech_text or "").lower().strip()
+    choice = None
+    for pattern, index in _OFFER_ORDINALS:
+        if pattern.search(text) and index < len(offered):
+            choice = offered[index]
+            break
+    # A bare yes is only an answer when one address was offered
+    if choice is None and len(offered) == 1 and _OFFER_ACCEPTED.match(text):
+        choice = offered[0]
+    if choice:
+        print(f"✅ Caller chose offered address: '{speech_text}' → {choice}")
+    return choice
+
+
+def coords_from_geocode_result(result):
+    """Pull TaxiCaller-style [lng*1e6, lat*1e6] coords out of a geocode result"""
+    try:
+        location = result["geometry"]["location"]
+        return [int(location["lng"] * 1000000), int(location["lat"] * 1000000)]
+    except (KeyError, TypeError):
+        return None
+
+
+def validate_and_format_address(address, address_type="general", with_coords=False):
+    """Validate and format address using Google Maps
+
+    With with_coords=True returns (formatted_address, coords) so the dialog can
+    keep the geometry for the TaxiCaller payload; coords is None when unknown.
+    """
+    if not gmaps and not gazetteer.gazetteer_available():
+        return (address, None) if with_coords else address
     
     try:
         # Add Wellington context if not present
@@ -64,13 +248,18 @@ def validate_and_format_address(address, address_type="general"):
             search_address = f"{address}, Wellington, New Zealand"
         else:
             search_address = address
+
+        if rejected_address(search_address) is not None:
+            print(f"⚡ Negative cache hit: {search_address}")
+            return False
         
         # Use Google Geocoding
-        results = gmaps.geocode(search_address, region="nz")
+        results = geocode_address(search_address)
 
         print(f"🔍 Google Maps results: {results}")
 
         if(is_exact_address(results[0]) == False):
+            remember_rejected_address(search_address, results)
             return False
         
         if results:
@@ -79,13 +268,15 @@ def validate_and_format_address(address, address_type="general"):
             formatted_address = result['formatted_address']
             
             print(f"formatted address:::::: {formatted_address}")
+            if with_coords:
+                return formatted_address, coords_from_geocode_result(result)
             return formatted_address
         else:
-            return address
+            return (address, None) if with_coords else address
             
     except Exception as e:
         print(f"❌ Google Maps error: {e}")
-        return address
+        return (address, None) if with_coords else address
 
 # Configuration - STEP 1: Environment Variables (with fallback to your key)
 TAXICALLER_BASE_URL = "https://api.taxicaller.net/api/v1"
@@ -103,6 +294,25 @@ TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
 # JWT Token Cache (legacy - keeping for compatibility)
 TAXICALLER_JWT_CACHE = {"token": None, "expires_at": 0}
 
+# Shared pool for blocking Google/OpenAI lookups that can run side by side
+# (two address resolvers per pickup/destination turn, geocode prefetches)
+LOOKUP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LOOKUP_POOL_SIZE", "16")), thread_name_prefix="lookup"
+)
+# resolve_spoken_address submits to LOOKUP_EXECUTOR and waits, so running it
+# there too would let busy calls fill the pool with tasks waiting on tasks
+# queued behind them. Multi-slot turns resolve their addresses on this pool.
+ADDRESS_TURN_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ADDRESS_TURN_POOL_SIZE", "8")), thread_name_prefix="address-turn"
+)
+# Dispatch's trip lookup and fallback geocodes get their own pool, so slow
+# address turns filling LOOKUP_EXECUTOR can't push bookings onto fallback coords
+DISPATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DISPATCH_POOL_SIZE", "8")), thread_name_prefix="dispatch"
+)
+# How long confirm_booking will wait on geocode/directions before using fallbacks
+DISPATCH_LOOKUP_DEADLINE = float(os.getenv("DISPATCH_LOOKUP_DEADLINE", "4"))
+
 # Session memory stores
 user_sessions = {}
 modification_bookings = {}
@@ -171,6 +381,10 @@ def init_db():
             """
             )
 
+            # Geocoded ends of the trip, so repeat callers can rebook without new lookups
+            for column in ("pickup_lat", "pickup_lng", "dropoff_lat", "dropoff_lng"):
+                cur.execute(f"ALTER TABLE bookings ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION")
+
             # Conversation history table
             cur.execute(
                 """
@@ -196,6 +410,8 @@ def init_db():
 
 # Run this once when app starts
 init_db()
+# Fit the local ETA fallback to the routes Google has already given us
+threading.Thread(target=eta_estimator.calibrate, daemon=True).start()
 
 
 def init_google_speech():
@@ -442,9 +658,71 @@ def is_exact_address(result):
     return False
 
 def parse_address(address: str):
-    import openai
-    openai.api_key = OPENAI_API_KEY
-    
+    # Local fast paths: fix misheard street/suburb names, then take an exact
+    # gazetteer hit or a confident rule-based parse and skip the LLM entirely
+    local = address_parser.parse_address_local(address)
+    parsed = _parse_address_locally(address, local)
+    if parsed:
+        return parsed
+
+    # Still hand the LLM the corrected spelling
+    address = local["corrected_text"]
+
+    # The LLM runs at temperature 0, so the same words always parse the same way
+    cached = cache_get("parse_address", canonicalize_query(address))
+    if cached is not None:
+        print(f"⚡ parse_address cache hit: '{address}' → {cached[0]}")
+        return cached[0], cached[1]
+
+    return _parse_address_with_model(address, LLM_SMALL_MODEL)
+
+
+def _parse_address_locally(address, local):
+    """(clean_address, full_address) from the gazetteer or an exact rule-based parse, else None.
+    A fuzzy-corrected street might be the wrong one, so it always goes to the model."""
+    local_result = gazetteer.lookup(local["corrected_text"] if local["exact"] else address)
+    if local_result and is_exact_address(local_result):
+        full_address = local_result["formatted_address"]
+        clean_address = clean_address_for_speech(full_address)
+        print(f"⚡ Local address parse: '{address}' → {clean_address}")
+        return clean_address, full_address
+
+    if local["exact"] and local["confidence"] >= address_parser.ADDRESS_PARSER_CONFIDENCE:
+        print(f"⚡ Rule-based address parse: '{address}' → {local['clean_address']} (confidence {local['confidence']})")
+        return normalize_unit_slash_address(local["clean_address"]), local["full_address"]
+    return None
+
+
+def _parse_address_with_model(address, model, deadline=None):
+    """LLM parse of (already corrected) address with one model, cached with the model that made it"""
+    cache_key = canonicalize_query(address)
+    # Concurrent callers saying the same thing share one LLM call, and its
+    # full_address starts geocoding before the reply has finished streaming
+    clean_address, full_address = single_flight(
+        ("parse_address", cache_key, model), _parse_address_with_llm, address,
+        model=model, on_full_address=prefetch_address_geocode, deadline=deadline,
+    )
+    if clean_address and full_address:
+        cache_set("parse_address", cache_key, [clean_address, full_address, model], PARSE_ADDRESS_CACHE_TTL)
+    return clean_address, full_address
+
+
+def prefetch_address_geocode(address):
+    """Start geocoding address in the background
+
+    Uses the same query validate_and_format_address and
+    resolve_wellington_poi_to_address build, so when they get there they join
+    the in-flight lookup (single flight) or hit the cache it filled.
+    """
+    search_address = address if "wellington" in address.lower() else f"{address}, Wellington, New Zealand"
+    try:
+        LOOKUP_EXECUTOR.submit(with_current_priority(geocode_address), search_address)
+        print(f"⚡ Prefetching geocode: {search_address}")
+    except RuntimeError as e:
+        print(f"⚠️ Geocode prefetch not started: {e}")
+
+
+def _parse_address_with_llm(address: str, model=LLM_SMALL_MODEL, on_full_address=None, deadline=None):
     prompt = f"""
 You are an expert Wellington, New Zealand taxi dispatcher AI.
 Your job is to clean, correct, and standardize customer-provided addresses.
@@ -454,8 +732,8 @@ RULES:
 - If the suburb/street is misspelled or unclear, correct it to the closest valid Wellington suburb/street/landmark.
   Example: "Belrose" → "Melrose", "Mirmar" → "Miramar".
 - Output two strings only:
-  1. "clean_address": just house/flat number, street, suburb (no postcode, city, country).
-  2. "full_address": corrected, complete official format including postcode, Wellington, New Zealand.
+  1. "full_address": corrected, complete official format including postcode, Wellington, New Zealand.
+  2. "clean_address": just house/flat number, street, suburb (no postcode, city, country).
 - Recognize flats/apartments:
   Example: "flat2 slash 55 melrose road melrose" → clean_address: "2/55 Melrose Road, Melrose".
 - Recognize landmarks/POIs:
@@ -464,34 +742,40 @@ RULES:
 
 EXAMPLES:
 Input: "63 hobart st miramar"
-→ clean_address: "63 Hobart Street, Miramar"
 → full_address: "63 Hobart Street, Miramar, Wellington 6022, New Zealand"
+→ clean_address: "63 Hobart Street, Miramar"
 
 Input: "flat2 slash 55 belrose road melrose"
-→ clean_address: "2/55 Melrose Road, Melrose"
 → full_address: "2/55 Melrose Road, Melrose, Wellington 6023, New Zealand"
+→ clean_address: "2/55 Melrose Road, Melrose"
 
 Input: "wellington airport"
-→ clean_address: "Wellington Airport, Rongotai"
 → full_address: "Wellington International Airport, Stewart Duff Drive, Rongotai, Wellington 6022, New Zealand"
+→ clean_address: "Wellington Airport, Rongotai"
 
 CUSTOMER SAID: "{address}"
 
 Respond ONLY with the two strings in this format:
-clean_address: ...
 full_address: ...
+clean_address: ...
 """
 
-    response = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[
+    def on_line(line):
+        match = re.search(r'full_address:\s*"(.*?)"', line)
+        if match and on_full_address:
+            on_full_address(match.group(1))
+
+    output = stream_chat_completion(
+        [
             {"role": "system", "content": "You are an NZ address parser and formatter."},
             {"role": "user", "content": prompt}
         ],
+        model=model,
+        purpose="parse_address",
+        on_line=on_line,
+        deadline=deadline,
         temperature=0
     )
-
-    output = response.choices[0].message.content.strip()
     print(f"gpt result address for output: {output}")
 
     # Split into two variables
@@ -627,8 +911,8 @@ def format_time_for_speech(time_str):
         return time_str
 
 def resolve_wellington_poi_to_address(place_name):
-    """Convert Wellington POI names to exact addresses using Google Maps"""
-    if not gmaps:
+    """Convert Wellington POI names to exact addresses using the gazetteer or Google Maps"""
+    if not gmaps and not gazetteer.gazetteer_available():
         return place_name
     
     try:
@@ -674,11 +958,16 @@ def resolve_wellington_poi_to_address(place_name):
         else:
             search_address = place_name
 
-        geocode_result = gmaps.geocode(search_address, region="nz")
+        if rejected_address(search_address) is not None:
+            print(f"⚡ Negative cache hit: {search_address}")
+            return False
+
+        geocode_result = geocode_address(search_address)
 
         print(f"geocode result:{geocode_result}")
 
         if(is_exact_address(geocode_result[0]) == False):
+            remember_rejected_address(search_address, geocode_result)
             return False
 
         if geocode_result:
@@ -689,7 +978,8 @@ def resolve_wellington_poi_to_address(place_name):
                 "full_address": address,
                 "poi_name": place_name,
                 "clean_address": clean_address,
-                "speech": f"{place_name} at {clean_address}"
+                "speech": f"{place_name} at {clean_address}",
+                "coords": coords_from_geocode_result(geocode_result[0])
             }
             
         print(f"❌ Could not resolve: {place_name}")
@@ -709,25 +999,136 @@ def resolve_wellington_poi_to_address(place_name):
             "speech": place_name
         }
 
+
+# Longest the pickup/destination turn may spend resolving an address before
+# re-prompting - Twilio gives up on the webhook at 15s
+ADDRESS_TURN_DEADLINE = float(os.getenv("ADDRESS_TURN_DEADLINE", "7"))
+
+
+def _resolve_direct(utterance):
+    """Racer 1: geocode the words as heard - fine when they're already a clean address"""
+    search_address = utterance if "wellington" in utterance.lower() else f"{utterance}, Wellington, New Zealand"
+    if rejected_address(search_address) is not None:
+        return None
+    results = geocode_address(search_address)
+    # partial_match means Google guessed at misheard words - leave those to the parser
+    if results and is_exact_address(results[0]) and not results[0].get("partial_match"):
+        full_address = results[0]["formatted_address"]
+        return {
+            "clean_address": clean_address_for_speech(full_address),
+            "full_address": full_address,
+            "coords": coords_from_geocode_result(results[0]),
+        }
+    return None
+
+
+def _resolve_via_parser(utterance, address_type, deadline=None):
+    """Racer 2: clean the words up, then validate the result
+
+    Cheapest first - cached parse, local parser, small model - and the larger
+    model only when nothing cheaper gives an address that validates. No tier
+    starts, and no LLM call runs on, past deadline (a time.time() value), so
+    a racer the turn has given up on frees its worker.
+    """
+    local = address_parser.parse_address_local(utterance)
+    corrected = local["corrected_text"]
+    cached = cache_get("parse_address", canonicalize_query(corrected))
+    # Entries from before tiering were all made by the small model
+    cached_model = (cached[2] if len(cached) > 2 else LLM_SMALL_MODEL) if cached else None
+    rejected = []
+
+    def validate(parsed):
+        clean_address, full_address = parsed
+        print(f"📍 Parsed {address_type} - Clean: {clean_address}, Full: {full_address}")
+        address_to_validate = full_address if full_address else utterance
+        validated = validate_and_format_address(address_to_validate, address_type, with_coords=True)
+        if not validated:
+            rejected.append(address_to_validate)
+            return None
+        formatted_address, coords = validated
+        return {
+            "clean_address": clean_address if clean_address else clean_address_for_speech(formatted_address),
+            "full_address": formatted_address,
+            "coords": coords,
+        }
+
+    def model_tier(model):
+        # No point asking a model again for the answer that's already cached
+        return lambda: None if cached_model == model else _parse_address_with_model(corrected, model, deadline)
+
+    tier, result = run_tiers("address", [
+        ("cache", lambda: cached and (cached[0], cached[1])),
+        ("local", lambda: _parse_address_locally(utterance, local)),
+        ("small_model", model_tier(LLM_SMALL_MODEL)),
+        ("large_model", model_tier(LLM_LARGE_MODEL)),
+    ], validate, deadline)
+    if result:
+        return result
+    if rejected:
+        return {"rejected": rejected[-1]}
+    raise RuntimeError(f"no address tier could parse '{utterance}'")
+
+
+def resolve_spoken_address(utterance, address_type="general", deadline=None):
+    """
+    Resolve a spoken pickup/destination within one turn's latency budget.
+
+    A direct geocode of the utterance races parse_address + validation; the
+    first exact address wins. Returns a dict whose "status" is "exact" (with
+    clean_address, full_address, coords), "rejected" (with the
+    "resolved_query" that failed, if any), "timeout" or "error" - the parser
+    failed outright (e.g. an LLM outage) and the direct geocode had nothing
+    exact, so the caller should use its own fallback rather than re-prompt.
+    """
+    deadline = ADDRESS_TURN_DEADLINE if deadline is None else deadline
+    started = time.time()
+    futures = {
+        LOOKUP_EXECUTOR.submit(with_current_priority(_resolve_direct), utterance): "geocode",
+        LOOKUP_EXECUTOR.submit(
+            with_current_priority(_resolve_via_parser), utterance, address_type, started + deadline
+        ): "parser",
+    }
+
+    resolved_query = None
+    failed = set()
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"⚠️ {futures[future]} address resolver error: {e}")
+                failed.add(futures[future])
+                continue
+            if result and "full_address" in result:
+                print(f"🏁 {address_type} resolved by {futures[future]} in {time.time() - started:.2f}s: {result['full_address']}")
+                return {"status": "exact", **result}
+            if result and result.get("rejected"):
+                resolved_query = result["rejected"]
+    except FuturesTimeout:
+        print(f"⚠️ {address_type} resolution missed the {deadline}s turn deadline")
+        return {"status": "timeout"}
+
+    if "parser" in failed:
+        return {"status": "error"}
+    return {"status": "rejected", "resolved_query": resolved_query}
+
 def extract_time_with_ai(speech_text):
     """Extract time information from speech using the same logic as booking creation"""
     try:
         # Use the same time processing logic as in the booking creation flow
-        time_text = speech_text.lower().strip()
         result = {}
 
+        # Parse time using existing logic (same as booking creation)
+        print(f"📝 Time modification - parsing speech: {speech_text}")
+        parsed_booking = extract_booking_time(speech_text)
+        print(f"📝 Time modification - parsed result: {parsed_booking}")
+
         # Check for immediate booking (same as booking creation)
-        immediate_keywords = ["no", "now", "right now", "immediately", "asap", "as soon as possible", "straight away"]
-        if any(keyword in time_text for keyword in immediate_keywords):
+        if parsed_booking.get("pickup_time") == "ASAP":
             result["pickup_time"] = "ASAP"
-            result["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+            result["pickup_date"] = parsed_booking["pickup_date"]
             return result
         else:
-            # Parse time using existing logic (same as booking creation)
-            print(f"📝 Time modification - parsing speech: {speech_text}")
-            parsed_booking = parse_booking_speech(speech_text)
-            print(f"📝 Time modification - parsed result: {parsed_booking}")
-
             if parsed_booking and parsed_booking.get("pickup_time"):
                 result["pickup_time"] = parsed_booking["pickup_time"]
 
@@ -754,15 +1155,39 @@ def extract_time_with_ai(speech_text):
         print(f"❌ Error extracting time with AI: {e}")
         return None
 
-def extract_modification_intent_with_ai(speech_text, current_booking):
-    """Use OpenAI to understand modification requests naturally with Wellington POI knowledge"""
-    
-    if not OPENAI_API_KEY:
-        print("⚠️ No OpenAI API key - falling back to basic parsing")
-        return None
-    
+def log_modification_intent(caller_number, speech_text, result, source):
+    """Keep the labelled utterance so the local intent classifier can be retrained"""
+    conn = get_db_connection()
+    if not conn:
+        return
     try:
-        prompt = f"""You are a Wellington, New Zealand taxi dispatcher AI with comprehensive local knowledge.
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO conversations (phone_number, message, role) VALUES (%s, %s, %s)",
+            (caller_number or "", json.dumps({
+                "text": speech_text,
+                "intent": result.get("intent"),
+                "new_value": result.get("new_value"),
+                "confidence": result.get("confidence"),
+                "source": source,
+            }), "intent"),
+        )
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        print(f"❌ Error logging modification intent: {e}")
+    finally:
+        conn.close()
+
+
+def extract_modification_intent_with_ai(speech_text, current_booking, caller_number=None):
+    """Understand a modification request: local classifier, then the small model, then the large one"""
+
+    # Most requests are "change the time to 5" / "cancel it" - no LLM needed
+    local = intent_classifier.classify(speech_text)
+    print(f"⚡ Local intent: '{speech_text}' → {local}")
+
+    prompt = f"""You are a Wellington, New Zealand taxi dispatcher AI with comprehensive local knowledge.
 
 CURRENT BOOKING:
 - Pickup: {current_booking.get('pickup_address', 'Unknown')}
@@ -789,36 +1214,122 @@ Examples:
 "go to Weta Cave instead" → {{"intent": "change_destination", "new_value": "Weta Cave", "confidence": 0.92}}
 "pick me up from James Cook Hotel" → {{"intent": "change_pickup", "new_value": "James Cook Hotel", "confidence": 0.90}}"""
 
-        import openai
-        openai.api_key = OPENAI_API_KEY
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+    def ask(model):
+        ai_response = chat_completion(
+            [{"role": "user", "content": prompt}],
+            model=model,
+            purpose="modification_intent",
+            response_format={"type": "json_object"},
             max_tokens=150,
             temperature=0.1
         )
-        
-        ai_response = response.choices[0].message.content.strip()
-        print(f"🤖 AI PARSED: {ai_response}")
-        
-        import json
-        return json.loads(ai_response)
-        
-    except Exception as e:
-        print(f"❌ AI parsing error: {e}")
+        print(f"🤖 AI PARSED ({model}): {ai_response}")
+        return ai_response
+
+    def validate(answer):
+        if isinstance(answer, dict):
+            return answer
+        try:
+            result = json.loads(answer)
+        except ValueError:
+            print(f"❌ AI parsing error: not JSON: {answer}")
+            return None
+        if not isinstance(result, dict) or result.get("intent") not in intent_classifier.INTENTS:
+            print(f"❌ AI parsing error: unexpected reply: {result}")
+            return None
+        return result
+
+    tiers = [("local", lambda: local if local["confidence"] >= intent_classifier.INTENT_CONFIDENCE else None)]
+    if OPENAI_API_KEY:
+        tiers += [("small_model", lambda: ask(LLM_SMALL_MODEL)), ("large_model", lambda: ask(LLM_LARGE_MODEL))]
+    else:
+        print("⚠️ No OpenAI API key - using the local intent classifier")
+
+    tier, result = run_tiers("modification_intent", tiers, validate)
+    if result is None:
+        # A guess below INTENT_CONFIDENCE isn't acted on - the menu asks again
+        print(f"⚠️ Modification intent unresolved (local guess {local['intent']} at {local['confidence']})")
         return None
+    log_modification_intent(caller_number, speech_text, result, local["source"] if tier == "local" else "llm")
+    return result
+
+
+# Repeat trips (CBD → airport) reuse the last route for the same part of the week.
+# Endpoints are snapped to a grid so neighbouring doors share one entry.
+ROUTE_CACHE_TTL = int(os.getenv("ROUTE_CACHE_TTL", str(7 * 24 * 3600)))
+ROUTE_GRID_DEGREES = float(os.getenv("ROUTE_GRID_DEGREES", "0.001"))
 
 
-def get_route_distance_and_duration(pickup_address, destination_address):
+def route_cache_key(pickup_address, destination_address, pickup_coords=None, dropoff_coords=None, departure=None):
+    """Cache key for a trip: grid cells when coords are known, else the canonical addresses"""
+    grid = ROUTE_GRID_DEGREES * 1000000
+
+    def endpoint(address, coords):
+        if coords and list(coords) != [0, 0]:
+            return f"{round(coords[0] / grid)}:{round(coords[1] / grid)}"
+        return canonicalize_query(address)
+
+    return (
+        f"{endpoint(pickup_address, pickup_coords)}>{endpoint(destination_address, dropoff_coords)}"
+        f"@{eta_estimator.time_bucket(departure)}"
+    )
+
+
+def _trip_fallback(pickup_coords=None, dropoff_coords=None, departure=None):
+    """Trip without Google: a local estimate when both ends are known, else 5000m/600s"""
+    distance_meters, duration_seconds = 5000, 600
+    if pickup_coords and dropoff_coords:
+        distance_meters, duration_seconds = eta_estimator.estimate_trip(pickup_coords, dropoff_coords, departure)
+        print(f"📐 Estimated trip locally: {distance_meters}m, {duration_seconds}s")
+    return {
+        "distance": distance_meters,
+        "duration": duration_seconds,
+        "points": array("i"),
+        "pickup_coords": pickup_coords,
+        "dropoff_coords": dropoff_coords,
+        "resolved": False,
+    }
+
+
+def resolve_trip(pickup_address, destination_address, pickup_coords=None, dropoff_coords=None, departure=None):
     """
-    Get actual distance, duration, and route polyline from Google Maps Directions API
-    Returns: (distance_in_meters, duration_in_seconds, route_coordinates_list)
-    route_coordinates_list format: [[lng*1e6, lat*1e6], [lng*1e6, lat*1e6], ...]
+    Resolve a whole trip with one Google Maps Directions call.
+
+    Returns a dict with "distance" (metres), "duration" (seconds), "points" (flat
+    array('i') [lng1*1e6, lat1*1e6, ...]), "pickup_coords"/"dropoff_coords"
+    ([lng*1e6, lat*1e6]) and "resolved" (False when these are the 5000m/600s
+    defaults). Coords passed in are kept; missing ones come from the route's
+    leg start/end, so dispatch doesn't need separate geocodes.
+
+    Known coords and the departure time (default now) pick the route cache
+    entry; a hit skips the Directions call and polyline decode.
     """
+    cache_key = route_cache_key(pickup_address, destination_address, pickup_coords, dropoff_coords, departure)
+    cached = cache_get("route", cache_key)
+    if cached is not None:
+        distance_meters, duration_seconds, packed_points = cached[:3]
+        start_coords, end_coords = cached[3:5] if len(cached) >= 5 else (None, None)
+        print(f"⚡ Route cache hit: {cache_key} ({distance_meters}m, {duration_seconds}s)")
+        return {
+            "distance": distance_meters,
+            "duration": duration_seconds,
+            "points": unpack_route(packed_points),
+            "pickup_coords": pickup_coords or start_coords,
+            "dropoff_coords": dropoff_coords or end_coords,
+            "resolved": True,
+        }
+
+    # Short hops across town aren't worth a Directions call (off unless configured)
+    if eta_estimator.ETA_SKIP_DIRECTIONS_UNDER_M and pickup_coords and dropoff_coords:
+        trip = _trip_fallback(pickup_coords, dropoff_coords, departure)
+        if trip["distance"] < eta_estimator.ETA_SKIP_DIRECTIONS_UNDER_M:
+            trip["points"] = array("i", list(pickup_coords) + list(dropoff_coords))
+            trip["resolved"] = True
+            return trip
+
     if not gmaps:
         print("⚠️ Google Maps not available, using defaults")
-        return 5000, 600, []  # Default fallback
+        return _trip_fallback(pickup_coords, dropoff_coords, departure)
 
     try:
         # Add Wellington context if not present
@@ -828,7 +1339,11 @@ def get_route_distance_and_duration(pickup_address, destination_address):
         print(f"📍 Getting route: {pickup_full} → {destination_full}")
 
         # Get directions with polyline
-        directions = gmaps.directions(
+        directions = single_flight(
+            ("directions", canonicalize_query(pickup_full), canonicalize_query(destination_full)),
+            rate_limited_call,
+            "directions",
+            gmaps.directions,
             origin=pickup_full,
             destination=destination_full,
             mode="driving",
@@ -841,78 +1356,66 @@ def get_route_distance_and_duration(pickup_address, destination_address):
 
             distance_meters = leg['distance']['value']
             duration_seconds = leg['duration']['value']
+            # Where Google started/ended the route - the same point a geocode would give
+            start_coords = coords_from_geocode_result({"geometry": {"location": leg.get("start_location")}})
+            end_coords = coords_from_geocode_result({"geometry": {"location": leg.get("end_location")}})
 
             # Extract polyline from the route
             polyline_str = route.get('overview_polyline', {}).get('points', '')
 
-            # Decode polyline and convert to TaxiCaller format [lng*1e6, lat*1e6]
-            route_coords = []
+            # Decode straight into a flat [lng*1e6, lat*1e6, ...] array for TaxiCaller
+            route_points = array("i")
             if polyline_str:
                 try:
-                    # decode_polyline returns a generator of dicts with 'lat' and 'lng' keys
-                    # Convert to list first, then to TaxiCaller format
-                    decoded_points = list(decode_polyline(polyline_str))
-                    print(f"🔍 Decoded {len(decoded_points)} polyline points")
-
-                    # Convert to [lng*1e6, lat*1e6] format for TaxiCaller
-                    route_coords = []
-                    invalid_points = 0
-                    for i, point in enumerate(decoded_points):
-                        try:
-                            if isinstance(point, dict):
-                                # Point is a dict with 'lat' and 'lng' keys
-                                lat = point.get('lat', 0)
-                                lng = point.get('lng', 0)
-                                # Skip invalid/empty coordinates
-                                if lat != 0 or lng != 0:
-                                    route_coords.append([int(lng * 1e6), int(lat * 1e6)])
-                                else:
-                                    invalid_points += 1
-                            elif isinstance(point, (tuple, list)) and len(point) == 2:
-                                # Point is a tuple/list (lat, lng)
-                                lat, lng = point
-                                # Skip invalid/empty coordinates
-                                if lat != 0 or lng != 0:
-                                    route_coords.append([int(lng * 1e6), int(lat * 1e6)])
-                                else:
-                                    invalid_points += 1
-                            elif isinstance(point, (tuple, list)) and len(point) > 0:
-                                # Handle edge case of incomplete tuples/lists
-                                if len(point) >= 2:
-                                    lat, lng = point[0], point[1]
-                                    if lat != 0 or lng != 0:
-                                        route_coords.append([int(lng * 1e6), int(lat * 1e6)])
-                                    else:
-                                        invalid_points += 1
-                                else:
-                                    invalid_points += 1
-                            else:
-                                # Invalid point type
-                                print(f"⚠️ Invalid point at index {i}: type={type(point)}, value={point}")
-                                invalid_points += 1
-                        except Exception as point_error:
-                            print(f"⚠️ Error processing point {i}: {point_error}, point={point}")
-                            invalid_points += 1
-
-                    print(f"✅ Converted to {len(route_coords)} TaxiCaller coordinates ({invalid_points} invalid points filtered)")
-
-                except Exception as decode_error:
-                    print(f"⚠️ Error decoding/converting polyline: {decode_error}")
+                    route_points = decode_polyline_flat(polyline_str)
+                    print(f"🔍 Decoded {point_count(route_points)} polyline points")
+                except ValueError as decode_error:
+                    print(f"⚠️ Error decoding polyline: {decode_error}")
                     print(f"   Polyline string: {polyline_str[:50]}...")
-                    route_coords = []
-
-            print(f"✅ Route found: {distance_meters}m, {duration_seconds}s, {len(route_coords)} waypoints")
-            return distance_meters, duration_seconds, route_coords
+                    route_points = array("i")
+
+            # Every point becomes a "Waypoint N" node and a pts pair in the TaxiCaller
+            # payload - keep only the ones the map needs, before it goes in the cache
+            full_point_count = point_count(route_points)
+            route_points = simplify_route(route_points)
+            if full_point_count != point_count(route_points):
+                print(f"✂️ Simplified route: {full_point_count} → {point_count(route_points)} points")
+
+            print(f"✅ Route found: {distance_meters}m, {duration_seconds}s, {point_count(route_points)} waypoints")
+            cache_set(
+                "route",
+                cache_key,
+                [distance_meters, duration_seconds, pack_route(route_points), start_coords, end_coords],
+                ROUTE_CACHE_TTL,
+            )
+            return {
+                "distance": distance_meters,
+                "duration": duration_seconds,
+                "points": route_points,
+                "pickup_coords": pickup_coords or start_coords,
+                "dropoff_coords": dropoff_coords or end_coords,
+                "resolved": True,
+            }
         else:
             print(f"⚠️ No route found between {pickup_full} and {destination_full}")
-            return 5000, 600, []
+            return _trip_fallback(pickup_coords, dropoff_coords, departure)
 
     except Exception as e:
         print(f"⚠️ Error getting route: {e}, using defaults")
-        return 5000, 600, []
+        return _trip_fallback(pickup_coords, dropoff_coords, departure)
 
 
-def _build_route_nodes(pickup_address, destination_address, pickup_coords, dropoff_coords, pickup_timestamp, driver_instructions, route_coords):
+def get_route_distance_and_duration(pickup_address, destination_address, pickup_coords=None, dropoff_coords=None, departure=None):
+    """
+    Get actual distance, duration, and route polyline from Google Maps Directions API
+    Returns: (distance_in_meters, duration_in_seconds, route_points)
+    route_points format: flat array('i') [lng1*1e6, lat1*1e6, lng2*1e6, lat2*1e6, ...]
+    """
+    trip = resolve_trip(pickup_address, destination_address, pickup_coords, dropoff_coords, departure)
+    return trip["distance"], trip["duration"], trip["points"]
+
+
+def _build_route_nodes(pickup_address, destination_address, pickup_coords, dropoff_coords, pickup_timestamp, driver_instructions, route_points):
     """
     Build route nodes with waypoints for exact route visualization.
 
@@ -923,7 +1426,7 @@ def _build_route_nodes(pickup_address, destination_address, pickup_coords, dropo
         dropoff_coords: [lng*1e6, lat*1e6] for dropoff
         pickup_timestamp: Unix timestamp for pickup time
         driver_instructions: Special instructions for driver
-        route_coords: List of [lng*1e6, lat*1e6] waypoints from Google Maps polyline
+        route_points: Flat [lng1*1e6, lat1*1e6, ...] waypoints from Google Maps polyline
 
     Returns:
         List of nodes with pickup, waypoints, and dropoff
@@ -942,14 +1445,14 @@ def _build_route_nodes(pickup_address, destination_address, pickup_coords, dropo
     ]
 
     # Add intermediate waypoints from route polyline
-    if route_coords and len(route_coords) > 2:
+    if point_count(route_points) > 2:
         # Skip first and last points (they're pickup and dropoff)
-        for i, coord in enumerate(route_coords[1:-1], 1):
+        for i in range(1, point_count(route_points) - 1):
             nodes.append({
                 "actions": [],
                 "location": {
                     "name": f"Waypoint {i}",
-                    "coords": coord
+                    "coords": [route_points[2 * i], route_points[2 * i + 1]]
                 },
                 "times": {"arrive": {"target": 0}},
                 "info": {"all": ""},
@@ -971,6 +1474,13 @@ def _build_route_nodes(pickup_address, destination_address, pickup_coords, dropo
     return nodes
 
 
+def _geocode_coords(address, cached_only=False):
+    """[lng*1e6, lat*1e6] for an address, or None"""
+    results = geocode_address(address + ", Wellington, New Zealand", cached_only)
+    print(f"🔐 geocode result: {results}")
+    return coords_from_geocode_result(results[0]) if results else None
+
+
 def send_booking_to_taxicaller(booking_data, caller_number):
     """Send booking to TaxiCaller API using the correct v1 endpoint"""
     try:
@@ -1033,41 +1543,70 @@ def send_booking_to_taxicaller(booking_data, caller_number):
         # Format to ISO format WITHOUT timezone as per guide
         pickup_time_iso = pickup_datetime.strftime("%Y-%m-%dT%H:%M:%S+12:00")
 
-        # Get coordinates for pickup and destination using Google Maps
-        pickup_coords = [0, 0]  # Default fallback
-        dropoff_coords = [0, 0]  # Default fallback
-        
-        if gmaps:
-            try:
-                # Get pickup coordinates
-                print(f"🔐 geocode result - booking data:: {booking_data.get('pickup_address', '')}")
-                print(f"🔐 geocode result - booking data:: {booking_data.get('destination', '')}")
-                pickup_geocode = gmaps.geocode(booking_data.get('pickup_address', '') + ", Wellington, New Zealand", region="nz")
-                print(f"🔐 geocode result: {pickup_geocode}")
-                if pickup_geocode:
-                    pickup_lat = pickup_geocode[0]['geometry']['location']['lat']
-                    pickup_lng = pickup_geocode[0]['geometry']['location']['lng']
-                    pickup_coords = [int(pickup_lng * 1000000), int(pickup_lat * 1000000)]
-                
-                # Get dropoff coordinates  
-                dropoff_geocode = gmaps.geocode(booking_data.get('destination', '') + ", Wellington, New Zealand", region="nz")
-                if dropoff_geocode:
-                    dropoff_lat = dropoff_geocode[0]['geometry']['location']['lat']
-                    dropoff_lng = dropoff_geocode[0]['geometry']['location']['lng']
-                    dropoff_coords = [int(dropoff_lng * 1000000), int(dropoff_lat * 1000000)]
-            except Exception as e:
-                print(f"⚠️ Geocoding error: {e}")
-
         # Convert pickup time to Unix timestamp
         pickup_timestamp = 0  # Default for ASAP
         if not is_immediate:
             pickup_timestamp = int(NZ_TZ.localize(pickup_datetime).timestamp())
 
-        # Get actual route distance, duration, and polyline from Google Maps
-        distance_meters, duration_seconds, route_coords = get_route_distance_and_duration(
+        # Reuse the coordinates resolved during the dialog. Any end we don't
+        # already have (e.g. bookings loaded from the database) comes from the
+        # same Directions call as the route, so one Google request covers it all.
+        pickup_coords = booking_data.get("pickup_coords")
+        dropoff_coords = booking_data.get("destination_coords")
+        if pickup_coords and dropoff_coords:
+            print(f"⚡ Using dialog coordinates: pickup={pickup_coords}, dropoff={dropoff_coords}")
+
+        departure = None if is_immediate else pickup_datetime
+        lookup_started = time.time()
+        trip_future = DISPATCH_EXECUTOR.submit(
+            with_current_priority(resolve_trip),
             booking_data.get('pickup_address', ''),
-            booking_data.get('destination', '')
+            booking_data.get('destination', ''),
+            pickup_coords,
+            dropoff_coords,
+            departure
         )
+        done, not_done = wait([trip_future], timeout=DISPATCH_LOOKUP_DEADLINE)
+        print(f"⏱️ Dispatch trip lookup finished in {time.time() - lookup_started:.2f}s")
+
+        trip = _trip_fallback(pickup_coords, dropoff_coords, departure)
+        if trip_future in done:
+            try:
+                trip = trip_future.result()
+            except Exception as e:
+                print(f"⚠️ Trip lookup error: {e}")
+        else:
+            print(f"⚠️ Trip lookup missed the {DISPATCH_LOOKUP_DEADLINE}s deadline")
+
+        # Ends still missing get geocoded in whatever is left of the deadline;
+        # once it's gone only the gazetteer/cache are used, never Google
+        missing = [(coords_key, address_key) for coords_key, address_key in
+                   (("pickup_coords", "pickup_address"), ("dropoff_coords", "destination")) if not trip[coords_key]]
+        if missing:
+            remaining = DISPATCH_LOOKUP_DEADLINE - (time.time() - lookup_started)
+            geocodes = {}
+            if remaining > 0:
+                geocodes = {
+                    coords_key: DISPATCH_EXECUTOR.submit(with_current_priority(_geocode_coords), booking_data.get(address_key, ''))
+                    for coords_key, address_key in missing
+                }
+                wait(list(geocodes.values()), timeout=remaining)
+            for coords_key, address_key in missing:
+                future = geocodes.get(coords_key)
+                try:
+                    if future is not None and future.done():
+                        trip[coords_key] = future.result()
+                    else:
+                        trip[coords_key] = _geocode_coords(booking_data.get(address_key, ''), cached_only=True)
+                except Exception as e:
+                    print(f"⚠️ {address_key} geocode error: {e}")
+        if not trip["resolved"]:
+            # Now both ends may be known - estimate rather than send 5km/10min
+            trip = {**_trip_fallback(trip["pickup_coords"], trip["dropoff_coords"], departure), "points": trip["points"]}
+
+        distance_meters, duration_seconds, route_points = trip["distance"], trip["duration"], trip["points"]
+        pickup_coords = trip["pickup_coords"] or [0, 0]
+        dropoff_coords = trip["dropoff_coords"] or [0, 0]
 
         # Build route nodes with waypoints for exact route visualization
         route_nodes = _build_route_nodes(
@@ -1077,12 +1616,12 @@ def send_booking_to_taxicaller(booking_data, caller_number):
             dropoff_coords,
             pickup_timestamp,
             booking_data.get("driver_instructions", ""),
-            route_coords
+            route_points
         )
-        print(f"📊 Route data: {distance_meters}m, {duration_seconds}s, {len(route_coords)} waypoints")
+        print(f"📊 Route data: {distance_meters}m, {duration_seconds}s, {point_count(route_points)} waypoints")
         print(f"🔍 Pickup coords: {pickup_coords}")
         print(f"🔍 Dropoff coords: {dropoff_coords}")
-        print(f"🔍 Route coords (first 3): {route_coords[:3] if route_coords else 'EMPTY'}")
+        print(f"🔍 Route points (first 3): {route_points[:6].tolist() if route_points else 'EMPTY'}")
 
         # Validate coordinates - TaxiCaller doesn't accept [0, 0]
         if pickup_coords == [0, 0] or dropoff_coords == [0, 0]:
@@ -1092,9 +1631,9 @@ def send_booking_to_taxicaller(booking_data, caller_number):
             print(f"   Attempting to use route coordinates as fallback...")
 
             # If we have route coordinates, use the first and last as pickup/dropoff
-            if route_coords and len(route_coords) >= 2:
-                pickup_coords = route_coords[0]
-                dropoff_coords = route_coords[-1]
+            if point_count(route_points) >= 2:
+                pickup_coords = point_at(route_points, 0)
+                dropoff_coords = point_at(route_points, -1)
                 print(f"   ✅ Using route coordinates: Pickup={pickup_coords}, Dropoff={dropoff_coords}")
             else:
                 print(f"   ❌ No valid coordinates available - this will likely cause TaxiCaller API to fail")
@@ -1114,14 +1653,9 @@ def send_booking_to_taxicaller(booking_data, caller_number):
         print(f"🔍 DEBUG - booking_data['destination']: {booking_data.get('destination', 'MISSING')}")
         print(f"🔍 DEBUG - booking_data['driver_instructions']: {booking_data.get('driver_instructions', 'MISSING')}")
 
-        # Convert route_coords to flattened pts array for TaxiCaller API
         # pts should be a flat array: [lng1, lat1, lng2, lat2, lng3, lat3, ...]
-        pts_array = []
-        if route_coords:
-            for coord in route_coords:
-                if isinstance(coord, (list, tuple)) and len(coord) >= 2:
-                    pts_array.append(coord[0])  # lng
-                    pts_array.append(coord[1])  # lat
+        # which is already how route_points is stored
+        pts_array = route_points.tolist()
 
         print(f"📍 Route pts array: {len(pts_array)//2} coordinate pairs ({len(pts_array)} total values)")
 
@@ -1324,6 +1858,10 @@ def send_booking_to_taxicaller(booking_data, caller_number):
 
 def update_booking_to_db(caller_number, updated_booking):
     #update the database with new booking details
+    pickup_address = updated_booking.get("pickup_address", "")
+    destination = updated_booking.get("destination", "")
+    pickup_lat, pickup_lng = coords_to_lat_lng(updated_booking.get("pickup_coords"))
+    dropoff_lat, dropoff_lng = coords_to_lat_lng(updated_booking.get("destination_coords"))
     conn = get_db_connection()
     if conn:
         try:
@@ -1337,16 +1875,26 @@ def update_booking_to_db(caller_number, updated_booking):
                     dropoff_location = %s,
                     pickup_date = %s,
                     pickup_time = %s,
-                    order_id = %s
+                    order_id = %s,
+                    pickup_lat = CASE WHEN pickup_location = %s THEN COALESCE(%s, pickup_lat) ELSE %s END,
+                    pickup_lng = CASE WHEN pickup_location = %s THEN COALESCE(%s, pickup_lng) ELSE %s END,
+                    dropoff_lat = CASE WHEN dropoff_location = %s THEN COALESCE(%s, dropoff_lat) ELSE %s END,
+                    dropoff_lng = CASE WHEN dropoff_location = %s THEN COALESCE(%s, dropoff_lng) ELSE %s END
                 WHERE customer_phone = %s
                 """,
                 (
                     updated_booking.get("name", ""),
-                    updated_booking.get("pickup_address", ""),
-                    updated_booking.get("destination", ""),
+                    pickup_address,
+                    destination,
                     updated_booking.get("pickup_date", ""),
                     updated_booking.get("pickup_time", ""),
                     updated_booking.get("taxicaller_order_id", ""),
+                    # Keep the stored coords of an unchanged end when the booking
+                    # was loaded without them; a changed address never keeps old ones
+                    pickup_address, pickup_lat, pickup_lat,
+                    pickup_address, pickup_lng, pickup_lng,
+                    destination, dropoff_lat, dropoff_lat,
+                    destination, dropoff_lng, dropoff_lng,
                     caller_number,  # this is used in the WHERE clause
                 ),
             )
@@ -1360,6 +1908,7 @@ def update_booking_to_db(caller_number, updated_booking):
                 conn.close()
 
 # Background processing functions for booking modifications
+@background_priority
 def background_destination_modification(caller_number, updated_booking, original_booking=None):
     """Background process to modify destination"""
     try:
@@ -1457,6 +2006,7 @@ def background_destination_modification(caller_number, updated_booking, original
 
 
 
+@background_priority
 def background_pickup_modification(caller_number, updated_booking, original_booking=None):
     """Background process to modify pickup"""
     try:
@@ -1535,6 +2085,7 @@ def background_pickup_modification(caller_number, updated_booking, original_book
         except Exception as db_error:
             print(f"❌ FALLBACK: Database update also failed: {db_error}")
 
+@background_priority
 def background_time_modification(caller_number, updated_booking, original_booking=None, time_string=None):
     """Background process to modify pickup time using same logic as booking creation"""
     try:
@@ -1622,293 +2173,89 @@ def background_time_modification(caller_number, updated_booking, original_bookin
         except Exception as db_error:
             print(f"❌ FALLBACK: Database update also failed: {db_error}")
 
-def parse_booking_speech(speech_text):
-    """Parse booking speech using regex to extract details."""
-    booking_data = {
-        "name": "",
-        "pickup_address": "",
-        "destination": "",
-        "pickup_time": "",
-        "pickup_date": "",
-        "raw_speech": speech_text,
-    }
+def extract_booking_time(speech_text, tokens=None):
+    """Pull the pickup date/time out of speech - no address parsing, no network calls.
 
-    # Extract name
-    name_patterns = [
-        r"my name is\s+([^,]+)",
-        r"i'm\s+([^,]+)",
-        r"i am\s+([^,]+)",
-        r"it's\s+([^,]+)",
-    ]
+    Returns {"pickup_date": "DD/MM/YYYY" or "", "pickup_time": "HH:MM", "ASAP" or ""}.
+    """
+    return speech_tokenizer.booking_time(speech_text, datetime.now(NZ_TZ), tokens)
 
-    for pattern in name_patterns:
-        match = re.search(pattern, speech_text, re.IGNORECASE)
-        if match:
-            potential_name = match.group(1).strip()
-            if not any(
-                word in potential_name.lower()
-                for word in [
-                    "need", "want", "going", "from", "taxi", "booking",
-                    "street", "road", "avenue", "lane", "drive"
-                ]
-            ):
-                booking_data["name"] = potential_name
-                break
-
-    # Extract pickup address - FIXED to completely remove "number" and clean addresses
-    pickup_patterns = [
-        # Match number + street name + street type (remove "number" word)
-        # Fallback patterns - UPDATED to handle "I am" as well as "I'm" and remove "number"
-        r"(?:from|pick up from|pickup from)\s+(?:number\s+)?([^,]+?)(?:\s+(?:to|going|I'm|I am|and))",
-        r"(?:from|pick up from|pickup from)\s+(?:number\s+)?([^,]+)$",
-    ]
 
-    for pattern in pickup_patterns:
-        match = re.search(pattern, speech_text, re.IGNORECASE)
-        if match:
-            pickup = match.group(1).strip()
-            pickup = pickup.replace(" I'm", "").replace(" I am", "").replace(" and", "")
-
-            # AGGRESSIVE cleaning to remove "number" word completely
-            pickup = re.sub(r"\bnumber\s+", "", pickup, flags=re.IGNORECASE)
-            pickup = re.sub(r"\bright\s+now\b", "", pickup, flags=re.IGNORECASE).strip()
-
-            # Fix common speech recognition errors
-            pickup = pickup.replace("63rd Street Melbourne", "63 Hobart Street")
-            pickup = pickup.replace("Melbourne Street", "Hobart Street")
-            pickup = pickup.replace("mill street", "Willis Street")
-
-            booking_data["pickup_address"] = pickup
-            # AI Smart Cleaning - Remove time from pickup address
-            if booking_data["pickup_address"]:
-                pickup = booking_data["pickup_address"]
-                # Remove patterns like "at 6 p.m.", "at 10:30 AM"
-                pickup = re.sub(r'\s+at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)', '', pickup, flags=re.IGNORECASE)
-                # Remove time words
-                pickup = re.sub(r'\s+(?:tomorrow|today|tonight|morning|afternoon|evening|now|asap).*$', '', pickup, flags=re.IGNORECASE)
-                booking_data["pickup_address"] = pickup.strip()
-            break
-            
-    # Extract destination - FIXED to completely remove "number" and clean up addresses
-    destination = "railway station"  # This will be cleaned up by the mapping logic below
-    destination_patterns = [
-        r"(?:going to|to)\s+(railway station|train station|station)",
-        # Handle "I am going to" specifically
-        r"I am going to\s+(?:the\s+)?([^,]+?)(?:\s+(?:at\s+\d{1,2}|thank))",
-        r"I'm going to\s+(?:the\s+)?([^,]+?)(?:\s+(?:at\s+\d{1,2}|thank))",
-        # Handle "going to number X" pattern - capture without "number"
-        r"(?:to|going to|going)\s+(?:the\s+)?([^,]+?)(?:\s+(?:tomorrow|today|tonight|at|\d{1,2}:|on|date|right now|now))",
-        # Standard patterns without "number"
-        r"(?:to|going to|going)\s+([^,]+?)(?:\s+(?:tomorrow|today|tonight|at|\d{1,2}:|on|date|right now|now))",
-        # End of line patterns - capture without "number"
-        r"(?:to|going to|going)\s+(?:number\s+)?(\d+\s+.+)$",
-        r"(?:to|going to|going)\s+(.+)$",
-    ]
+def extract_booking_addresses(spans):
+    """Name, pickup and destination from speech_tokenizer slot spans, validated with Google"""
+    booking_data = {"name": "", "pickup_address": "", "destination": ""}
 
-    for pattern in destination_patterns:
-        match = re.search(pattern, speech_text, re.IGNORECASE)
-        if match:
-            destination = match.group(1).strip()
+    if "name" in spans:
+        booking_data["name"] = spans["name"][2]
 
-            # AGGRESSIVE cleaning to remove "number" and fix order
-            destination = re.sub(r"\bnumber\s+", "", destination, flags=re.IGNORECASE)
-
-            # Fix address order: "Miramar number 63 Hobart Street" → "63 Hobart Street, Miramar"
-            miramar_fix = re.search(
-                r"(miramar)\s+(?:number\s+)?(\d+\s+\w+\s+street)",
-                destination,
-                re.IGNORECASE,
-            )
-            if miramar_fix:
-                destination = f"{miramar_fix.group(2)}, {miramar_fix.group(1)}"
-
-            # Other area fixes
-            destination = destination.replace("wellington wellington", "wellington")
-            destination = re.sub(r"\s+(at|around|by)\s+\d+", "", destination)
-
-            # FIXED Smart destination mapping - ONLY for generic terms
-            if destination.lower() in ["hospital", "the hospital"]:
-                destination = "Wellington Hospital"
-            elif any(airport_word in destination.lower() for airport_word in [
-                "airport", "the airport", "domestic airport", "international airport", 
-                "steward duff", "stewart duff", "wlg airport", "wellington airport"
-            ]):
-                destination = "Wellington Airport"
-            elif destination.lower() in ["station", "railway station", "train station", "the station"]:
-                destination = "Wellington Railway Station"
-            elif "te papa" in destination.lower():
-                destination = "Te Papa Museum"
-            # For specific hospitals like "Hutt Hospital", "Bowen Hospital" - keep as-is!
-
-        booking_data["destination"] = destination
-        # AI Smart Cleaning - Remove time from destination
-        if booking_data["destination"]:
-            dest = booking_data["destination"]
-            # Remove time patterns
-            dest = re.sub(r'\s+at\s+\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)', '', dest, flags=re.IGNORECASE)
-            dest = re.sub(r'\s+by\s+\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)', '', dest, flags=re.IGNORECASE)
-            booking_data["destination"] = dest.strip()
-        break
-
-    # Extract date - FIXED DATE PARSING BUG
-    immediate_keywords = [
-        "no", "right now", "now", "asap", "as soon as possible", "immediately", "straight away",
-    ]
-    tomorrow_keywords = [
-        "tomorrow morning", "tomorrow afternoon", "tomorrow evening", "tomorrow night", "tomorrow",
-    ]
-    today_keywords = [
-        "tonight", "today", "later today", "this afternoon", "this evening", "this morning",
-    ]
-    after_tomorrow_keywords = [
-        "after tomorrow", "day after tomorrow", "2 days", "two days"
-    ]
-    
-    # First check for specific date mentions (22nd, 23rd, etc.)
-    date_pattern = r"(\d{1,2})(?:st|nd|rd|th)"
-    date_match = re.search(date_pattern, speech_text)
-
-    if any(keyword in speech_text.lower() for keyword in immediate_keywords):
-        current_time = datetime.now(NZ_TZ)
-        booking_data["pickup_date"] = current_time.strftime("%d/%m/%Y")
-        booking_data["pickup_time"] = "ASAP"
-    elif any(keyword in speech_text.lower() for keyword in after_tomorrow_keywords):
-        # Handle "after tomorrow" - add 2 days
-        after_tomorrow = datetime.now(NZ_TZ) + timedelta(days=2)
-        booking_data["pickup_date"] = after_tomorrow.strftime("%d/%m/%Y")
-    elif any(keyword in speech_text.lower() for keyword in tomorrow_keywords):
-        # Handle "tomorrow" - add 1 day
-        tomorrow = datetime.now(NZ_TZ) + timedelta(days=1)
-        booking_data["pickup_date"] = tomorrow.strftime("%d/%m/%Y")
-    elif date_match:
-        # Customer specified a specific date number - FIXED BUG HERE
-        day = int(date_match.group(1))
-        current_date = datetime.now(NZ_TZ)
-        current_month = current_date.month
-        current_year = current_date.year
-        # If the day has already passed this month, assume next month
-        if day < current_date.day:
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-        # FIXED: Use the correct variables for the date
-        booking_data["pickup_date"] = datetime(current_year, current_month, day).strftime("%d/%m/%Y")
-    elif any(keyword in speech_text.lower() for keyword in today_keywords):
-        today = datetime.now(NZ_TZ)
-        booking_data["pickup_date"] = today.strftime("%d/%m/%Y")
-
-    # Extract time
-    time_patterns = [
-        r"in\s+(\d+)\s+minutes?",  # NEW: matches "in 30 minutes"
-        r"in\s+(\d+)\s+hours?",    # NEW: matches "in 2 hours"
-        r"time\s+(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
-        r"at\s+(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
-        r"(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
-    ]
-
-    # Add special handling for "half hour" and "midday/noon" BEFORE the pattern matching
-    if any(phrase in speech_text.lower() for phrase in ["half hour", "half an hour", "30 minutes"]):
-        booking_time = datetime.now(NZ_TZ) + timedelta(minutes=30)
-        booking_data["pickup_time"] = booking_time.strftime('%H:%M')  # Use 24-hour format
-        booking_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
-    elif any(phrase in speech_text.lower() for phrase in ["midday", "noon", "12 noon", "12 midday"]):
-        # Handle midday/noon as 12:00 PM (12:00 in 24-hour format)
-        booking_data["pickup_time"] = "12:00"
-        # Use today's date unless another date is specified
-        if not booking_data.get("pickup_date"):
-            booking_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
-    elif not any(keyword in speech_text.lower() for keyword in immediate_keywords):
-        # Then do the pattern matching
-        for pattern in time_patterns:
-            match = re.search(pattern, speech_text, re.IGNORECASE)
-            if match:
-                if pattern == r"in\s+(\d+)\s+minutes?":
-                    minutes = int(match.group(1))
-                    booking_time = datetime.now(NZ_TZ) + timedelta(minutes=minutes)
-                    time_str = booking_time.strftime('%H:%M')  # Use 24-hour format
-                    booking_data["pickup_time"] = time_str
-                    booking_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
-                    break
-                elif pattern == r"in\s+(\d+)\s+hours?":
-                    hours = int(match.group(1))
-                    booking_time = datetime.now(NZ_TZ) + timedelta(hours=hours)
-                    time_str = booking_time.strftime('%H:%M')  # Use 24-hour format
-                    booking_data["pickup_time"] = time_str
-                    booking_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
-                    break
-                else:
-                    # Handle regular time patterns (4 PM, etc.)
-                    time_str = match.group(1).strip()
-                    time_str = time_str.replace("p.m.", "PM").replace("a.m.", "AM")
-
-                    # Add :00 if no minutes specified
-                    if ":" not in time_str and any(x in time_str for x in ["AM", "PM"]):
-                        time_str = time_str.replace(" AM", ":00 AM").replace(" PM", ":00 PM")
-
-                    # Convert to 24-hour format for consistent storage
-                    if "PM" in time_str:
-                        # Handle PM times
-                        hour_part = time_str.split(":")[0].strip()
-                        minute_part = time_str.split(":")[1].replace("PM", "").strip() if ":" in time_str else "00"
-                        hour = int(hour_part)
-                        if hour != 12:  # 12 PM stays as 12
-                            hour += 12
-                        time_str = f"{hour:02d}:{minute_part}"
-                    elif "AM" in time_str:
-                        # Handle AM times
-                        hour_part = time_str.split(":")[0].strip()
-                        minute_part = time_str.split(":")[1].replace("AM", "").strip() if ":" in time_str else "00"
-                        hour = int(hour_part)
-                        if hour == 12:  # 12 AM becomes 00
-                            hour = 0
-                        time_str = f"{hour:02d}:{minute_part}"
-
-                    booking_data["pickup_time"] = time_str
-                    break
-    
-    # Clean temporal words from addresses
-    time_words = ['tomorrow', 'today', 'tonight', 'morning', 'afternoon', 'evening', 'right now', 'now', 'asap']
+    # Remove "number" completely - "from number 63 Hobart Street"
+    if "pickup" in spans:
+        booking_data["pickup_address"] = re.sub(r"\bnumber\s+", "", spans["pickup"][2], flags=re.IGNORECASE).strip()
 
+    if "destination" in spans:
+        destination = re.sub(r"\bnumber\s+", "", spans["destination"][2], flags=re.IGNORECASE)
 
-# Clean and validate pickup address
-    if booking_data.get('pickup_address'):
-        pickup = booking_data['pickup_address']
-        # Remove time words
-        for word in time_words:
-            pickup = pickup.replace(f" {word}", "")
+        # Fix address order: "Miramar number 63 Hobart Street" → "63 Hobart Street, Miramar"
+        miramar_fix = re.search(
+            r"(miramar)\s+(?:number\s+)?(\d+\s+\w+\s+street)",
+            destination,
+            re.IGNORECASE,
+        )
+        if miramar_fix:
+            destination = f"{miramar_fix.group(2)}, {miramar_fix.group(1)}"
+
+        # Other area fixes
+        destination = destination.replace("wellington wellington", "wellington")
+
+        # Smart destination mapping - ONLY for generic terms
+        if destination.lower() in ["hospital", "the hospital"]:
+            destination = "Wellington Hospital"
+        elif any(airport_word in destination.lower() for airport_word in [
+            "airport", "the airport", "domestic airport", "international airport",
+            "steward duff", "stewart duff", "wlg airport", "wellington airport"
+        ]):
+            destination = "Wellington Airport"
+        elif destination.lower() in ["station", "railway station", "train station", "the station"]:
+            destination = "Wellington Railway Station"
+        elif "te papa" in destination.lower():
+            destination = "Te Papa Museum"
+        # For specific hospitals like "Hutt Hospital", "Bowen Hospital" - keep as-is!
+
+        booking_data["destination"] = destination.strip()
+
+    for key, address_type in (("pickup_address", "pickup"), ("destination", "destination")):
+        address = booking_data[key]
+        if not address:
+            continue
         # Fix "in Wellington CBD" to ", Wellington CBD"
-        pickup = pickup.replace(" in Wellington CBD", ", Wellington CBD")
-        
-        # Validate with Google Maps
-        if gmaps:
-            validated_pickup = validate_and_format_address(pickup, "pickup")
-            # Only use validated address if it's a string (not False)
-            if validated_pickup and isinstance(validated_pickup, str):
-                pickup = validated_pickup
-        booking_data['pickup_address'] = pickup.strip()
-    
-    # Clean and validate destination
-    if booking_data.get('destination'):
-        destination = booking_data['destination']
-        # Remove time words
-        for word in time_words:
-            destination = destination.replace(f" {word}", "")
-        # Fix "in Wellington CBD" to ", Wellington CBD"  
-        destination = destination.replace(" in Wellington CBD", ", Wellington CBD")
-        
+        address = address.replace(" in Wellington CBD", ", Wellington CBD")
+        # Fix misheard street/suburb names (only changes the text when confident)
+        address = street_matcher.correct_address(address)["text"]
+
         # Validate with Google Maps
         if gmaps:
-            validated_destination = validate_and_format_address(destination, "destination")
+            validated = validate_and_format_address(address, address_type)
             # Only use validated address if it's a string (not False)
-            if validated_destination and isinstance(validated_destination, str):
-                destination = validated_destination
-        booking_data['destination'] = destination.strip()
-    
+            if validated and isinstance(validated, str):
+                address = validated
+        booking_data[key] = address.strip()
+
+    return booking_data
+
+
+def parse_booking_speech(speech_text):
+    """Parse a whole booking utterance: one speech_tokenizer pass feeds the address and time extractors"""
+    tokens = speech_tokenizer.tokenize(speech_text)
+    spans = speech_tokenizer.slot_spans(speech_text, tokens)
+
+    booking_data = {"raw_speech": speech_text}
+    booking_data.update(extract_booking_addresses(spans))
+    booking_data.update(extract_booking_time(speech_text, tokens))
+
     print(f"📝 PARSED BOOKING DATA: {booking_data}")
     return booking_data
 
+
 def send_booking_to_api(booking_data, caller_number):
     """STEP 2 & 3: Send booking to TaxiCaller dispatch system with reduced timeout"""
     
@@ -2056,14 +2403,143 @@ def health_check():
         if TAXICALLER_API_KEY
         else None,
         "database": get_db_connection() is not None,
+        "cache": cache_stats(),
+        "single_flight": single_flight_stats(),
+        "google_maps_usage": usage_stats(),
+        "eta_model": eta_estimator.model_info(),
+        "llm": llm_stats(),
+        "model_tiers": model_tier_stats(),
         "current_time": datetime.now(NZ_TZ).strftime("%Y-%m-%d %H:%M:%S %Z"),
     }, 200
 
 
+def get_last_confirmed_booking(caller_number):
+    """The caller's last confirmed trip with its stored coordinates, or None"""
+    if not caller_number:
+        return None
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT b.*, COALESCE(c.name, b.customer_name) AS profile_name
+            FROM bookings b LEFT JOIN customers c ON c.phone_number = b.customer_phone
+            WHERE b.customer_phone = %s AND b.status = 'confirmed'
+            ORDER BY b.booking_time DESC LIMIT 1""",
+            (caller_number,),
+        )
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        print(f"❌ Error loading last booking: {e}")
+        conn.close()
+        return None
+
+    if not row or not row["pickup_location"] or not row["dropoff_location"] or not row["profile_name"]:
+        return None
+    return {
+        "name": row["profile_name"],
+        "pickup_address": row["pickup_location"],
+        "pickup_address_clean": clean_address_for_speech(row["pickup_location"]),
+        "pickup_coords": coords_from_lat_lng(row.get("pickup_lat"), row.get("pickup_lng")),
+        "destination": row["dropoff_location"],
+        "destination_clean": clean_address_for_speech(row["dropoff_location"]),
+        "destination_coords": coords_from_lat_lng(row.get("dropoff_lat"), row.get("dropoff_lng")),
+    }
+
+
+# Repeat callers: warm the caches for their usual addresses while they listen to the menu
+PREFETCH_HISTORY_LIMIT = int(os.getenv("PREFETCH_HISTORY_LIMIT", "3"))
+PREFETCH_COOLDOWN = int(os.getenv("PREFETCH_COOLDOWN", "600"))
+_prefetch_lock = threading.Lock()
+_last_prefetch = {}
+
+
+def get_caller_history(caller_number, limit=PREFETCH_HISTORY_LIMIT):
+    """Most recent distinct (pickup, dropoff) pairs this number has booked"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT pickup_location, dropoff_location FROM bookings
+            WHERE customer_phone = %s
+            GROUP BY pickup_location, dropoff_location
+            ORDER BY MAX(booking_time) DESC LIMIT %s""",
+            (caller_number, limit),
+        )
+        history = [(row["pickup_location"], row["dropoff_location"]) for row in cur.fetchall()]
+        cur.close()
+        conn.close()
+        return history
+    except Exception as e:
+        print(f"❌ Error loading caller history: {e}")
+        conn.close()
+        return []
+
+
+@background_priority
+def prefetch_caller_history(caller_number):
+    """Geocode a repeat caller's recent addresses so the dialog hits a warm cache.
+    Routes cost a Directions call each, so only the offered trip gets one (prefetch_last_trip_route)."""
+    try:
+        history = get_caller_history(caller_number)
+        if not history:
+            return
+
+        started = time.time()
+        warmed = set()
+        for pickup, dropoff in history:
+            for address in (pickup, dropoff):
+                if not address or address in warmed:
+                    continue
+                search_address = address if "wellington" in address.lower() else f"{address}, Wellington, New Zealand"
+                geocode_address(search_address)
+                warmed.add(address)
+        print(f"🔥 Prefetched {len(warmed)} addresses for {caller_number} in {time.time() - started:.2f}s")
+    except Exception as e:
+        print(f"⚠️ Caller prefetch error: {e}")
+
+
+@background_priority
+def prefetch_last_trip_route(last_booking):
+    """Warm the route for the trip we've just offered a returning caller"""
+    try:
+        if last_booking.get("pickup_coords") and last_booking.get("destination_coords"):
+            get_route_distance_and_duration(
+                last_booking["pickup_address"], last_booking["destination"],
+                last_booking["pickup_coords"], last_booking["destination_coords"],
+            )
+            print(f"🔥 Prefetched last trip route: {last_booking['pickup_address']} → {last_booking['destination']}")
+    except Exception as e:
+        print(f"⚠️ Last trip route prefetch error: {e}")
+
+
+def start_caller_prefetch(caller_number):
+    """Kick off prefetch_caller_history without holding up the TwiML response"""
+    if not caller_number:
+        return
+    now = time.time()
+    with _prefetch_lock:
+        # /voice redirects to itself and then /book_taxi - once per call is plenty
+        if now - _last_prefetch.get(caller_number, 0) < PREFETCH_COOLDOWN:
+            return
+        _last_prefetch[caller_number] = now
+        if len(_last_prefetch) > 5000:
+            for number, prefetched_at in list(_last_prefetch.items()):
+                if now - prefetched_at >= PREFETCH_COOLDOWN:
+                    del _last_prefetch[number]
+    threading.Thread(target=prefetch_caller_history, args=(caller_number,), daemon=True).start()
+
+
 @app.route("/voice", methods=["POST"])
 def voice():
     """Main voice entry point"""
     print("🎯 Voice endpoint called!")
+    start_caller_prefetch(request.form.get("From", ""))
     response = """<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     <Gather action="/menu" method="POST" timeout="10" numDigits="1">
@@ -2107,6 +2583,7 @@ def book_taxi():
     call_sid = request.form.get("CallSid", "")
     caller_number = request.form.get("From", "")
     print(f"🚖 Starting step-by-step booking for call: {call_sid}")
+    start_caller_prefetch(caller_number)
     
     # Initialize session for this call
     if call_sid not in user_sessions:
@@ -2122,6 +2599,31 @@ def book_taxi():
             },
             "caller_number": caller_number
         }
+
+        # Returning caller - offer last trip before walking through every step
+        last_booking = get_last_confirmed_booking(caller_number)
+        if last_booking:
+            user_sessions[call_sid]["booking_step"] = "same_as_last_time"
+            user_sessions[call_sid]["last_booking"] = last_booking
+            threading.Thread(target=prefetch_last_trip_route, args=(last_booking,), daemon=True).start()
+
+    session = user_sessions[call_sid]
+    if session.get("booking_step") == "same_as_last_time":
+        last_booking = session["last_booking"]
+        response = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        Welcome back {escape(last_booking['name'])}!
+        Last time we picked you up from {escape(last_booking['pickup_address_clean'])}
+        and took you to {escape(last_booking['destination_clean'])}.
+        Would you like the same pickup and destination as last time?
+    </Say>
+    <Gather input="speech" action="/process_booking" method="POST" timeout="10" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">Please say yes or no.</Say>
+    </Gather>
+    <Redirect>/book_taxi</Redirect>
+</Response>"""
+        return Response(response, mimetype="text/xml")
     
     response = """<?xml version="1.0" encoding="UTF-8"?>
 <Response>
@@ -2144,6 +2646,159 @@ def book_taxi():
     return Response(response, mimetype="text/xml")
 
 
+# The order booking slots are asked for in, and the session step for each
+BOOKING_SLOT_STEPS = [
+    ("name", "name"),
+    ("pickup_address", "pickup"),
+    ("destination", "destination"),
+    ("pickup_time", "time"),
+    ("driver_instructions", "driver_instructions"),
+]
+
+
+def booking_step_prompt(step, lead=""):
+    """TwiML asking for one booking step, after an optional lead sentence"""
+    questions = {
+        "name": ("Could you please tell me your name?", "I am listening."),
+        "pickup": ("What's your pickup address? For example unit 1 at 27 melrose road.", "Please tell me where to pick you up."),
+        "destination": ("Where would you like to go?", "Please tell me your destination."),
+        "time": (
+            'When do you need the taxi? You can say things like "now", "in 30 minutes", "at 3 PM", or "tomorrow morning".',
+            "Please tell me when you need the taxi.",
+        ),
+        "driver_instructions": (
+            "Do you have any special instructions for the driver? For example, text on arrival or wait for me.",
+            "I’m listening now.",
+        ),
+    }
+    question, listening = questions[step]
+    response = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        {lead}
+        {question}
+    </Say>
+    <Gather input="speech" action="/process_booking" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">{listening}</Say>
+    </Gather>
+</Response>"""
+    return Response(response, mimetype="text/xml")
+
+
+def booking_confirmation_prompt():
+    """TwiML asking the caller to confirm a complete booking"""
+    response = """<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        We’ve received your booking details.
+        If everything is correct, please say ‘Yes’ to confirm.
+        If you need to make any changes, please say ‘No’.
+    </Say>
+    <Gather action="/confirm_booking" input="speech" method="POST" timeout="10" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">
+            I am listening.
+        </Say>
+    </Gather>
+    
+    <Redirect>/process_booking</Redirect>
+</Response>"""
+    return Response(response, mimetype="text/xml")
+
+
+def handle_multi_slot_turn(session, speech_data, current_step, caller_number):
+    """
+    Fill every slot a caller gave in one turn from a single structured extraction.
+
+    Returns the TwiML for the next thing still missing, or None when the turn
+    only really answered the current step (or extraction failed), in which
+    case process_booking carries on as usual.
+    """
+    partial_booking = session["partial_booking"]
+    slots = turn_extractor.extract_booking_slots(speech_data, current_step, known={
+        "name": partial_booking.get("name"),
+        "pickup": partial_booking.get("pickup_address_clean"),
+        "destination": partial_booking.get("destination_clean"),
+        "pickup_time": partial_booking.get("pickup_time"),
+    })
+    if not slots or slots.get("intent", "provide_details") != "provide_details":
+        return None
+
+    # The airport-rank message belongs to the pickup step
+    if "airport" in slots.get("pickup", "").lower() or "terminal" in slots.get("pickup", "").lower():
+        slots.pop("pickup")
+    found = {slot for slot in ("name", "pickup", "destination", "pickup_time", "driver_instructions") if slots.get(slot)}
+    current_slot = {"time": "pickup_time"}.get(current_step, current_step)
+    if not found - {current_slot}:
+        return None
+
+    if slots.get("name"):
+        partial_booking["name"] = slots["name"]
+    if slots.get("pickup_time"):
+        partial_booking["pickup_time"] = slots["pickup_time"]
+        partial_booking["pickup_date"] = slots["pickup_date"]
+    if slots.get("driver_instructions"):
+        partial_booking["driver_instructions"] = slots["driver_instructions"]
+
+    # Both addresses resolve side by side within the usual turn deadline
+    addresses = {slot: slots[slot] for slot in ("pickup", "destination") if slots.get(slot)}
+    futures = {
+        slot: ADDRESS_TURN_EXECUTOR.submit(with_current_priority(resolve_spoken_address), text, slot)
+        for slot, text in addresses.items()
+    }
+    rejected = {}
+    for slot, future in futures.items():
+        try:
+            resolved = future.result(timeout=ADDRESS_TURN_DEADLINE + 1)
+        except Exception as e:
+            print(f"⚠️ Multi-slot {slot} resolution failed: {e}")
+            continue
+        if resolved["status"] == "exact":
+            if slot == "pickup":
+                partial_booking["pickup_address"] = resolved["full_address"]
+                partial_booking["pickup_address_clean"] = resolved["clean_address"]
+                partial_booking["pickup_coords"] = resolved["coords"]
+            else:
+                partial_booking["destination"] = resolved["full_address"]
+                partial_booking["destination_clean"] = resolved["clean_address"]
+                partial_booking["destination_coords"] = resolved["coords"]
+        elif resolved["status"] == "rejected":
+            rejected[slot] = remember_rejected_address(addresses[slot], resolved_query=resolved.get("resolved_query"))
+
+    # What we now know, read back before asking for what's missing
+    heard = []
+    if partial_booking.get("pickup_address_clean") and "pickup" in addresses and "pickup" not in rejected:
+        heard.append(f"pickup at {escape(partial_booking['pickup_address_clean'])}")
+    if partial_booking.get("destination_clean") and "destination" in addresses and "destination" not in rejected:
+        heard.append(f"going to {escape(partial_booking['destination_clean'])}")
+    if slots.get("pickup_time"):
+        if slots["pickup_time"] == "ASAP":
+            heard.append("right now")
+        else:
+            heard.append(f"on {slots['pickup_date']} at {format_time_for_speech(slots['pickup_time'])}")
+    thanks = f"Thanks {escape(partial_booking['name'])}." if partial_booking.get("name") else "Thanks."
+    lead = f"{thanks} I have your {', '.join(heard)}." if heard else thanks
+    print(f"🧩 Multi-slot turn filled {sorted(found - set(rejected))}, rejected {sorted(rejected)}")
+
+    for field, step in BOOKING_SLOT_STEPS:
+        if field == "driver_instructions" and field in partial_booking:
+            continue
+        if not partial_booking.get(field):
+            session["booking_step"] = step
+            if step in rejected:
+                return address_reprompt_response(
+                    "Could you please tell me your pickup address again?" if step == "pickup" else "Where would you like to go?",
+                    "/process_booking",
+                    rejected[step],
+                )
+            return booking_step_prompt(step, lead)
+
+    session["booking_step"] = "confirmation"
+    session["pending_booking"] = partial_booking
+    session["caller_number"] = caller_number
+    return booking_confirmation_prompt()
+
+
 @app.route("/process_booking", methods=["POST"])
 def process_booking():
     """Process booking speech input - STEP-BY-STEP LOGIC"""
@@ -2189,14 +2844,76 @@ def process_booking():
     session = user_sessions[call_sid]
     current_step = session.get("booking_step", "name")
     partial_booking = session.get("partial_booking", {})
+
+    # "Yes" / "the first one" after "Did you mean ...?" is the offered address
+    if current_step in ("pickup", "destination"):
+        speech_data = offered_address_choice(session, speech_data) or speech_data
     
     # Add current speech to raw speech
     partial_booking["raw_speech"] = f"{partial_booking.get('raw_speech', '')} {speech_data}".strip()
     
     print(f"📋 CURRENT STEP: {current_step}")
+
+    # "From 63 Hobart Street to the airport at 5" - take every slot in one go
+    # instead of one per turn. Only turns that mention more than the current
+    # step's slot pay for the extraction call.
+    if current_step in ("name", "pickup", "destination", "time") and OPENAI_API_KEY:
+        other_slots = turn_extractor.mentioned_slots(speech_data) - {turn_extractor.STEP_SLOTS[current_step]}
+        if other_slots:
+            session["partial_booking"] = partial_booking
+            multi_slot_response = handle_multi_slot_turn(session, speech_data, current_step, caller_number)
+            if multi_slot_response is not None:
+                user_sessions[call_sid] = session
+                return multi_slot_response
     
     # Process based on current step
-    if current_step == "name":
+    if current_step == "same_as_last_time":
+        last_booking = session.get("last_booking", {})
+        name = last_booking.get("name", "")
+        partial_booking["name"] = name
+
+        # Negatives first - "no, a different address please" and "not the same" aren't a yes
+        speech_lower = speech_data.lower()
+        declined = re.search(r"\b(no(?! (?:worries|problem))|nope|nah|not|different|change|another|new|somewhere else)\b", speech_lower)
+        accepted = re.search(r"\b(yes|yeah|yep|yup|sure|correct|ok|okay|same (?:as last time|as before|again))\b", speech_lower)
+        if accepted and not declined:
+            # Stored addresses were validated and geocoded last time - no lookups needed
+            partial_booking["pickup_address"] = last_booking["pickup_address"]
+            partial_booking["pickup_address_clean"] = last_booking["pickup_address_clean"]
+            partial_booking["pickup_coords"] = last_booking.get("pickup_coords")
+            partial_booking["destination"] = last_booking["destination"]
+            partial_booking["destination_clean"] = last_booking["destination_clean"]
+            partial_booking["destination_coords"] = last_booking.get("destination_coords")
+            session["booking_step"] = "time"
+            print(f"⚡ Same as last time: {last_booking['pickup_address']} → {last_booking['destination']}")
+
+            response = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        Great! Going to {escape(last_booking['destination_clean'])} again.
+        When do you need the taxi?
+        You can say things like "now", "in 30 minutes", "at 3 PM", or "tomorrow morning".
+    </Say>
+    <Gather input="speech" action="/process_booking" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">Please tell me when you need the taxi.</Say>
+    </Gather>
+</Response>"""
+        else:
+            # We still know who they are, so skip straight to the pickup
+            session["booking_step"] = "pickup"
+            response = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        No problem {escape(name)}.
+        What's your pickup address?
+        For example unit 1 at 27 melrose road.
+    </Say>
+    <Gather input="speech" action="/process_booking" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
+        <Say voice="Polly.Aria-Neural" language="en-NZ">Please tell me where to pick you up.</Say>
+    </Gather>
+</Response>"""
+
+    elif current_step == "name":
         # Extract name from speech
         name = speech_data.strip()
         
@@ -2276,45 +2993,49 @@ def process_booking():
 </Response>"""
                 return Response(response, mimetype="text/xml")
 
-            # Parse address to get clean and full versions
-            try:
-                clean_pickup, full_pickup = parse_address(pickup)
-                print(f"📍 Parsed pickup - Clean: {clean_pickup}, Full: {full_pickup}")
-
-                # Use full address for validation and storage
-                address_to_validate = full_pickup if full_pickup else pickup
-                if gmaps:
-                    validated_address = validate_and_format_address(address_to_validate, "pickup")
-                else:
-                    validated_address = address_to_validate
-                
-                if(validated_address == False):
-                    response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Aria-Neural" language="en-NZ">
-        Sorry, Address not recognized. Could you please tell me your pickup address again?
-    </Say>
-    <Gather input="speech" action="/process_booking" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
-        <Say voice="Polly.Aria-Neural" language="en-NZ">I am listening.</Say>
-    </Gather>
-</Response>"""
-                    return Response(response, mimetype="text/xml")
-                # Use clean address for speech
-                pickup_for_speech = clean_pickup if clean_pickup else clean_address_for_speech(validated_address)
+            # Same phrase rejected a moment ago - re-prompt without another LLM/geocode trip
+            rejection = rejected_address(pickup)
+            if rejection is not None:
+                print(f"⚡ Negative cache hit: {pickup}")
+                return address_reprompt_response(
+                    "Could you please tell me your pickup address again?",
+                    "/process_booking",
+                    rejection.get("suggestions"),
+                )
 
-            except Exception as e:
-                print(f"⚠️ Error parsing pickup address: {e}")
-                # Fallback to original logic
+            # Race a direct geocode against parse + validate, within the turn's deadline
+            resolved = resolve_spoken_address(pickup, "pickup")
+            if resolved["status"] == "exact":
+                validated_address = resolved["full_address"]
+                pickup_coords = resolved["coords"]
+                pickup_for_speech = resolved["clean_address"]
+            elif resolved["status"] in ("rejected", "timeout"):
+                suggestions = None
+                if resolved["status"] == "rejected":
+                    suggestions = remember_rejected_address(pickup, resolved_query=resolved.get("resolved_query"))
+                return address_reprompt_response(
+                    "Could you please tell me your pickup address again?",
+                    "/process_booking",
+                    suggestions,
+                )
+            else:
+                # The parser failed outright (LLM outage) - fall back to the original logic
+                pickup_coords = None
                 if gmaps:
-                    validated_address = validate_and_format_address(pickup, "pickup")
+                    validated_address = validate_and_format_address(pickup, "pickup", with_coords=True)
+                    if validated_address:
+                        validated_address, pickup_coords = validated_address
+                    else:
+                        validated_address = pickup
                 else:
                     validated_address = pickup
                 pickup_for_speech = clean_address_for_speech(validated_address)
-                clean_pickup = pickup_for_speech  # Set clean address for fallback
 
-            # Save both full and clean addresses
+            # Save both full and clean addresses, plus the geometry so
+            # send_booking_to_taxicaller doesn't have to geocode them again
             partial_booking["pickup_address"] = validated_address
             partial_booking["pickup_address_clean"] = pickup_for_speech
+            partial_booking["pickup_coords"] = pickup_coords
             session["booking_step"] = "destination"
 
             response = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -2355,38 +3076,40 @@ def process_booking():
         elif dest_lower.startswith("i am going to "):
             destination = destination[14:].strip()
         
-        # Parse address to get clean and full versions
-        try:
-            clean_destination, full_destination = parse_address(destination)
-            print(f"📍 Parsed destination - Clean: {clean_destination}, Full: {full_destination}")
-
-            # Use full address for POI resolution
-            address_to_resolve = full_destination if full_destination else destination
+        # Same phrase rejected a moment ago - re-prompt without another LLM/geocode trip
+        rejection = rejected_address(destination)
+        if rejection is not None:
+            print(f"⚡ Negative cache hit: {destination}")
+            return address_reprompt_response(
+                "Where would you like to go?", "/process_booking", rejection.get("suggestions")
+            )
 
-        except Exception as e:
-            print(f"⚠️ Error parsing destination address: {e}")
+        # Race a direct geocode against parse + validate, within the turn's deadline
+        resolved = resolve_spoken_address(destination, "destination")
+        if resolved["status"] in ("rejected", "timeout"):
+            suggestions = None
+            if resolved["status"] == "rejected":
+                suggestions = remember_rejected_address(destination, resolved_query=resolved.get("resolved_query"))
+            return address_reprompt_response("Where would you like to go?", "/process_booking", suggestions)
+
+        if resolved["status"] == "exact":
+            clean_destination = resolved["clean_address"]
+            resolved_destination = {
+                "full_address": resolved["full_address"],
+                "speech": resolved["clean_address"],
+                "coords": resolved["coords"],
+            }
+        else:
+            # The parser failed outright (LLM outage) - fall back to plain POI resolution
             clean_destination = None
-            address_to_resolve = destination
-
-        # SMART WELLINGTON POI RESOLUTION
-        print(f"🔍 Resolving destination POI: {address_to_resolve}")
-        resolved_destination = resolve_wellington_poi_to_address(address_to_resolve)
-
-        if(resolved_destination == False):
-            response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Aria-Neural" language="en-NZ">
-        Sorry, Address not recognized. Where would you like to go?
-    </Say>
-    <Gather input="speech" action="/process_booking" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
-        <Say voice="Polly.Aria-Neural" language="en-NZ">I am listening.</Say>
-    </Gather>
-</Response>"""
-            return Response(response, mimetype="text/xml")
-
+            resolved_destination = resolve_wellington_poi_to_address(destination)
+            if resolved_destination == False:
+                suggestions = remember_rejected_address(destination, resolved_query=destination)
+                return address_reprompt_response("Where would you like to go?", "/process_booking", suggestions)
 
         if isinstance(resolved_destination, dict) and resolved_destination.get('full_address'):
             partial_booking["destination"] = resolved_destination["full_address"]
+            partial_booking["destination_coords"] = resolved_destination.get("coords")
 
             # Use clean address for speech, fallback to resolved speech
             destination_for_speech = clean_destination if clean_destination else resolved_destination['speech']
@@ -2407,6 +3130,7 @@ def process_booking():
 </Response>"""
         elif isinstance(resolved_destination, str) and len(resolved_destination) >= 3:
             partial_booking["destination"] = resolved_destination
+            partial_booking["destination_coords"] = None
 
             # Use clean address for speech, fallback to resolved destination
             destination_for_speech = clean_destination if clean_destination else clean_address_for_speech(resolved_destination)
@@ -2438,22 +3162,17 @@ def process_booking():
     
     elif current_step == "time":
         # Process time
-        time_text = speech_data.lower().strip()
         time_string = ""
         valid_time = False
         
-        # Check for immediate booking
-        immediate_keywords = ["no", "now", "right now", "immediately", "asap", "as soon as possible", "straight away"]
-        if any(keyword in time_text for keyword in immediate_keywords):
+        # Immediate booking - "now"/"asap" as whole words, so "noon" and "no, tomorrow at 5pm" aren't ASAP
+        parsed_booking = extract_booking_time(speech_data)
+        if parsed_booking.get("pickup_time") == "ASAP":
             partial_booking["pickup_time"] = "ASAP"
-            partial_booking["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+            partial_booking["pickup_date"] = parsed_booking["pickup_date"]
             time_string = "right now"
             valid_time = True
         else:
-            # Parse time using existing logic
-
-            parsed_booking = parse_booking_speech(speech_data)
-            
             if parsed_booking.get("pickup_time"):
                 partial_booking["pickup_time"] = parsed_booking["pickup_time"]
                 formatted_time = format_time_for_speech(parsed_booking['pickup_time'])
@@ -2709,8 +3428,9 @@ def confirm_booking():
                     """INSERT INTO bookings 
                     (customer_phone, customer_name, pickup_location, dropoff_location, 
                         scheduled_time, status, booking_reference, raw_speech, 
-                        pickup_date, pickup_time, created_via) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                        pickup_date, pickup_time, created_via,
+                        pickup_lat, pickup_lng, dropoff_lat, dropoff_lng) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
                     (
                         caller_number,
                         booking_data["name"],
@@ -2723,6 +3443,8 @@ def confirm_booking():
                         booking_data.get("pickup_date", ""),
                         booking_data.get("pickup_time", ""),
                         "ai_ivr",
+                        *coords_to_lat_lng(booking_data.get("pickup_coords")),
+                        *coords_to_lat_lng(booking_data.get("destination_coords")),
                     ),
                 )
 
@@ -2810,6 +3532,7 @@ def confirm_booking():
 </Response>"""
 
             # Send scheduled bookings in background
+            @background_priority
             def background_api():
                 try:
                     print(f"📤 Background processing for scheduled booking...")
@@ -2911,6 +3634,8 @@ def modify_booking():
                     "pickup_time": db_booking["pickup_time"],
                     "status": db_booking["status"],
                     "booking_reference": db_booking["booking_reference"],
+                    "pickup_coords": coords_from_lat_lng(db_booking.get("pickup_lat"), db_booking.get("pickup_lng")),
+                    "destination_coords": coords_from_lat_lng(db_booking.get("dropoff_lat"), db_booking.get("dropoff_lng")),
                 }
 
             cur.close()
@@ -2959,7 +3684,7 @@ def modify_booking():
         response = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     
-    <Gather action="/modification_menu" method="POST" timeout="10" numDigits="1">
+    <Gather input="dtmf speech" action="/modification_menu" method="POST" timeout="10" numDigits="1" language="en-NZ" speechTimeout="1">
         <Say voice="Polly.Aria-Neural" language="en-NZ">
             Hello {name}, I found your booking.
             You have a taxi from {pickup} to {destination} {time_str}.
@@ -2968,6 +3693,7 @@ def modify_booking():
             Press 2 for changing pickup location.
             Press 3 for changing destination.
             Press 4 for cancel the booking.
+            Or just tell me what you would like to change.
         </Say>
     </Gather>
     <Redirect>/modify_booking</Redirect>
@@ -3043,12 +3769,34 @@ def modification_menu():
     digits = request.form.get("Digits", "")
     call_sid = request.form.get("CallSid", "")
     caller_number = request.form.get("From", "")
+    speech_result = request.form.get("SpeechResult", "")
 
-    print(f"📞 Modification menu selection: {digits}")
+    print(f"📞 Modification menu selection: {digits or speech_result}")
 
     # Store the selection in session for later use
     if call_sid not in user_sessions:
         user_sessions[call_sid] = {}
+
+    if not digits and speech_result:
+        # Spoken request ("go to the airport instead") - map it onto the menu
+        booking = user_sessions[call_sid].get("modifying_booking", {})
+        intent = extract_modification_intent_with_ai(speech_result, booking, caller_number) or {}
+        digits = {
+            "change_time": "1",
+            "change_pickup": "2",
+            "change_destination": "3",
+            "cancel": "4",
+        }.get(intent.get("intent"), "")
+        if intent.get("intent") == "no_change":
+            response = """<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Aria-Neural" language="en-NZ">
+        No worries, your booking stays as it is. Have a great day!
+    </Say>
+    <Hangup/>
+</Response>"""
+            return Response(response, mimetype="text/xml")
+
     user_sessions[call_sid]["modification_type"] = digits
 
     if digits == "1":
@@ -3225,10 +3973,22 @@ def process_pickup_modification():
     # Get original booking from session
     session_data = user_sessions.get(call_sid, {})
     original_booking = session_data.get("modifying_booking", {})
+    speech_result = offered_address_choice(session_data, speech_result) or speech_result
 
     if not original_booking:
         return redirect_to("/modify_booking")
 
+    # Same phrase rejected a moment ago - re-prompt without another LLM/geocode trip
+    rejection = rejected_address(speech_result)
+    if rejection is not None:
+        print(f"⚡ Negative cache hit: {speech_result}")
+        return address_reprompt_response(
+            "Could you please tell me your new pickup address again?",
+            "/process_pickup_modification",
+            rejection.get("suggestions"),
+            redirect_url="/modify_booking",
+        )
+
     # Parse address to get clean and full versions
     try:
         clean_address, full_address = parse_address(speech_result)
@@ -3239,30 +3999,29 @@ def process_pickup_modification():
         resolved_pickup = resolve_wellington_poi_to_address(address_to_resolve)
 
         if(resolved_pickup == False):
-            response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Aria-Neural" language="en-NZ">
-        Sorry, Address not recognized. Could you please tell me your new pickup address again?
-    </Say>
-    <Gather input="speech" action="/process_pickup_modification" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
-        <Say voice="Polly.Aria-Neural" language="en-NZ">I am listening.</Say>
-    </Gather>
-    <Redirect>/modify_booking</Redirect>
-</Response>"""
-            return Response(response, mimetype="text/xml")
+            suggestions = remember_rejected_address(speech_result, resolved_query=address_to_resolve)
+            return address_reprompt_response(
+                "Could you please tell me your new pickup address again?",
+                "/process_pickup_modification",
+                suggestions,
+                redirect_url="/modify_booking",
+            )
 
         # Get the actual address string for storage and clean address for speech
         if isinstance(resolved_pickup, dict):
             exact_address = resolved_pickup.get("full_address", address_to_resolve)
             speech_address = clean_address if clean_address else resolved_pickup.get("speech", exact_address)
+            pickup_coords = resolved_pickup.get("coords")
         else:
             exact_address = resolved_pickup if resolved_pickup else address_to_resolve
             speech_address = clean_address if clean_address else clean_address_for_speech(exact_address)
+            pickup_coords = None
 
-        # Update booking
+        # Update booking (always overwrite coords so the old pickup's aren't reused)
         updated_booking = original_booking.copy()
         updated_booking["pickup_address"] = exact_address
         updated_booking["pickup_address_clean"] = speech_address
+        updated_booking["pickup_coords"] = pickup_coords
 
         # Save updated booking
         update_booking_to_db(caller_number, updated_booking)
@@ -3312,10 +4071,22 @@ def process_destination_modification():
     # Get original booking from session
     session_data = user_sessions.get(call_sid, {})
     original_booking = session_data.get("modifying_booking", {})
+    speech_result = offered_address_choice(session_data, speech_result) or speech_result
 
     if not original_booking:
         return redirect_to("/modify_booking")
 
+    # Same phrase rejected a moment ago - re-prompt without another LLM/geocode trip
+    rejection = rejected_address(speech_result)
+    if rejection is not None:
+        print(f"⚡ Negative cache hit: {speech_result}")
+        return address_reprompt_response(
+            "Could you please tell me your new destination again?",
+            "/process_destination_modification",
+            rejection.get("suggestions"),
+            redirect_url="/modify_booking",
+        )
+
     # Parse address to get clean and full versions
     try:
         clean_address, full_address = parse_address(speech_result)
@@ -3326,30 +4097,29 @@ def process_destination_modification():
         resolved_destination = resolve_wellington_poi_to_address(address_to_resolve)
 
         if(resolved_destination == False):
-            response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Aria-Neural" language="en-NZ">
-        Sorry, Address not recognized. Could you please tell me your new destination again?
-    </Say>
-    <Gather input="speech" action="/process_destination_modification" method="POST" timeout="15" language="en-NZ" speechTimeout="1">
-        <Say voice="Polly.Aria-Neural" language="en-NZ">I am listening.</Say>
-    </Gather>
-    <Redirect>/modify_booking</Redirect>
-</Response>"""
-            return Response(response, mimetype="text/xml")
+            suggestions = remember_rejected_address(speech_result, resolved_query=address_to_resolve)
+            return address_reprompt_response(
+                "Could you please tell me your new destination again?",
+                "/process_destination_modification",
+                suggestions,
+                redirect_url="/modify_booking",
+            )
 
         # Get the actual address string for storage and clean address for speech
         if isinstance(resolved_destination, dict):
             exact_address = resolved_destination.get("full_address", address_to_resolve)
             speech_address = clean_address if clean_address else resolved_destination.get("speech", exact_address)
+            destination_coords = resolved_destination.get("coords")
         else:
             exact_address = resolved_destination if resolved_destination else address_to_resolve
             speech_address = clean_address if clean_address else clean_address_for_speech(exact_address)
+            destination_coords = None
 
-        # Update booking
+        # Update booking (always overwrite coords so the old destination's aren't reused)
         updated_booking = original_booking.copy()
         updated_booking["destination"] = exact_address
         updated_booking["destination_clean"] = speech_address
+        updated_booking["destination_coords"] = destination_coords
 
         # Save updated booking
         update_booking_to_db(caller_number, updated_booking)
@@ -0,0 +1,122 @@
+"""
+Benchmark TaxiCaller route payload size and JSON serialisation time with and
+without route simplification.
+
+    python bench_route_payload.py                 # synthetic Hutt-length routes
+    GOOGLE_MAPS_API_KEY=... python bench_route_payload.py --google
+
+Payload nodes/pts are built the same way send_booking_to_taxicaller does.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+from array import array
+
+from route_geometry import (
+    decode_polyline_flat, simplify_route, point_at, point_count,
+    ROUTE_SIMPLIFY_TOLERANCE_M, ROUTE_MAX_POINTS,
+)
+
+TRIPS = [
+    ("Wellington Railway Station", "Upper Hutt Station"),
+    ("Wellington Airport", "Petone"),
+    ("Courtenay Place", "Wellington Hospital"),
+]
+
+
+def synthetic_route(points, seed, start=(174.7806, -41.2790), heading=40, step_m=60):
+    """Wiggly road-like flat route [lng*1e6, lat*1e6, ...]"""
+    rng = random.Random(seed)
+    lng, lat = start
+    coords = array("i")
+    for _ in range(points):
+        heading += rng.gauss(0, 12)
+        rad = math.radians(heading)
+        lat += step_m * math.cos(rad) / 111320
+        lng += step_m * math.sin(rad) / (111320 * math.cos(math.radians(lat)))
+        coords.append(int(lng * 1e6))
+        coords.append(int(lat * 1e6))
+    return coords
+
+
+def google_routes():
+    import googlemaps
+
+    gmaps = googlemaps.Client(key=os.environ["GOOGLE_MAPS_API_KEY"])
+    routes = []
+    for origin, destination in TRIPS:
+        directions = gmaps.directions(
+            origin=f"{origin}, Wellington, New Zealand",
+            destination=f"{destination}, Wellington, New Zealand",
+            mode="driving",
+            region="nz",
+        )
+        points = decode_polyline_flat(directions[0]["overview_polyline"]["points"])
+        routes.append((f"{origin} → {destination}", points))
+    return routes
+
+
+def build_payload(route_points):
+    nodes = [{
+        "actions": [{"@type": "client_action", "item_seq": 0, "action": "in"}],
+        "location": {"name": "Pickup", "coords": point_at(route_points, 0)},
+        "times": {"arrive": {"target": 0}},
+        "info": {"all": ""},
+        "seq": 0,
+    }]
+    for i in range(1, point_count(route_points) - 1):
+        nodes.append({
+            "actions": [],
+            "location": {"name": f"Waypoint {i}", "coords": point_at(route_points, i)},
+            "times": {"arrive": {"target": 0}},
+            "info": {"all": ""},
+            "seq": i,
+        })
+    nodes.append({
+        "actions": [{"@type": "client_action", "item_seq": 0, "action": "out"}],
+        "location": {"name": "Dropoff", "coords": point_at(route_points, -1)},
+        "times": {"arrive": {"target": 0}},
+        "info": {"all": ""},
+        "seq": len(nodes),
+    })
+    pts = route_points.tolist()
+    return {"order": {"route": {"nodes": nodes, "legs": [{"pts": pts, "from_seq": 0, "to_seq": len(nodes) - 1}]}}}
+
+
+def measure(route_points, repeat=200):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = json.dumps(build_payload(route_points))
+    build_ms = (time.perf_counter() - started) * 1000 / repeat
+    return len(body.encode()), build_ms
+
+
+def main():
+    if "--google" in sys.argv:
+        routes = google_routes()
+    else:
+        routes = [(f"synthetic {n} points", synthetic_route(n, seed=n)) for n in (150, 400, 900)]
+
+    print(f"Tolerance {ROUTE_SIMPLIFY_TOLERANCE_M}m, max {ROUTE_MAX_POINTS} points\n")
+    print(f"{'route':<40} {'points':>13} {'bytes':>17} {'build+dumps ms':>16} {'simplify ms':>12}")
+    for label, route_points in routes:
+        before_bytes, before_ms = measure(route_points)
+
+        started = time.perf_counter()
+        for _ in range(50):
+            simplified = simplify_route(route_points)
+        simplify_ms = (time.perf_counter() - started) * 1000 / 50
+
+        after_bytes, after_ms = measure(simplified)
+        print(
+            f"{label:<40} {point_count(route_points):>5} → {point_count(simplified):<5} "
+            f"{before_bytes:>7} → {after_bytes:<7} {before_ms:>6.2f} → {after_ms:<6.2f} {simplify_ms:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark booking speech parsing before and after the single-pass
+speech_tokenizer.
+
+    python bench_speech_parser.py
+
+"before" is the keyword/regex extraction the time step and
+parse_booking_speech used to run (copied below, without the Google
+validation); "after" is speech_tokenizer.booking_time(), which
+extract_booking_time now calls, and slot_spans() plus booking_time() off one
+tokenize() pass, as parse_booking_speech does. Prints the per-utterance cost
+of each (best of several runs) and every utterance whose time is read
+differently.
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import speech_tokenizer
+
+NZ_TZ = ZoneInfo("Pacific/Auckland")
+
+# What callers actually say at the time step, or alongside an address
+CORPUS = [
+    "right now",
+    "as soon as possible",
+    "now please",
+    "straight away thanks",
+    "tomorrow at 5 pm",
+    "tomorrow morning at 7:30 am",
+    "today at 3pm",
+    "in 20 minutes",
+    "in 2 hours",
+    "in half an hour",
+    "at noon",
+    "tomorrow at noon",
+    "the day after tomorrow at 10am",
+    "on the 25th at 6 p.m.",
+    "tonight at 1030pm",
+    "this evening around 7 pm",
+    "no, tomorrow at 5pm",
+    "I don't know, maybe around 5 pm",
+    "at 9 am on the 3rd",
+    "could you make it 6:15 p.m. today",
+    "from 2 Kent Terrace to the airport tomorrow at 6 am",
+    "from 10 Lambton Quay going to Wellington Railway Station at 4:45 pm thanks",
+    "I need a taxi from 5 Oriental Parade to Hutt Hospital in 30 minutes",
+    "my flight is at 8 so pick me up at 5:30 am",
+    "later today, about 4pm",
+]
+
+
+def legacy_booking_time(speech_text):
+    time_data = {"pickup_date": "", "pickup_time": ""}
+
+    immediate_keywords = [
+        "no", "right now", "now", "asap", "as soon as possible", "immediately", "straight away",
+    ]
+    tomorrow_keywords = [
+        "tomorrow morning", "tomorrow afternoon", "tomorrow evening", "tomorrow night", "tomorrow",
+    ]
+    today_keywords = [
+        "tonight", "today", "later today", "this afternoon", "this evening", "this morning",
+    ]
+    after_tomorrow_keywords = [
+        "after tomorrow", "day after tomorrow", "2 days", "two days"
+    ]
+
+    date_pattern = r"(\d{1,2})(?:st|nd|rd|th)"
+    date_match = re.search(date_pattern, speech_text)
+
+    if any(keyword in speech_text.lower() for keyword in immediate_keywords):
+        current_time = datetime.now(NZ_TZ)
+        time_data["pickup_date"] = current_time.strftime("%d/%m/%Y")
+        time_data["pickup_time"] = "ASAP"
+    elif any(keyword in speech_text.lower() for keyword in after_tomorrow_keywords):
+        after_tomorrow = datetime.now(NZ_TZ) + timedelta(days=2)
+        time_data["pickup_date"] = after_tomorrow.strftime("%d/%m/%Y")
+    elif any(keyword in speech_text.lower() for keyword in tomorrow_keywords):
+        tomorrow = datetime.now(NZ_TZ) + timedelta(days=1)
+        time_data["pickup_date"] = tomorrow.strftime("%d/%m/%Y")
+    elif date_match:
+        day = int(date_match.group(1))
+        current_date = datetime.now(NZ_TZ)
+        current_month = current_date.month
+        current_year = current_date.year
+        if day < current_date.day:
+            if current_month == 12:
+                current_month = 1
+                current_year += 1
+            else:
+                current_month += 1
+        time_data["pickup_date"] = datetime(current_year, current_month, day).strftime("%d/%m/%Y")
+    elif any(keyword in speech_text.lower() for keyword in today_keywords):
+        today = datetime.now(NZ_TZ)
+        time_data["pickup_date"] = today.strftime("%d/%m/%Y")
+
+    time_patterns = [
+        r"in\s+(\d+)\s+minutes?",
+        r"in\s+(\d+)\s+hours?",
+        r"time\s+(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
+        r"at\s+(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
+        r"(\d{1,2}:?\d{0,2}\s*(?:am|pm|a\.?m\.?|p\.?m\.?))",
+    ]
+
+    if any(phrase in speech_text.lower() for phrase in ["half hour", "half an hour", "30 minutes"]):
+        booking_time = datetime.now(NZ_TZ) + timedelta(minutes=30)
+        time_data["pickup_time"] = booking_time.strftime('%H:%M')
+        time_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+    elif any(phrase in speech_text.lower() for phrase in ["midday", "noon", "12 noon", "12 midday"]):
+        time_data["pickup_time"] = "12:00"
+        if not time_data.get("pickup_date"):
+            time_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+    elif not any(keyword in speech_text.lower() for keyword in immediate_keywords):
+        for pattern in time_patterns:
+            match = re.search(pattern, speech_text, re.IGNORECASE)
+            if match:
+                if pattern == r"in\s+(\d+)\s+minutes?":
+                    booking_time = datetime.now(NZ_TZ) + timedelta(minutes=int(match.group(1)))
+                    time_data["pickup_time"] = booking_time.strftime('%H:%M')
+                    time_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+                    break
+                elif pattern == r"in\s+(\d+)\s+hours?":
+                    booking_time = datetime.now(NZ_TZ) + timedelta(hours=int(match.group(1)))
+                    time_data["pickup_time"] = booking_time.strftime('%H:%M')
+                    time_data["pickup_date"] = datetime.now(NZ_TZ).strftime("%d/%m/%Y")
+                    break
+                else:
+                    time_str = match.group(1).strip()
+                    time_str = re.sub(r"\s*([ap])\.?\s*m\.?$", lambda m: f" {m.group(1).upper()}M", time_str, flags=re.IGNORECASE)
+                    if ":" not in time_str and any(x in time_str for x in ["AM", "PM"]):
+                        time_str = time_str.replace(" AM", ":00 AM").replace(" PM", ":00 PM")
+                    if "PM" in time_str:
+                        hour_part = time_str.split(":")[0].strip()
+                        minute_part = time_str.split(":")[1].replace("PM", "").strip() if ":" in time_str else "00"
+                        hour = int(hour_part)
+                        if hour != 12:
+                            hour += 12
+                        time_str = f"{hour:02d}:{minute_part}"
+                    elif "AM" in time_str:
+                        hour_part = time_str.split(":")[0].strip()
+                        minute_part = time_str.split(":")[1].replace("AM", "").strip() if ":" in time_str else "00"
+                        hour = int(hour_part)
+                        if hour == 12:
+                            hour = 0
+                        time_str = f"{hour:02d}:{minute_part}"
+                    time_data["pickup_time"] = time_str
+                    break
+
+    return time_data
+
+
+_LEGACY_NAME_PATTERNS = [r"my name is\s+([^,]+)", r"i'm\s+([^,]+)", r"i am\s+([^,]+)", r"it's\s+([^,]+)"]
+_LEGACY_PICKUP_PATTERNS = [
+    r"(?:from|pick up from|pickup from)\s+(?:number\s+)?([^,]+?)(?:\s+(?:to|going|I'm|I am|and))",
+    r"(?:from|pick up from|pickup from)\s+(?:number\s+)?([^,]+)$",
+]
+_LEGACY_DESTINATION_PATTERNS = [
+    r"(?:going to|to)\s+(railway station|train station|station)",
+    r"I am going to\s+(?:the\s+)?([^,]+?)(?:\s+(?:at\s+\d{1,2}|thank))",
+    r"I'm going to\s+(?:the\s+)?([^,]+?)(?:\s+(?:at\s+\d{1,2}|thank))",
+    r"(?:to|going to|going)\s+(?:the\s+)?([^,]+?)(?:\s+(?:tomorrow|today|tonight|at|\d{1,2}:|on|date|right now|now))",
+    r"(?:to|going to|going)\s+([^,]+?)(?:\s+(?:tomorrow|today|tonight|at|\d{1,2}:|on|date|right now|now))",
+    r"(?:to|going to|going)\s+(?:number\s+)?(\d+\s+.+)$",
+    r"(?:to|going to|going)\s+(.+)$",
+]
+
+
+def legacy_booking_slots(speech_text):
+    """The old parse_booking_speech name/pickup/destination regexes, then the time"""
+    slots = {}
+    for name, patterns in (
+        ("name", _LEGACY_NAME_PATTERNS),
+        ("pickup", _LEGACY_PICKUP_PATTERNS),
+        ("destination", _LEGACY_DESTINATION_PATTERNS),
+    ):
+        for pattern in patterns:
+            match = re.search(pattern, speech_text, re.IGNORECASE)
+            if match:
+                slots[name] = match.group(1).strip()
+                break
+    slots.update(legacy_booking_time(speech_text))
+    return slots
+
+
+def tokenizer_booking_time(speech_text):
+    return speech_tokenizer.booking_time(speech_text, datetime.now(NZ_TZ))
+
+
+def tokenizer_booking_slots(speech_text):
+    tokens = speech_tokenizer.tokenize(speech_text)
+    slots = {slot: span[2] for slot, span in speech_tokenizer.slot_spans(speech_text, tokens).items()}
+    slots.update(speech_tokenizer.booking_time(speech_text, datetime.now(NZ_TZ), tokens))
+    return slots
+
+
+def measure(parse, repeat=300, runs=5):
+    """Best-of-runs microseconds per utterance over the whole corpus"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for utterance in CORPUS:
+                parse(utterance)
+        elapsed = (time.perf_counter() - started) * 1e6 / (repeat * len(CORPUS))
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    # Warm up the re module cache so "before" isn't charged for compiling
+    for utterance in CORPUS:
+        legacy_booking_slots(utterance)
+        tokenizer_booking_slots(utterance)
+
+    print(f"{len(CORPUS)} utterances\n")
+    print(f"{'':<16} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    for label, before, after in (
+        ("pickup date/time", legacy_booking_time, tokenizer_booking_time),
+        ("slots + time", legacy_booking_slots, tokenizer_booking_slots),
+    ):
+        before_us, after_us = measure(before), measure(after)
+        print(f"{label:<16} {before_us:>10.1f} {after_us:>10.1f} {before_us / after_us:>7.1f}x")
+
+    changed = [(u, legacy_booking_time(u), tokenizer_booking_time(u)) for u in CORPUS]
+    changed = [(u, old, new) for u, old, new in changed if old != new]
+    print(f"\n{len(changed)} utterances read differently:")
+    for utterance, old, new in changed:
+        print(f"  '{utterance}'")
+        for key in old:
+            if old[key] != new[key]:
+                print(f"      {key}: {old[key]!r} → {new[key]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,9 +25,19 @@ CREATE TABLE IF NOT EXISTS bookings (
     pickup_date VARCHAR(20),
     order_id VARCHAR(20),
     pickup_time VARCHAR(20),
-    created_via VARCHAR(20) DEFAULT 'ai_ivr'
+    created_via VARCHAR(20) DEFAULT 'ai_ivr',
+    pickup_lat DOUBLE PRECISION,
+    pickup_lng DOUBLE PRECISION,
+    dropoff_lat DOUBLE PRECISION,
+    dropoff_lng DOUBLE PRECISION
 );
 
+-- Existing databases: add the geocoded trip ends used by the "same as last time" fast path
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS pickup_lat DOUBLE PRECISION;
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS pickup_lng DOUBLE PRECISION;
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS dropoff_lat DOUBLE PRECISION;
+ALTER TABLE bookings ADD COLUMN IF NOT EXISTS dropoff_lng DOUBLE PRECISION;
+
 CREATE INDEX IF NOT EXISTS idx_bookings_phone ON bookings(customer_phone);
 CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
 CREATE INDEX IF NOT EXISTS idx_bookings_booking_time ON bookings(booking_time);
@@ -0,0 +1,156 @@
+"""
+Local trip distance/ETA estimator for Kiwi Cabs AI IVR
+Straight-line (haversine) distance times a road circuity factor, at a typical
+speed for the weekday/weekend and time-of-day band. Used when Google can't
+give us a route, so TaxiCaller orders don't all go out as 5 km / 10 minutes.
+
+The circuity factor and band speeds are calibrated from the routes Google has
+already given us (the shared route cache) with `python eta_estimator.py calibrate`.
+"""
+
+import os
+import sys
+import json
+import math
+import threading
+from datetime import datetime
+from statistics import median
+from zoneinfo import ZoneInfo
+
+from shared_cache import cache_items
+
+ETA_MODEL_PATH = os.getenv("ETA_MODEL_PATH", "/tmp/kiwi_cabs_eta_model.json")
+# Trips shorter than this (estimated road metres) skip Directions altogether; 0 = never
+ETA_SKIP_DIRECTIONS_UNDER_M = float(os.getenv("ETA_SKIP_DIRECTIONS_UNDER_M", "0"))
+# A band needs this many routes before its calibrated speed replaces the default
+MIN_CALIBRATION_SAMPLES = 5
+
+NZ_ZONE = ZoneInfo("Pacific/Auckland")
+EARTH_RADIUS_M = 6371000
+
+# Wellington defaults until calibrated: circuity and average km/h per band
+DEFAULT_MODEL = {
+    "circuity": 1.35,
+    "speeds_kmh": {
+        "wd-night": 45, "wd-am": 24, "wd-day": 30, "wd-pm": 23, "wd-eve": 36,
+        "we-night": 45, "we-am": 34, "we-day": 30, "we-pm": 30, "we-eve": 36,
+    },
+    "samples": 0,
+}
+
+_lock = threading.Lock()
+_model = None
+
+
+def time_bucket(departure=None):
+    """Weekday/weekend plus traffic band, e.g. "wd-am" for a weekday morning peak"""
+    departure = departure or datetime.now(NZ_ZONE)
+    day = "we" if departure.weekday() >= 5 else "wd"
+    hour = departure.hour
+    if hour < 6:
+        band = "night"
+    elif hour < 10:
+        band = "am"
+    elif hour < 15:
+        band = "day"
+    elif hour < 19:
+        band = "pm"
+    else:
+        band = "eve"
+    return f"{day}-{band}"
+
+
+def haversine_m(from_coords, to_coords):
+    """Great-circle metres between two [lng*1e6, lat*1e6] points"""
+    lng1, lat1 = math.radians(from_coords[0] / 1000000), math.radians(from_coords[1] / 1000000)
+    lng2, lat2 = math.radians(to_coords[0] / 1000000), math.radians(to_coords[1] / 1000000)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _get_model():
+    global _model
+    if _model is not None:
+        return _model
+    with _lock:
+        if _model is None:
+            model = json.loads(json.dumps(DEFAULT_MODEL))
+            try:
+                with open(ETA_MODEL_PATH) as f:
+                    saved = json.load(f)
+                model["circuity"] = saved.get("circuity", model["circuity"])
+                model["speeds_kmh"].update(saved.get("speeds_kmh", {}))
+                model["samples"] = saved.get("samples", 0)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"⚠️ ETA model not loaded, using defaults: {e}")
+            _model = model
+    return _model
+
+
+def estimate_trip(pickup_coords, dropoff_coords, departure=None):
+    """(distance_m, duration_s) estimate between two [lng*1e6, lat*1e6] points"""
+    model = _get_model()
+    distance = haversine_m(pickup_coords, dropoff_coords) * model["circuity"]
+    speed_kmh = model["speeds_kmh"].get(time_bucket(departure), 30)
+    # Even a next-door trip takes a minute or two
+    duration = max(60, distance / (speed_kmh / 3.6))
+    return int(distance), int(duration)
+
+
+def calibrate():
+    """Fit circuity and band speeds to the cached Google routes and save the model"""
+    global _model
+    circuities = []
+    speeds = {}
+    for key, value in cache_items("route"):
+        # [distance, duration, points, start_coords, end_coords] keyed "...@wd-am"
+        if len(value) < 5 or not value[3] or not value[4] or "@" not in key:
+            continue
+        distance, duration, _, start_coords, end_coords = value[:5]
+        straight = haversine_m(start_coords, end_coords)
+        if straight < 200 or not duration:
+            continue
+        circuities.append(distance / straight)
+        speeds.setdefault(key.rsplit("@", 1)[1], []).append(distance / duration * 3.6)
+
+    model = json.loads(json.dumps(DEFAULT_MODEL))
+    if circuities:
+        model["circuity"] = round(median(circuities), 3)
+    for bucket, values in speeds.items():
+        if len(values) >= MIN_CALIBRATION_SAMPLES:
+            model["speeds_kmh"][bucket] = round(median(values), 1)
+    model["samples"] = len(circuities)
+
+    try:
+        with open(ETA_MODEL_PATH, "w") as f:
+            json.dump(model, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ ETA model not saved: {e}")
+    with _lock:
+        _model = model
+    print(f"✅ ETA model calibrated from {len(circuities)} routes: circuity {model['circuity']}")
+    return model
+
+
+def model_info():
+    return _get_model()
+
+
+if __name__ == "__main__":
+    # python eta_estimator.py calibrate
+    # python eta_estimator.py estimate <lng> <lat> <lng> <lat>
+    command = sys.argv[1] if len(sys.argv) > 1 else "calibrate"
+
+    if command == "calibrate":
+        print(json.dumps(calibrate(), indent=2))
+    elif command == "estimate" and len(sys.argv) == 6:
+        lng1, lat1, lng2, lat2 = (float(value) for value in sys.argv[2:])
+        distance, duration = estimate_trip(
+            [int(lng1 * 1000000), int(lat1 * 1000000)], [int(lng2 * 1000000), int(lat2 * 1000000)]
+        )
+        print(f"{distance} m, {duration} s")
+    else:
+        print("Usage: python eta_estimator.py calibrate | estimate <lng> <lat> <lng> <lat>")
+        sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Evaluate the local modification intent classifier on utterances it wasn't
+trained on: data/intent_eval.csv plus the logged utterances
+train_intent_classifier.py holds out.
+
+    DATABASE_URL=... python eval_intent_classifier.py     # + held-out LLM-labelled calls
+    python eval_intent_classifier.py --csv labelled.csv   # text,intent,new_value
+
+Anything that also appears in the training examples is dropped, and with
+nothing left to evaluate it exits with an error rather than report a score.
+
+Reports intent accuracy (overall and for the answers confident enough to skip
+the LLM), value accuracy, how often the LLM would still be asked, per-intent
+precision/recall and the time per classification.
+"""
+
+import os
+import sys
+import time
+
+import intent_classifier
+from train_intent_classifier import load_logged_examples, is_held_out
+
+
+def load_eval_examples():
+    if "--csv" in sys.argv:
+        return intent_classifier.load_examples(sys.argv[sys.argv.index("--csv") + 1])
+
+    examples = []
+    if os.path.exists(intent_classifier.INTENT_EVAL_CSV):
+        examples = intent_classifier.load_examples(intent_classifier.INTENT_EVAL_CSV)
+    try:
+        examples += [example for example in load_logged_examples() if is_held_out(example[0])]
+    except Exception as e:
+        print(f"⚠️ Logged utterances not loaded: {e}")
+    return examples
+
+
+def main():
+    examples = load_eval_examples()
+    trained_on = {intent_classifier.normalize(text) for text, _, _ in intent_classifier.load_examples()}
+    unseen = [example for example in examples if intent_classifier.normalize(example[0]) not in trained_on]
+    if len(unseen) < len(examples):
+        print(f"⚠️ Dropped {len(examples) - len(unseen)} utterances that are also training examples")
+    examples = unseen
+    if not examples:
+        print(f"❌ Nothing unseen to evaluate - add labelled utterances to {intent_classifier.INTENT_EVAL_CSV}, "
+              "set DATABASE_URL for held-out logged ones, or pass --csv with examples the model wasn't trained on")
+        return 1
+
+    threshold = intent_classifier.INTENT_CONFIDENCE
+    correct = confident = confident_correct = value_correct = value_total = 0
+    counts = {intent: {"tp": 0, "fp": 0, "fn": 0} for intent in intent_classifier.INTENTS}
+    mistakes = []
+
+    intent_classifier.classify("warm up")
+    started = time.perf_counter()
+    results = [intent_classifier.classify(text) for text, _, _ in examples]
+    per_call_us = (time.perf_counter() - started) * 1000000 / max(len(examples), 1)
+
+    for (text, intent, new_value), result in zip(examples, results):
+        predicted = result["intent"]
+        if predicted == intent:
+            correct += 1
+            counts[intent]["tp"] += 1
+            if new_value:
+                value_total += 1
+                value_correct += intent_classifier.normalize(result["new_value"] or "") == intent_classifier.normalize(new_value)
+        else:
+            counts[intent]["fn"] += 1
+            counts[predicted]["fp"] += 1
+            mistakes.append((text, intent, result))
+        if result["confidence"] >= threshold:
+            confident += 1
+            confident_correct += predicted == intent
+
+    total = len(examples)
+    print(f"Utterances:            {total}")
+    print(f"Intent accuracy:       {correct / total:.1%}")
+    print(f"Handled locally:       {confident / total:.1%} (confidence >= {threshold})")
+    print(f"  accuracy when local: {confident_correct / confident:.1%}" if confident else "  accuracy when local: -")
+    print(f"LLM fallback rate:     {1 - confident / total:.1%}")
+    print(f"Value accuracy:        {value_correct / value_total:.1%} of {value_total}" if value_total else "Value accuracy:        -")
+    print(f"Time per utterance:    {per_call_us:.1f} µs\n")
+
+    print(f"{'intent':<20} {'precision':>9} {'recall':>7}")
+    for intent, c in counts.items():
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+        recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+        print(f"{intent:<20} {precision:>9.1%} {recall:>7.1%}")
+
+    if mistakes:
+        print("\nMistakes:")
+        for text, intent, result in mistakes[:20]:
+            print(f"  '{text}': expected {intent}, got {result['intent']} ({result['confidence']}, {result['source']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+"""
+Offline Wellington gazetteer for Kiwi Cabs AI IVR
+Resolves ordinary street addresses and well-known landmarks locally so most
+pickup/destination turns don't need a paid Google geocode.
+
+The index is a single read-only binary file, memory-mapped on first use so
+every gunicorn worker shares the same pages. Build it with:
+
+    python gazetteer.py build [--addresses nz-addresses.csv]
+
+--addresses takes the LINZ "NZ Addresses" CSV export; rows outside the
+Wellington region are skipped. Without it only the seed streets, suburbs
+and POIs in data/ are indexed (streets then have no house-number points and
+fall through to Google).
+"""
+
+import os
+import re
+import csv
+import sys
+import mmap
+import bisect
+import struct
+import threading
+
+from shared_cache import canonicalize_query
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", os.path.join(DATA_DIR, "wellington_gazetteer.idx")
+)
+POIS_CSV = os.path.join(DATA_DIR, "wellington_pois.csv")
+SUBURBS_CSV = os.path.join(DATA_DIR, "wellington_suburbs.csv")
+STREETS_CSV = os.path.join(DATA_DIR, "wellington_streets.csv")
+
+REGION_CITIES = ["wellington", "lower hutt", "upper hutt", "porirua"]
+
+# File layout: header | key records (sorted) | point records | string blob
+_MAGIC = b"KCGZ0001"
+_HEADER = struct.Struct("<8sIIIIII")
+# key_off, key_len, kind, first_point, n_points, label_off, label_len
+_KEY = struct.Struct("<IHBxIIIH2x")
+# house number, lat*1e6, lng*1e6
+_POINT = struct.Struct("<iii")
+
+KIND_STREET = 0
+KIND_POI = 1
+KIND_SUBURB = 2
+_KIND_PREFIX = {KIND_STREET: "s:", KIND_POI: "p:", KIND_SUBURB: "b:"}
+
+_ADDRESS_RE = re.compile(
+    r"^(?:(?:unit|flat|apartment)\s+(?P<unit_word>\w+)\s+(?:at\s+)?)?"
+    r"(?:(?P<unit>\w+)/)?(?P<number>\d+)(?P<suffix>[a-z])?\s+(?P<rest>.+)$"
+)
+
+_lock = threading.Lock()
+_index = None
+
+
+# ---------------------------------------------------------------- building
+
+def _norm(text):
+    return canonicalize_query(text)
+
+
+def build_gazetteer(out_path=GAZETTEER_PATH, addresses_csv=None):
+    """Compile the seed CSVs (plus an optional LINZ address export) into the binary index"""
+    suburbs = {}
+    with open(SUBURBS_CSV, newline="") as f:
+        for row in csv.DictReader(f):
+            suburbs[_norm(row["suburb"])] = (row["suburb"], row["city"], row["postcode"])
+
+    # street key -> {"label": ..., "points": {number: (lat_e6, lng_e6)}}
+    streets = {}
+
+    def add_street(street, suburb):
+        suburb_info = suburbs.get(_norm(suburb), (suburb, "Wellington", ""))
+        key = f"{_norm(street)}|{_norm(suburb)}"
+        if key not in streets:
+            streets[key] = {
+                "label": "|".join([street, suburb_info[0], suburb_info[1], suburb_info[2]]),
+                "points": {},
+            }
+        return streets[key]
+
+    with open(STREETS_CSV, newline="") as f:
+        for row in csv.DictReader(f):
+            add_street(row["street"], row["suburb"])
+
+    if addresses_csv:
+        kept = 0
+        with open(addresses_csv, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                town = (row.get("town_city") or "").strip()
+                suburb = (row.get("suburb_locality") or "").strip()
+                if _norm(town) not in REGION_CITIES and _norm(suburb) not in suburbs:
+                    continue
+                # Unit rows repeat the parent address point
+                if (row.get("unit_value") or "").strip():
+                    continue
+                try:
+                    number = int(row["address_number"])
+                    lng = float(row["gd2000_xcoord"])
+                    lat = float(row["gd2000_ycoord"])
+                except (KeyError, ValueError):
+                    continue
+                entry = add_street(row["full_road_name"].strip(), suburb or town)
+                entry["points"].setdefault(number, (int(lat * 1000000), int(lng * 1000000)))
+                kept += 1
+        print(f"📥 Imported {kept} address points from {addresses_csv}")
+
+    records = []  # (prefixed key, kind, points, label)
+
+    for key, entry in streets.items():
+        points = sorted((n, lat, lng) for n, (lat, lng) in entry["points"].items())
+        records.append((_KIND_PREFIX[KIND_STREET] + key, KIND_STREET, points, entry["label"]))
+
+    # Street names that only exist in one suburb can be found without the suburb
+    by_name = {}
+    for key in streets:
+        by_name.setdefault(key.split("|")[0], []).append(key)
+    for name, keys in by_name.items():
+        if len(keys) == 1:
+            entry = streets[keys[0]]
+            points = sorted((n, lat, lng) for n, (lat, lng) in entry["points"].items())
+            records.append((_KIND_PREFIX[KIND_STREET] + f"{name}|*", KIND_STREET, points, entry["label"]))
+
+    seen_pois = set()
+    with open(POIS_CSV, newline="") as f:
+        for row in csv.DictReader(f):
+            point = [(0, int(float(row["lat"]) * 1000000), int(float(row["lng"]) * 1000000))]
+            label = f"{row['name']}|{row['formatted_address']}"
+            names = [row["name"]] + [a for a in (row.get("aliases") or "").split(";") if a.strip()]
+            for name in names:
+                key = _KIND_PREFIX[KIND_POI] + _norm(name)
+                if key in seen_pois:
+                    continue
+                seen_pois.add(key)
+                records.append((key, KIND_POI, point, label))
+
+    for key, (suburb, city, postcode) in suburbs.items():
+        records.append((_KIND_PREFIX[KIND_SUBURB] + key, KIND_SUBURB, [], f"{suburb}|{city}|{postcode}"))
+    for city in REGION_CITIES:
+        if _KIND_PREFIX[KIND_SUBURB] + city not in {r[0] for r in records}:
+            records.append((_KIND_PREFIX[KIND_SUBURB] + city, KIND_SUBURB, [], f"{city.title()}|{city.title()}|"))
+
+    records.sort(key=lambda r: r[0].encode("utf-8"))
+
+    strings = bytearray()
+    key_blob = bytearray()
+    point_blob = bytearray()
+    n_points = 0
+    for key, kind, points, label in records:
+        key_bytes = key.encode("utf-8")
+        label_bytes = label.encode("utf-8")
+        key_off = len(strings)
+        strings += key_bytes
+        label_off = len(strings)
+        strings += label_bytes
+        key_blob += _KEY.pack(key_off, len(key_bytes), kind, n_points, len(points), label_off, len(label_bytes))
+        for point in points:
+            point_blob += _POINT.pack(*point)
+        n_points += len(points)
+
+    keys_off = _HEADER.size
+    points_off = keys_off + len(key_blob)
+    strings_off = points_off + len(point_blob)
+    header = _HEADER.pack(_MAGIC, len(records), keys_off, n_points, points_off, strings_off, len(strings))
+
+    # Write then rename so workers never map a half-written file
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + key_blob + point_blob + strings)
+    os.replace(tmp_path, out_path)
+    print(f"✅ Gazetteer built: {len(records)} keys, {n_points} points → {out_path}")
+    return out_path
+
+
+# ---------------------------------------------------------------- lookups
+
+class _Index:
+    """Read-only view over the memory-mapped index file"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_keys, self.keys_off, self.n_points, self.points_off, self.strings_off, _ = \
+            _HEADER.unpack_from(self.mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"not a gazetteer index: {path}")
+
+    def _record(self, i):
+        return _KEY.unpack_from(self.mm, self.keys_off + i * _KEY.size)
+
+    def _string(self, offset, length):
+        start = self.strings_off + offset
+        return self.mm[start:start + length]
+
+    def key_at(self, i):
+        key_off, key_len = self._record(i)[:2]
+        return self._string(key_off, key_len)
+
+    def find(self, key):
+        """Binary search for an exact prefixed key; returns (kind, first, count, label) or None"""
+        target = key.encode("utf-8")
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_keys and self.key_at(lo) == target:
+            _, _, kind, first, count, label_off, label_len = self._record(lo)
+            return kind, first, count, self._string(label_off, label_len).decode("utf-8")
+        return None
+
+    def points(self, first, count):
+        base = self.points_off + first * _POINT.size
+        return [_POINT.unpack_from(self.mm, base + i * _POINT.size) for i in range(count)]
+
+    def labels_of_kind(self, kind):
+        prefix = _KIND_PREFIX[kind].encode("utf-8")
+        for i in range(self.n_keys):
+            key = self.key_at(i)
+            # "street|*" keys duplicate a suburb-qualified one
+            if key.startswith(prefix) and not key.endswith(b"|*"):
+                _, _, _, _, _, label_off, label_len = self._record(i)
+                yield self._string(label_off, label_len).decode("utf-8")
+
+
+def _get_index():
+    global _index
+    if _index is not None:
+        return _index
+    with _lock:
+        if _index is None:
+            try:
+                if not os.path.exists(GAZETTEER_PATH):
+                    build_gazetteer(GAZETTEER_PATH)
+                _index = _Index(GAZETTEER_PATH)
+                print(f"✅ Gazetteer loaded: {_index.n_keys} keys, {_index.n_points} points")
+            except Exception as e:
+                print(f"⚠️ Gazetteer unavailable: {e}")
+                _index = False
+    return _index
+
+
+def gazetteer_available():
+    return bool(_get_index())
+
+
+def _strip_region(tokens):
+    """Drop trailing postcode / city tokens Google and the LLM append"""
+    tokens = list(tokens)
+    if tokens and re.fullmatch(r"\d{4}", tokens[-1]):
+        tokens.pop()
+    for city in REGION_CITIES:
+        city_tokens = city.split()
+        if len(tokens) > len(city_tokens) and tokens[-len(city_tokens):] == city_tokens:
+            tokens = tokens[:-len(city_tokens)]
+            break
+    return tokens
+
+
+def _interpolate(points, number):
+    """Exact address point, or a position interpolated between neighbours on the same side"""
+    numbers = [p[0] for p in points]
+    i = bisect.bisect_left(numbers, number)
+    if i < len(points) and numbers[i] == number:
+        return points[i][1], points[i][2], "ROOFTOP"
+
+    lower = next((p for p in reversed(points[:i]) if p[0] % 2 == number % 2), None)
+    upper = next((p for p in points[i:] if p[0] % 2 == number % 2), None)
+    if not lower or not upper:
+        return None
+    ratio = (number - lower[0]) / (upper[0] - lower[0])
+    lat = lower[1] + (upper[1] - lower[1]) * ratio
+    lng = lower[2] + (upper[2] - lower[2]) * ratio
+    return int(lat), int(lng), "RANGE_INTERPOLATED"
+
+
+def _result(formatted_address, lat_e6, lng_e6, components, types, location_type):
+    """Shape a hit like a Google geocode result so callers can't tell the difference"""
+    return {
+        "formatted_address": formatted_address,
+        "geometry": {
+            "location": {"lat": lat_e6 / 1000000, "lng": lng_e6 / 1000000},
+            "location_type": location_type,
+        },
+        "address_components": components,
+        "types": types,
+        "source": "gazetteer",
+    }
+
+
+def _lookup_street(index, unit, number, suffix, rest_tokens):
+    for split in range(len(rest_tokens), 0, -1):
+        street = " ".join(rest_tokens[:split])
+        suburb = " ".join(rest_tokens[split:]) or "*"
+        found = index.find(f"{_KIND_PREFIX[KIND_STREET]}{street}|{suburb}")
+        if not found or not found[2]:
+            continue
+
+        _, first, count, label = found
+        position = _interpolate(index.points(first, count), number)
+        if not position:
+            return None
+        lat_e6, lng_e6, location_type = position
+
+        street_name, suburb_name, city, postcode = label.split("|")
+        house = f"{number}{suffix.upper() if suffix else ''}"
+        if unit:
+            house = f"{unit.upper()}/{house}"
+        city_part = f"{city} {postcode}" if postcode else city
+        formatted = f"{house} {street_name}, {suburb_name}, {city_part}, New Zealand"
+        components = [
+            {"long_name": house, "short_name": house, "types": ["street_number"]},
+            {"long_name": street_name, "short_name": street_name, "types": ["route"]},
+            {"long_name": suburb_name, "short_name": suburb_name, "types": ["sublocality", "political"]},
+            {"long_name": city, "short_name": city, "types": ["locality", "political"]},
+        ]
+        if postcode:
+            components.append({"long_name": postcode, "short_name": postcode, "types": ["postal_code"]})
+        return _result(formatted, lat_e6, lng_e6, components, ["street_address"], location_type)
+    return None
+
+
+def _own_places(formatted):
+    """A POI's own street, suburb and city, canonicalised, from its formatted address"""
+    places = []
+    for part in formatted.split(",")[1:]:
+        tokens = canonicalize_query(part).split()
+        if tokens and re.fullmatch(r"\d{4}", tokens[-1]):
+            tokens.pop()
+        if tokens and tokens[0][0].isdigit():
+            tokens.pop(0)
+        if tokens:
+            places.append(tokens)
+    return places
+
+
+def _is_place_suffix(places, tokens):
+    """
+    True if the tokens after a POI name are only its own street, suburb and/or
+    city, in address order. "station, upper hutt" is not the Wellington one.
+    """
+    i = 0
+    for place in places:
+        if tokens[i:i + len(place)] == place:
+            i += len(place)
+    return i == len(tokens)
+
+
+def _lookup_poi(index, tokens):
+    if tokens and tokens[0] == "the" and len(tokens) > 1:
+        candidates = [tokens, tokens[1:]]
+    else:
+        candidates = [tokens]
+
+    for candidate in candidates:
+        for size in range(len(candidate), 0, -1):
+            found = index.find(_KIND_PREFIX[KIND_POI] + " ".join(candidate[:size]))
+            if not found:
+                continue
+            _, first, count, label = found
+            name, formatted = label.split("|", 1)
+            if not _is_place_suffix(_own_places(formatted), candidate[size:]):
+                continue
+            _, lat_e6, lng_e6 = index.points(first, count)[0]
+            components = [{"long_name": name, "short_name": name, "types": ["point_of_interest", "establishment"]}]
+            return _result(formatted, lat_e6, lng_e6, components, ["point_of_interest", "establishment"], "APPROXIMATE")
+    return None
+
+
+def lookup(text):
+    """Resolve an address or landmark locally; returns a Google-style result or None"""
+    index = _get_index()
+    if not index or not text:
+        return None
+
+    tokens = canonicalize_query(text).split()
+    if tokens and re.fullmatch(r"\d{4}", tokens[-1]):
+        tokens.pop()
+    if not tokens:
+        return None
+
+    match = _ADDRESS_RE.match(" ".join(_strip_region(tokens)))
+    if match:
+        return _lookup_street(
+            index,
+            match.group("unit_word") or match.group("unit"),
+            int(match.group("number")),
+            match.group("suffix"),
+            match.group("rest").split(),
+        )
+    # POIs keep the city - it has to be the POI's own (see _is_place_suffix)
+    return _lookup_poi(index, tokens)
+
+
+def suburb_info(suburb):
+    """(suburb, city, postcode) for a known suburb name, else None"""
+    index = _get_index()
+    if not index or not suburb:
+        return None
+    found = index.find(_KIND_PREFIX[KIND_SUBURB] + canonicalize_query(suburb))
+    return tuple(found[3].split("|")) if found else None
+
+
+def street_list_complete():
+    """
+    True when the street list came from a full LINZ address import (its
+    streets carry address points) rather than just the seed CSV - only then
+    does a street missing from the list really not exist.
+    """
+    index = _get_index()
+    if not index:
+        return False
+    complete = getattr(index, "streets_complete", None)
+    if complete is None:
+        prefix = _KIND_PREFIX[KIND_STREET].encode("utf-8")
+        complete = any(
+            index.key_at(i).startswith(prefix) and index._record(i)[4]
+            for i in range(index.n_keys)
+        )
+        index.streets_complete = complete
+    return complete
+
+
+def known_names(kind):
+    """Display names of every indexed street, as (street, suburb), or suburb, as (suburb, city)"""
+    index = _get_index()
+    if not index:
+        return []
+    return [tuple(label.split("|")[:2]) for label in index.labels_of_kind(kind)]
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "build":
+        addresses = None
+        if "--addresses" in sys.argv:
+            addresses = sys.argv[sys.argv.index("--addresses") + 1]
+        build_gazetteer(GAZETTEER_PATH, addresses)
+    elif command == "lookup" and len(sys.argv) > 2:
+        print(lookup(" ".join(sys.argv[2:])))
+    else:
+        print("Usage: python gazetteer.py build [--addresses FILE] | lookup <text>")
+        sys.exit(1)
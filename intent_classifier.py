@@ -0,0 +1,245 @@
+"""
+Local modification intent classifier for Kiwi Cabs AI IVR
+"change the time to 5", "go to the airport instead", "cancel it" - callers
+say the same handful of things when changing a booking. A keyword/regex
+grammar catches the common phrasings, a small linear model over word
+unigrams/bigrams catches the rest, and the caller only needs the LLM when
+neither is confident.
+
+The model is a multinomial logistic regression kept as JSON weights
+(INTENT_MODEL_PATH). It is trained from data/intent_examples.csv plus the
+utterances the LLM labelled in the conversations table, and evaluated on
+data/intent_eval.csv plus the logged utterances held out of training:
+
+    python train_intent_classifier.py
+    python eval_intent_classifier.py
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import math
+import random
+import threading
+
+import gazetteer
+
+INTENT_EXAMPLES_CSV = os.path.join(gazetteer.DATA_DIR, "intent_examples.csv")
+# Never trained on - what eval_intent_classifier.py scores against
+INTENT_EVAL_CSV = os.path.join(gazetteer.DATA_DIR, "intent_eval.csv")
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join(gazetteer.DATA_DIR, "intent_model.json"))
+# Below this extract_modification_intent_with_ai asks the LLM instead
+INTENT_CONFIDENCE = float(os.getenv("INTENT_CONFIDENCE", "0.8"))
+
+INTENTS = ["change_pickup", "change_destination", "change_time", "cancel", "no_change"]
+# Intents that are only actionable with a new value
+_VALUE_INTENTS = {"change_pickup", "change_destination", "change_time"}
+
+_GRAMMAR_CONFIDENCE = 0.95
+# A change we recognise but with nothing to change it to
+_MISSING_VALUE_PENALTY = 0.7
+# The model has to be this sure to overrule the grammar
+_MODEL_OVERRULE = 0.8
+
+_TIME = (
+    r"(?:now|right now|asap|as soon as possible|noon|midday|midnight|tonight"
+    r"|in (?:\d+|a|an|half an?) (?:minutes?|mins?|hours?)"
+    r"|half past \w+|quarter (?:past|to) \w+"
+    r"|(?:today|tomorrow|tonight|monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"(?: (?:morning|afternoon|evening|night))?(?: at (?:noon|midday|midnight|\d{1,2}(?:[:.]\d{2})?(?: ?[ap]\.?m\.?| o'?clock)?))?"
+    r"|\d{1,2}(?:[:.]\d{2})?(?: ?[ap]\.?m\.?| o'?clock)?"
+    r"(?: (?:today|tomorrow|tonight|this morning|this afternoon|this evening))?)"
+)
+_TRAILING = r"(?:\s+(?:instead|please|thanks|thank you|now|then))*\s*$"
+
+_NO_CHANGE = (
+    r"no|nope|nah|nothing|never mind|nevermind|leave it(?: as it is)?|keep (?:it|the booking)(?: as it is)?"
+    r"|(?:it'?s|that'?s|i'?m) (?:all )?(?:good|fine)|that'?s (?:all|it)|all good"
+)
+
+# (pattern, intent) - first match wins, so the specific phrasings come first.
+# A "value" group is the new pickup/destination/time.
+_GRAMMAR = [
+    # Negated changes come before the cancel keywords - "i don't want to change anything"
+    (r"\b(?:don'?t|do not|doesn'?t|no need to|not)\b(?:\s+\w+){0,3}?\s+"
+     r"(?:change|changing|changed|cancel|cancelling|canceled|cancelled|move|moving|different|another|anything)\b", "no_change"),
+    (r"\b(?:cancel|call it off|scrap|don'?t (?:need|want|send)|do not (?:need|want|send)|no longer need)\b", "cancel"),
+    # "go at 6" is a time, not a place called "6"
+    (r"\b(?:destination|drop ?off|dropoff|going|go|head|heading|take me)\b.*?\b(?:to|at|is|be)\s+"
+     r"(?P<value>(?!" + _TIME + _TRAILING + r").+?)" + _TRAILING, "change_destination"),
+    (r"\b(?:destination|drop ?off|where i'?m going)\b", "change_destination"),
+    (r"\bpick ?(?:me )?up (?:time|at (?=" + _TIME + _TRAILING + "))", None),
+    (r"\b(?:pick ?(?:me )?up|pickup|collect me|get me)\b.*?\b(?:from|at|to|is|be)\s+(?P<value>(?!time\b).+?)" + _TRAILING, "change_pickup"),
+    (r"\b(?:i'?m|i am|i'?ll be|i will be) at\s+(?P<value>.+?)" + _TRAILING, "change_pickup"),
+    (r"\b(?:pick ?(?:me )?up|pickup)\b", "change_pickup"),
+    (r"\b(?P<value>" + _TIME + r")" + _TRAILING, "change_time"),
+    (r"\b(?:time|earlier|later|reschedule|sooner)\b", "change_time"),
+    # Only a bare "no" - "no, the hospital" is a change the LLM should read
+    (r"^(?:(?:" + _NO_CHANGE + r"|thanks|thank you|please)\s*)+$", "no_change"),
+]
+_GRAMMAR = [(re.compile(pattern), intent) for pattern, intent in _GRAMMAR]
+
+_TIME_RE = re.compile(r"\b(?:to|for|at|be|make it)?\s*(?P<value>" + _TIME + r")" + _TRAILING)
+_PLACE_RE = re.compile(r"\b(?:to|from|at|is|be)\s+(?P<value>(?:(?!\b(?:to|from|at)\b).)+?)" + _TRAILING)
+_TOKEN_RE = re.compile(r"\d+(?::\d+)?|[a-z0-9']+|/")
+
+_lock = threading.Lock()
+_model = None
+
+
+def normalize(text):
+    return " ".join(_TOKEN_RE.findall((text or "").lower().replace("-", " ")))
+
+
+def features(text):
+    """Unigram and bigram features, with numbers folded into one token"""
+    tokens = ["<num>" if token[0].isdigit() else token for token in normalize(text).split()]
+    padded = ["<s>"] + tokens + ["</s>"]
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(padded, padded[1:]))
+    return grams
+
+
+def extract_value(text, intent):
+    """The new time/place a change intent refers to, or None"""
+    text = normalize(text)
+    if intent == "change_time":
+        matches = list(_TIME_RE.finditer(text))
+        return matches[-1].group("value") if matches else None
+    if intent in ("change_pickup", "change_destination"):
+        match = _PLACE_RE.search(text)
+        if match:
+            value = match.group("value").strip()
+            # "change the destination" has no value, only the slot name
+            if value and not re.fullmatch(r"(?:my |the )?(?:destination|pickup|pick up|address|location)", value):
+                return value
+    return None
+
+
+def _grammar(text):
+    for pattern, intent in _GRAMMAR:
+        match = pattern.search(text)
+        if match:
+            if intent is None:
+                # "pick me up at 6" is about the time, not the place
+                intent = "change_time"
+                value = extract_value(text, intent)
+            else:
+                value = match.groupdict().get("value")
+            return intent, value.strip() if value else None
+    return None, None
+
+
+def _get_model():
+    global _model
+    if _model is not None:
+        return _model
+    with _lock:
+        if _model is None:
+            model = {}
+            try:
+                with open(INTENT_MODEL_PATH) as f:
+                    model = json.load(f)
+            except FileNotFoundError:
+                print(f"⚠️ No intent model at {INTENT_MODEL_PATH} - grammar only")
+            except Exception as e:
+                print(f"⚠️ Intent model not loaded, grammar only: {e}")
+            _model = model
+    return _model
+
+
+def _predict(model, grams):
+    """Class probabilities from a {"classes", "bias", "weights"} model"""
+    classes = model["classes"]
+    scores = list(model["bias"])
+    weights = model["weights"]
+    for gram in grams:
+        row = weights.get(gram)
+        if row:
+            for i, weight in enumerate(row):
+                scores[i] += weight
+    top = max(scores)
+    exps = [math.exp(score - top) for score in scores]
+    total = sum(exps)
+    return {intent: value / total for intent, value in zip(classes, exps)}
+
+
+def classify(text):
+    """
+    Classify a modification request without the LLM.
+
+    Returns {"intent", "new_value", "confidence", "source"} in the same shape
+    as the LLM reply, where source is "grammar" or "model".
+    """
+    text = normalize(text)
+    intent, value = _grammar(text)
+    confidence = _GRAMMAR_CONFIDENCE if intent else 0.0
+    source = "grammar"
+
+    model = _get_model()
+    if model:
+        probabilities = _predict(model, features(text))
+        best = max(probabilities, key=probabilities.get)
+        if not intent:
+            intent, confidence, source = best, probabilities[best], "model"
+            value = extract_value(text, intent)
+        elif best != intent and probabilities[best] >= _MODEL_OVERRULE:
+            # Grammar and model disagree - not confident enough to skip the LLM
+            confidence = 1 - probabilities[best]
+
+    if not intent:
+        return {"intent": "no_change", "new_value": None, "confidence": 0.0, "source": source}
+    if intent in _VALUE_INTENTS and not value:
+        confidence *= _MISSING_VALUE_PENALTY
+    return {"intent": intent, "new_value": value, "confidence": round(confidence, 3), "source": source}
+
+
+def load_examples(path=INTENT_EXAMPLES_CSV):
+    """[(text, intent, new_value)] from a labelled CSV"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["text"], row["intent"], row.get("new_value") or None) for row in csv.DictReader(f)]
+
+
+def train(examples, epochs=40, learning_rate=0.5, l2=0.0005, seed=7):
+    """Fit the n-gram logistic regression to [(text, intent, ...)] and return the model"""
+    classes = list(INTENTS)
+    data = [(features(text), classes.index(intent)) for text, intent, *_ in examples if intent in classes]
+    weights = {}
+    bias = [0.0] * len(classes)
+    rng = random.Random(seed)
+
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        rate = learning_rate / (1 + epoch * 0.1)
+        for grams, label in data:
+            probabilities = _predict({"classes": classes, "bias": bias, "weights": weights}, grams)
+            for i, intent in enumerate(classes):
+                gradient = probabilities[intent] - (1.0 if i == label else 0.0)
+                bias[i] -= rate * gradient
+                for gram in grams:
+                    row = weights.setdefault(gram, [0.0] * len(classes))
+                    row[i] -= rate * (gradient + l2 * row[i])
+
+    weights = {
+        gram: [round(weight, 4) for weight in row]
+        for gram, row in weights.items() if any(abs(weight) >= 0.001 for weight in row)
+    }
+    return {"classes": classes, "bias": [round(b, 4) for b in bias], "weights": weights, "trained_on": len(data)}
+
+
+def save_model(model, path=None):
+    global _model
+    with open(path or INTENT_MODEL_PATH, "w") as f:
+        json.dump(model, f, separators=(",", ":"), sort_keys=True)
+    with _lock:
+        _model = model
+
+
+if __name__ == "__main__":
+    # python intent_classifier.py "go to the airport instead"
+    if len(sys.argv) < 2:
+        print('Usage: python intent_classifier.py "<utterance>"')
+        sys.exit(1)
+    print(json.dumps(classify(" ".join(sys.argv[1:])), indent=2))
@@ -0,0 +1,247 @@
+"""
+OpenAI chat client for Kiwi Cabs AI IVR
+One keep-alive HTTPS connection pool shared by every LLM call in the worker,
+with explicit connect/read timeouts, retry with jittered backoff on
+429/5xx/network errors, and per-purpose latency and token counters.
+stream_chat_completion() hands back each reply line as it's generated.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))
+
+# Cheap, fast model tried first; the larger one only when its answer doesn't validate
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "gpt-4o-mini")
+LLM_LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", "gpt-4o")
+
+_RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+_session_lock = threading.Lock()
+_session = None
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+class LLMError(Exception):
+    """The chat completion failed after all retries, or returned nothing usable"""
+
+
+def _get_session():
+    global _session
+    if _session is not None:
+        return _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are done below so they can be jittered and counted
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _record(purpose, latency, ok, retries, usage=None, first_token=None):
+    with _stats_lock:
+        stats = _stats.setdefault(purpose, {
+            "calls": 0, "errors": 0, "retries": 0, "total_latency": 0.0, "max_latency": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "streamed": 0, "total_first_token": 0.0,
+        })
+        stats["calls"] += 1
+        stats["errors"] += 0 if ok else 1
+        stats["retries"] += retries
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        if usage:
+            stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            stats["completion_tokens"] += usage.get("completion_tokens", 0)
+        if first_token is not None:
+            stats["streamed"] += 1
+            stats["total_first_token"] += first_token
+
+
+def _backoff(attempt, retry_after=None):
+    """Full-jitter exponential backoff, honouring Retry-After when it's short"""
+    if retry_after:
+        try:
+            return min(float(retry_after), 5.0)
+        except ValueError:
+            pass
+    return random.uniform(0, min(4.0, 0.25 * 2 ** attempt))
+
+
+def _post(payload, purpose, timeout=None, stream=False, deadline=None):
+    """
+    POST a chat completion, retrying network errors, 429 and 5xx.
+
+    Returns (response, retries) for a 200 response. Raises LLMError (after
+    recording the failure) when every attempt fails. With a deadline (a
+    time.time() value) no attempt or read wait runs past it.
+    """
+    if not OPENAI_API_KEY:
+        raise LLMError("OPENAI_API_KEY not configured")
+
+    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+    started = time.time()
+    last_error = None
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        retry_after = None
+        read_timeout = timeout or LLM_READ_TIMEOUT
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                last_error = last_error or "deadline passed"
+                break
+            read_timeout = min(read_timeout, remaining)
+        try:
+            response = _get_session().post(
+                f"{OPENAI_BASE_URL}/chat/completions",
+                json=payload,
+                headers=headers,
+                timeout=(min(LLM_CONNECT_TIMEOUT, read_timeout), read_timeout),
+                stream=stream,
+            )
+            if response.status_code == 200:
+                return response, attempt
+
+            last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+            response.close()
+            if response.status_code not in _RETRY_STATUSES:
+                break
+            retry_after = response.headers.get("Retry-After")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = str(e)
+
+        if attempt < LLM_MAX_RETRIES:
+            delay = _backoff(attempt, retry_after)
+            if deadline is not None and time.time() + delay >= deadline:
+                break
+            print(f"⚠️ LLM {purpose} attempt {attempt + 1} failed ({last_error}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    _record(purpose, time.time() - started, False, LLM_MAX_RETRIES)
+    raise LLMError(f"{purpose} failed: {last_error}")
+
+
+def chat_completion(messages, model=LLM_SMALL_MODEL, purpose="general", timeout=None, deadline=None, **params):
+    """
+    Run a chat completion and return the reply text.
+
+    params are passed straight through to the API (temperature, max_tokens,
+    response_format, ...). timeout overrides the read timeout for this call,
+    and deadline (a time.time() value) bounds it including retries.
+    Raises LLMError when every attempt fails.
+    """
+    started = time.time()
+    response, retries = _post({"model": model, "messages": messages, **params}, purpose, timeout, deadline=deadline)
+    try:
+        body = response.json()
+        content = (body["choices"][0]["message"].get("content") or "").strip()
+    except (ValueError, KeyError, IndexError) as e:
+        _record(purpose, time.time() - started, False, retries)
+        raise LLMError(f"{purpose} failed: Bad response: {e}")
+
+    latency = time.time() - started
+    _record(purpose, latency, True, retries, body.get("usage"))
+    print(f"🤖 LLM {purpose} ({model}): {latency:.2f}s, {body.get('usage', {}).get('total_tokens', '?')} tokens")
+    return content
+
+
+def stream_chat_completion(
+    messages, model=LLM_SMALL_MODEL, purpose="general", on_line=None, timeout=None, deadline=None, **params
+):
+    """
+    Run a streamed chat completion and return the full reply text.
+
+    on_line(line) is called with each line of the reply as soon as its
+    newline arrives (and with the last line when the stream ends), so callers
+    can act on the first fields of a "key: value" reply while the rest is
+    still being generated. Connection failures are retried as in
+    chat_completion(); a stream that breaks part-way, or is still going at
+    the deadline, raises LLMError.
+    """
+    started = time.time()
+    payload = {
+        "model": model, "messages": messages, "stream": True,
+        "stream_options": {"include_usage": True}, **params,
+    }
+    response, retries = _post(payload, purpose, timeout, stream=True, deadline=deadline)
+
+    content = []
+    pending = ""
+    usage = None
+    first_token = None
+
+    def emit(line):
+        if on_line and line.strip():
+            try:
+                on_line(line.strip())
+            except Exception as e:
+                print(f"⚠️ LLM {purpose} line handler error: {e}")
+
+    try:
+        with response:
+            for raw in response.iter_lines():
+                if deadline is not None and time.time() >= deadline:
+                    raise LLMError("deadline passed mid-stream")
+                if not raw.startswith(b"data:"):
+                    continue
+                data = raw[5:].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content")
+                    if not text:
+                        continue
+                    if first_token is None:
+                        first_token = time.time() - started
+                    content.append(text)
+                    pending += text
+                    while "\n" in pending:
+                        line, pending = pending.split("\n", 1)
+                        emit(line)
+    except (requests.RequestException, ValueError, LLMError) as e:
+        _record(purpose, time.time() - started, False, retries)
+        raise LLMError(f"{purpose} stream failed: {e}")
+    emit(pending)
+
+    latency = time.time() - started
+    _record(purpose, latency, True, retries, usage, first_token)
+    print(
+        f"🤖 LLM {purpose} ({model}, streamed): first token {first_token or 0:.2f}s, "
+        f"done {latency:.2f}s, {(usage or {}).get('total_tokens', '?')} tokens"
+    )
+    return "".join(content).strip()
+
+
+def llm_stats():
+    """Per-purpose call counts, errors, retries, latency and token usage"""
+    with _stats_lock:
+        stats = {}
+        for purpose, values in _stats.items():
+            stats[purpose] = {
+                **{key: value for key, value in values.items() if not key.startswith("total_")},
+                "avg_latency": round(values["total_latency"] / values["calls"], 3) if values["calls"] else 0.0,
+                "max_latency": round(values["max_latency"], 3),
+                "avg_first_token": (
+                    round(values["total_first_token"] / values["streamed"], 3) if values["streamed"] else None
+                ),
+            }
+        return stats
@@ -0,0 +1,79 @@
+"""
+Tiered resolution for Kiwi Cabs AI IVR
+Try the cheapest way of answering first (cache, local parser, small model)
+and only escalate to the larger model when the answer fails validation - no
+exact geocode, unparseable JSON. Every tier's latency and success rate is
+counted per task so the thresholds can be tuned from production traffic
+(model_tier_stats() on /health).
+"""
+
+import time
+import threading
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _record(task, tier, produced, ok, latency):
+    with _stats_lock:
+        stats = _stats.setdefault(task, {}).setdefault(tier, {
+            "calls": 0, "answered": 0, "validated": 0, "errors": 0, "total_latency": 0.0, "max_latency": 0.0,
+        })
+        stats["calls"] += 1
+        stats["answered"] += 1 if produced else 0
+        stats["validated"] += 1 if ok else 0
+        stats["errors"] += 1 if produced is None else 0
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+
+
+def run_tiers(task, tiers, validate, deadline=None):
+    """
+    Run tiers in order until one gives an answer that validates.
+
+    tiers is a list of (name, produce) where produce() returns an answer, or
+    a falsy value when the tier has nothing to say (cache miss, low-confidence
+    local parse). validate(answer) returns the accepted result or None.
+
+    Returns (tier_name, result), or (None, None) when every tier fails.
+    Exceptions from a tier count as errors and move on to the next tier.
+    Once deadline (a time.time() value) has passed no further tier is started.
+    """
+    for name, produce in tiers:
+        started = time.time()
+        if deadline is not None and started >= deadline:
+            print(f"⏱️ {task} deadline passed - not escalating to tier '{name}'")
+            break
+        answer = result = None
+        try:
+            answer = produce()
+            if answer:
+                result = validate(answer)
+        except Exception as e:
+            print(f"⚠️ {task} tier '{name}' error: {e}")
+            _record(task, name, None, False, time.time() - started)
+            continue
+
+        _record(task, name, bool(answer), result is not None, time.time() - started)
+        if result is not None:
+            print(f"🪜 {task} resolved at tier '{name}' in {time.time() - started:.3f}s")
+            return name, result
+        if answer:
+            print(f"🪜 {task} tier '{name}' answer failed validation - escalating")
+    return None, None
+
+
+def model_tier_stats():
+    """Per task and tier: calls, answers, validated answers, success rate, latency"""
+    with _stats_lock:
+        stats = {}
+        for task, tiers in _stats.items():
+            stats[task] = {}
+            for tier, values in tiers.items():
+                stats[task][tier] = {
+                    **{key: value for key, value in values.items() if key != "total_latency"},
+                    "success_rate": round(values["validated"] / values["calls"], 3) if values["calls"] else 0.0,
+                    "avg_latency": round(values["total_latency"] / values["calls"], 3) if values["calls"] else 0.0,
+                    "max_latency": round(values["max_latency"], 3),
+                }
+        return stats
@@ -0,0 +1,242 @@
+"""
+Google Maps rate limiter and cost accounting for Kiwi Cabs AI IVR
+A token bucket per endpoint, kept in the shared SQLite file so every gunicorn
+worker draws from the same budget. Live-call lookups may use the whole bucket;
+background work (booking modifications, prefetching) has to leave a reserve
+for them. Calls, throttles and estimated spend are counted per minute.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import threading
+import functools
+from contextlib import contextmanager
+
+from shared_cache import CACHE_DB_PATH
+
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", CACHE_DB_PATH)
+
+# endpoint -> (tokens per second, bucket size, USD per call)
+ENDPOINT_BUDGETS = {
+    "geocode": (
+        float(os.getenv("GEOCODE_QPS", "20")),
+        float(os.getenv("GEOCODE_BURST", "40")),
+        float(os.getenv("GEOCODE_COST_PER_1000", "5.0")) / 1000,
+    ),
+    "directions": (
+        float(os.getenv("DIRECTIONS_QPS", "20")),
+        float(os.getenv("DIRECTIONS_BURST", "40")),
+        float(os.getenv("DIRECTIONS_COST_PER_1000", "5.0")) / 1000,
+    ),
+}
+
+# Share of each bucket background work must leave for live calls
+BACKGROUND_RESERVE = float(os.getenv("RATE_LIMIT_BACKGROUND_RESERVE", "0.5"))
+# How long a caller may wait for a token - a live caller is on the phone
+LIVE_MAX_WAIT = float(os.getenv("RATE_LIMIT_LIVE_WAIT", "1.0"))
+BACKGROUND_MAX_WAIT = float(os.getenv("RATE_LIMIT_BACKGROUND_WAIT", "15"))
+
+PRIORITY_LIVE = "live"
+PRIORITY_BACKGROUND = "background"
+
+_local = threading.local()
+
+
+class RateLimitExceeded(Exception):
+    """No token became available for an endpoint within the allowed wait"""
+
+
+def current_priority():
+    return getattr(_local, "priority", PRIORITY_LIVE)
+
+
+@contextmanager
+def api_priority(priority):
+    """Run the enclosed Google calls at the given priority on this thread"""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def background_priority(fn):
+    """Decorator for background threads so their lookups yield to live calls"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with api_priority(PRIORITY_BACKGROUND):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def with_current_priority(fn):
+    """Carry this thread's priority over to a function run on a pool thread"""
+    priority = current_priority()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with api_priority(priority):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _get_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(RATE_LIMIT_DB_PATH, timeout=2.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rate_buckets (
+            endpoint TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS api_usage (
+            endpoint TEXT NOT NULL,
+            minute INTEGER NOT NULL,
+            priority TEXT NOT NULL,
+            calls INTEGER DEFAULT 0,
+            throttled INTEGER DEFAULT 0,
+            spend REAL DEFAULT 0,
+            PRIMARY KEY (endpoint, minute, priority)
+        )
+    """
+    )
+    _local.conn = conn
+    return conn
+
+
+def _take_token(conn, endpoint, priority):
+    """Try to take one token. Returns (granted, seconds until one could be)."""
+    rate, capacity, _ = ENDPOINT_BUDGETS[endpoint]
+    floor = capacity * BACKGROUND_RESERVE if priority == PRIORITY_BACKGROUND else 0.0
+    now = time.time()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM rate_buckets WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+
+        granted = tokens - 1 >= floor
+        if granted:
+            tokens -= 1
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_buckets (endpoint, tokens, updated_at) VALUES (?, ?, ?)",
+            (endpoint, tokens, now),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return granted, 0.0 if granted else (floor + 1 - tokens) / rate
+
+
+def _record(conn, endpoint, priority, calls=0, throttled=0):
+    _, _, cost = ENDPOINT_BUDGETS[endpoint]
+    minute = int(time.time() // 60)
+    conn.execute(
+        "INSERT OR IGNORE INTO api_usage (endpoint, minute, priority) VALUES (?, ?, ?)",
+        (endpoint, minute, priority),
+    )
+    conn.execute(
+        """UPDATE api_usage SET calls = calls + ?, throttled = throttled + ?, spend = spend + ?
+        WHERE endpoint = ? AND minute = ? AND priority = ?""",
+        (calls, throttled, calls * cost, endpoint, minute, priority),
+    )
+    # Keep a day of history - no need to check on every call
+    if random.random() < 0.01:
+        conn.execute("DELETE FROM api_usage WHERE minute < ?", (minute - 24 * 60,))
+
+
+def acquire(endpoint, max_wait=None):
+    """Wait for a token for endpoint at this thread's priority. Returns True if granted."""
+    priority = current_priority()
+    if max_wait is None:
+        max_wait = BACKGROUND_MAX_WAIT if priority == PRIORITY_BACKGROUND else LIVE_MAX_WAIT
+    deadline = time.time() + max_wait
+
+    try:
+        conn = _get_conn()
+        while True:
+            granted, retry_in = _take_token(conn, endpoint, priority)
+            if granted:
+                _record(conn, endpoint, priority, calls=1)
+                return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                _record(conn, endpoint, priority, throttled=1)
+                print(f"🚦 Rate limited: {endpoint} ({priority})")
+                return False
+            time.sleep(min(retry_in, remaining))
+    except Exception as e:
+        # A broken limiter must never stop a booking - let the call through
+        print(f"⚠️ Rate limiter error ({endpoint}): {e}")
+        return True
+
+
+def rate_limited_call(endpoint, fn, *args, **kwargs):
+    """Call fn once a token for endpoint is available, else raise RateLimitExceeded"""
+    if not acquire(endpoint):
+        raise RateLimitExceeded(f"{endpoint} budget exhausted")
+    return fn(*args, **kwargs)
+
+
+def usage_stats(minutes=15):
+    """Calls, throttles and estimated spend per endpoint for the last few minutes"""
+    try:
+        conn = _get_conn()
+        since = int(time.time() // 60) - minutes + 1
+        rows = conn.execute(
+            """SELECT endpoint, minute, priority, calls, throttled, spend FROM api_usage
+            WHERE minute >= ? ORDER BY endpoint, minute""",
+            (since,),
+        ).fetchall()
+
+        stats = {}
+        for endpoint, minute, priority, calls, throttled, spend in rows:
+            endpoint_stats = stats.setdefault(
+                endpoint, {"calls": 0, "throttled": 0, "spend_usd": 0.0, "per_minute": {}}
+            )
+            label = time.strftime("%H:%M", time.localtime(minute * 60))
+            bucket = endpoint_stats["per_minute"].setdefault(
+                label, {"calls": 0, "throttled": 0, "spend_usd": 0.0, "background_calls": 0}
+            )
+            for target in (endpoint_stats, bucket):
+                target["calls"] += calls
+                target["throttled"] += throttled
+                target["spend_usd"] = round(target["spend_usd"] + spend, 4)
+            if priority == PRIORITY_BACKGROUND:
+                bucket["background_calls"] += calls
+        return stats
+    except Exception as e:
+        print(f"⚠️ Rate limiter stats error: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    # python rate_limiter.py stats [minutes]
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if command == "stats":
+        window = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+        print(json.dumps(usage_stats(window), indent=2))
+    else:
+        print("Usage: python rate_limiter.py stats [minutes]")
+        sys.exit(1)
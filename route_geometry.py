@@ -0,0 +1,166 @@
+"""
+Route geometry helpers for Kiwi Cabs AI IVR
+Routes are kept as one flat array('i') of TaxiCaller micro-degrees,
+[lng1, lat1, lng2, lat2, ...] - the exact shape of the payload's "pts" - so
+decoding, simplifying, caching and dispatch never build per-point objects.
+
+Google's overview polyline for a trip out to the Hutt can have hundreds of
+points, and every one becomes a "Waypoint N" node in the TaxiCaller payload.
+simplify_route() drops the points a driver's map can do without
+(Douglas-Peucker with a tolerance in metres) and caps what's left.
+"""
+
+import os
+import sys
+import math
+import base64
+from array import array
+
+ROUTE_SIMPLIFY_TOLERANCE_M = float(os.getenv("ROUTE_SIMPLIFY_TOLERANCE_M", "15"))
+ROUTE_MAX_POINTS = int(os.getenv("ROUTE_MAX_POINTS", "80"))
+
+# Metres per micro-degree of latitude
+_M_PER_MICRODEG = 6371000 * math.pi / 180 / 1000000
+
+
+def decode_polyline_flat(polyline_str):
+    """
+    Decode a Google encoded polyline straight into array('i') [lng*1e6, lat*1e6, ...].
+
+    The polyline carries 1e-5 degree integers, so scaling is an exact *10.
+    Points at 0,0 (what a corrupt polyline decodes to) are dropped on the way.
+    Raises ValueError for a truncated polyline.
+    """
+    points = array("i")
+    data = polyline_str.encode("ascii")
+    length = len(data)
+    index = lat = lng = 0
+
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                if index >= length:
+                    raise ValueError("Truncated polyline")
+                byte = data[index] - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        if lat or lng:
+            points.append(lng * 10)
+            points.append(lat * 10)
+    return points
+
+
+def point_count(points):
+    return len(points) // 2
+
+
+def point_at(points, index):
+    """[lng*1e6, lat*1e6] for one point of a flat route (negative index from the end)"""
+    if index < 0:
+        index += len(points) // 2
+    return [points[2 * index], points[2 * index + 1]]
+
+
+def pack_route(points):
+    """Flat route → compact base64 string for the JSON route cache"""
+    packed = array("i", points)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_route(packed):
+    """Inverse of pack_route. Also accepts the older [[lng, lat], ...] cache format."""
+    if isinstance(packed, list):
+        return array("i", [value for coord in packed for value in coord[:2]])
+    points = array("i")
+    points.frombytes(base64.b64decode(packed))
+    if sys.byteorder != "little":
+        points.byteswap()
+    return points
+
+
+def _importance(points):
+    """
+    Douglas-Peucker split distance (metres) for every point.
+
+    A point survives simplification at tolerance t when its importance is >= t.
+    A child is never ranked above the segment split that exposed it, so keeping
+    the N most important points is the same as running Douglas-Peucker with
+    the tolerance that leaves N points.
+    """
+    count = len(points) // 2
+    # Flat-earth projection around the route is plenty at city scale
+    x_scale = _M_PER_MICRODEG * math.cos(math.radians(points[1] / 1000000))
+    xs = [value * x_scale for value in points[0::2]]
+    ys = [value * _M_PER_MICRODEG for value in points[1::2]]
+
+    importance = [0.0] * count
+    importance[0] = importance[-1] = math.inf
+    stack = [(0, count - 1, math.inf)]
+    while stack:
+        first, last, ceiling = stack.pop()
+        if last - first < 2:
+            continue
+
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length_sq = dx * dx + dy * dy
+
+        best, best_index = -1.0, first + 1
+        for i in range(first + 1, last):
+            px, py = xs[i] - ax, ys[i] - ay
+            if length_sq:
+                t = (px * dx + py * dy) / length_sq
+                if t < 0.0:
+                    t = 0.0
+                elif t > 1.0:
+                    t = 1.0
+                ex, ey = px - t * dx, py - t * dy
+            else:
+                ex, ey = px, py
+            distance_sq = ex * ex + ey * ey
+            if distance_sq > best:
+                best, best_index = distance_sq, i
+
+        split = min(math.sqrt(best), ceiling)
+        importance[best_index] = split
+        stack.append((first, best_index, split))
+        stack.append((best_index, last, split))
+    return importance
+
+
+def simplify_route(points, tolerance_m=None, max_points=None):
+    """
+    Simplify a flat [lng*1e6, lat*1e6, ...] route for the TaxiCaller payload.
+
+    Keeps the first and last points, drops anything within tolerance_m of the
+    simplified line and, if more than max_points remain, keeps the max_points
+    most significant ones. Returns a new array('i') in the original order.
+    """
+    tolerance_m = ROUTE_SIMPLIFY_TOLERANCE_M if tolerance_m is None else tolerance_m
+    max_points = ROUTE_MAX_POINTS if max_points is None else max_points
+
+    if len(points) <= 4:
+        return array("i", points)
+
+    importance = _importance(points)
+    keep = [i for i, value in enumerate(importance) if value >= tolerance_m]
+
+    if max_points and len(keep) > max(max_points, 2):
+        ranked = sorted(keep, key=lambda i: importance[i], reverse=True)
+        keep = sorted(ranked[:max(max_points, 2)])
+
+    simplified = array("i")
+    for i in keep:
+        simplified.append(points[2 * i])
+        simplified.append(points[2 * i + 1])
+    return simplified
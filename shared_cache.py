@@ -0,0 +1,324 @@
+"""
+Shared on-disk cache for Kiwi Cabs AI IVR
+Backed by a local SQLite file so every gunicorn worker on the host sees the
+same entries. Values are JSON, entries expire by TTL and the least recently
+used rows are evicted once a namespace grows past CACHE_MAX_ENTRIES.
+Reads never take the SQLite write lock: LRU timestamps and hit/miss counters
+are collected in memory and written back in batches (cache_flush()).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import threading
+
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "/tmp/kiwi_cabs_cache.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "20000"))
+# How often LRU timestamps and hit/miss counters are written back
+CACHE_FLUSH_INTERVAL = float(os.getenv("CACHE_FLUSH_INTERVAL", "5"))
+
+# sqlite3 connections can't be shared between threads, so keep one per thread
+_local = threading.local()
+
+# Reads are counted in memory and written back in batches by cache_flush()
+_pending_lock = threading.Lock()
+_pending_counts = {}
+_pending_touches = {}
+_flusher = None
+
+# Word forms callers (and Google) use interchangeably
+_ABBREVIATIONS = {
+    "st": "street",
+    "rd": "road",
+    "ave": "avenue",
+    "av": "avenue",
+    "dr": "drive",
+    "tce": "terrace",
+    "pde": "parade",
+    "pl": "place",
+    "cres": "crescent",
+    "cr": "crescent",
+    "hwy": "highway",
+    "ln": "lane",
+    "mt": "mount",
+    "nz": "new zealand",
+}
+
+
+def canonicalize_query(text):
+    """Normalise an address/utterance so equivalent queries share one cache key"""
+    if not text:
+        return ""
+    cleaned = text.lower()
+    # Keep "/" so "2/55" units stay distinct from "255"
+    cleaned = re.sub(r"[^\w/ ]+", " ", cleaned)
+    tokens = [_ABBREVIATIONS.get(token, token) for token in cleaned.split()]
+    canonical = " ".join(tokens)
+
+    # "X" and "X, Wellington, New Zealand" are the same Google query for us
+    for suffix in (" new zealand", " wellington"):
+        if canonical.endswith(suffix) and len(canonical) > len(suffix):
+            canonical = canonical[: -len(suffix)]
+    return canonical
+
+
+def _get_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(CACHE_DB_PATH, timeout=2.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries(namespace, last_access)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            namespace TEXT PRIMARY KEY,
+            hits INTEGER DEFAULT 0,
+            misses INTEGER DEFAULT 0,
+            evictions INTEGER DEFAULT 0
+        )
+    """
+    )
+    _local.conn = conn
+    return conn
+
+
+def _bump(conn, namespace, column, amount=1):
+    conn.execute(
+        "INSERT OR IGNORE INTO cache_stats (namespace) VALUES (?)", (namespace,)
+    )
+    conn.execute(
+        f"UPDATE cache_stats SET {column} = {column} + ? WHERE namespace = ?",
+        (amount, namespace),
+    )
+
+
+def _note_read(namespace, key, hit):
+    """Remember a read for the next flush - the read itself never writes"""
+    global _flusher
+    with _pending_lock:
+        counts = _pending_counts.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+        if hit:
+            _pending_touches[(namespace, key)] = time.time()
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="cache-flush", daemon=True)
+            _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(CACHE_FLUSH_INTERVAL)
+        cache_flush()
+
+
+def cache_flush():
+    """
+    Write the LRU timestamps and hit/miss counters gathered since the last
+    flush in one transaction. Runs every CACHE_FLUSH_INTERVAL seconds on a
+    background thread; if the database is busy they're kept for next time.
+    """
+    with _pending_lock:
+        counts = dict(_pending_counts)
+        touches = dict(_pending_touches)
+        _pending_counts.clear()
+        _pending_touches.clear()
+    if not counts and not touches:
+        return True
+
+    try:
+        conn = _get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE namespace = ? AND key = ?",
+                [(accessed, namespace, key) for (namespace, key), accessed in touches.items()],
+            )
+            for namespace, values in counts.items():
+                for column, amount in values.items():
+                    if amount:
+                        _bump(conn, namespace, column, amount)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+    except Exception as e:
+        print(f"⚠️ Cache stats flush deferred: {e}")
+        with _pending_lock:
+            for namespace, values in counts.items():
+                pending = _pending_counts.setdefault(namespace, {"hits": 0, "misses": 0})
+                for column, amount in values.items():
+                    pending[column] += amount
+            for entry, accessed in touches.items():
+                _pending_touches[entry] = max(accessed, _pending_touches.get(entry, 0))
+        return False
+
+
+def cache_get(namespace, key):
+    """
+    Return the cached value, or None on a miss/expired entry.
+
+    A plain SELECT - no write lock is taken, so readers never wait on each
+    other. Expired rows are left for _evict() to sweep.
+    """
+    try:
+        conn = _get_conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        hit = bool(row) and row[1] > time.time()
+        _note_read(namespace, key, hit)
+        return json.loads(row[0]) if hit else None
+    except Exception as e:
+        print(f"⚠️ Cache read error ({namespace}): {e}")
+        return None
+
+
+def cache_set(namespace, key, value, ttl):
+    """Store a JSON-serialisable value for ttl seconds"""
+    try:
+        conn = _get_conn()
+        now = time.time()
+        conn.execute(
+            """INSERT OR REPLACE INTO cache_entries
+            (namespace, key, value, expires_at, last_access)
+            VALUES (?, ?, ?, ?, ?)""",
+            (namespace, key, json.dumps(value), now + ttl, now),
+        )
+        # Counting rows on every write is wasteful - check now and then
+        if random.random() < 0.02:
+            _evict(conn, namespace)
+        return True
+    except Exception as e:
+        print(f"⚠️ Cache write error ({namespace}): {e}")
+        return False
+
+
+def _evict(conn, namespace):
+    """Drop expired rows, then least recently used rows over the size limit"""
+    now = time.time()
+    expired = conn.execute(
+        "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+        (namespace, now),
+    ).rowcount
+
+    count = conn.execute(
+        "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (namespace,)
+    ).fetchone()[0]
+    overflow = max(0, count - CACHE_MAX_ENTRIES)
+    if overflow:
+        conn.execute(
+            """DELETE FROM cache_entries WHERE rowid IN (
+                SELECT rowid FROM cache_entries WHERE namespace = ?
+                ORDER BY last_access ASC LIMIT ?
+            )""",
+            (namespace, overflow),
+        )
+
+    if expired or overflow:
+        _bump(conn, namespace, "evictions", expired + overflow)
+
+
+def cache_invalidate(namespace, key=None):
+    """Remove one entry, or the whole namespace when key is None. Returns rows removed."""
+    try:
+        conn = _get_conn()
+        if key is None:
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ?", (namespace,)
+            ).rowcount
+        else:
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).rowcount
+        print(f"🧹 Cache invalidated: {namespace}/{key or '*'} ({removed} entries)")
+        return removed
+    except Exception as e:
+        print(f"⚠️ Cache invalidate error ({namespace}): {e}")
+        return 0
+
+
+def cache_items(namespace):
+    """All live (key, value) pairs in a namespace, e.g. for offline calibration"""
+    try:
+        conn = _get_conn()
+        rows = conn.execute(
+            "SELECT key, value FROM cache_entries WHERE namespace = ? AND expires_at > ?",
+            (namespace, time.time()),
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+    except Exception as e:
+        print(f"⚠️ Cache scan error ({namespace}): {e}")
+        return []
+
+
+def cache_stats(namespace=None):
+    """Hit/miss counters and entry counts, per namespace"""
+    cache_flush()
+    try:
+        conn = _get_conn()
+        if namespace:
+            rows = conn.execute(
+                "SELECT namespace, hits, misses, evictions FROM cache_stats WHERE namespace = ?",
+                (namespace,),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT namespace, hits, misses, evictions FROM cache_stats"
+            ).fetchall()
+
+        stats = {}
+        for ns, hits, misses, evictions in rows:
+            entries = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (ns,)
+            ).fetchone()[0]
+            total = hits + misses
+            stats[ns] = {
+                "hits": hits,
+                "misses": misses,
+                "evictions": evictions,
+                "entries": entries,
+                "hit_rate": round(hits / total, 3) if total else 0.0,
+            }
+        return stats
+    except Exception as e:
+        print(f"⚠️ Cache stats error: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    # python shared_cache.py stats
+    # python shared_cache.py invalidate geocode ["63 Hobart Street, Miramar"]
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if command == "stats":
+        print(json.dumps(cache_stats(), indent=2))
+    elif command == "invalidate" and len(sys.argv) >= 3:
+        query = sys.argv[3] if len(sys.argv) > 3 else None
+        cache_invalidate(sys.argv[2], canonicalize_query(query) if query else None)
+    else:
+        print("Usage: python shared_cache.py stats | invalidate <namespace> [query]")
+        sys.exit(1)
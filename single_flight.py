@@ -0,0 +1,58 @@
+"""
+Single-flight de-duplication for Kiwi Cabs AI IVR
+When several request threads ask for the same Google Maps / OpenAI lookup at
+once (e.g. "Wellington Airport" in the morning peak), only the first one makes
+the external call; the rest wait for it and share its result.
+
+Results are shared objects - callers must treat them as read-only.
+"""
+
+import threading
+
+_lock = threading.Lock()
+_inflight = {}
+_stats = {"leaders": 0, "shared": 0}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(key, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) once per key among concurrent callers"""
+    with _lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _inflight[key] = call
+            _stats["leaders"] += 1
+        else:
+            _stats["shared"] += 1
+
+    if not leader:
+        print(f"🔗 Joining in-flight request: {key}")
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = fn(*args, **kwargs)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def single_flight_stats():
+    """How many external calls were made vs. joined by waiting threads"""
+    with _lock:
+        return {**_stats, "in_flight": len(_inflight)}
@@ -0,0 +1,227 @@
+"""
+Single-pass booking speech tokenizer for Kiwi Cabs AI IVR
+Lowercases a caller's utterance once and finds every date/time phrase and
+slot cue ("from", "going to", "my name is") with one precompiled
+alternation, instead of dozens of substring scans and re.search calls over
+the same string. Keywords match whole words only ("snow" isn't "now"), and
+"no" is not a time at all - the old keyword list read it, and so "noon" and
+"know", as ASAP, which made "no, tomorrow at 5pm" an immediate booking.
+
+slot_spans() turns the token stream into name/pickup/destination/date/time
+spans of the original text, and booking_time() does the pickup date/time
+arithmetic for extract_booking_time - no network calls. The time step only
+needs the date/time kinds, so booking_time() scans with those alone unless
+it's handed a full token list.
+
+    python bench_speech_parser.py     # per-utterance cost and changed parses
+"""
+
+import re
+from datetime import timedelta
+
+# (kind, alternatives) - where phrases overlap at the same position the
+# earlier kind/alternative wins, so longer phrases come first
+_TOKEN_KINDS = [
+    ("after_tomorrow", r"the day after tomorrow|day after tomorrow|after tomorrow|2 days|two days"),
+    ("tomorrow", r"tomorrow morning|tomorrow afternoon|tomorrow evening|tomorrow night|tomorrow"),
+    ("today", r"later today|tonight|today|this afternoon|this evening|this morning"),
+    ("half_hour", r"in half an hour|in half hour|half an hour|half hour|30 minutes"),
+    ("noon", r"12 noon|12 midday|midday|noon"),
+    ("in_minutes", r"in (?P<minutes>\d+) minutes?"),
+    ("in_hours", r"in (?P<hours>\d+) hours?"),
+    ("immediate", r"right now|now|asap|as soon as possible|immediately|straight away"),
+    ("ordinal", r"(?P<day>\d{1,2})(?:st|nd|rd|th)"),
+    # "at 5pm" / "time 5pm" is kept as one token so it can beat an earlier bare clock time
+    ("clock", r"(?P<said_at>(?:at|time) )?(?P<clock_time>\d{1,2}:?\d{0,2}) ?(?P<meridiem>[ap]\.? ?m\.?)"),
+    # "at 6:30" / "6 o'clock" says when, but not which half of the day - a time span only
+    ("bare_clock", r"\d{1,2}:\d{2}|\d{1,2} o'?clock"),
+]
+_TEMPORAL = {kind for kind, _ in _TOKEN_KINDS}
+
+# Slot cues, after the date/time kinds so "at 5pm" stays one clock token
+_CUE_KINDS = [
+    ("destination_cue",
+     r"i am going to|i'm going to|going to|heading to|head to|goes to|go to|take me to"
+     r"|drop me off at|drop me off to|drop me at|drop off at|drop off to|to|going"),
+    ("name_cue", r"my name is|my name's|name's|this is|i'm|i am|it's"),
+    ("pickup_cue",
+     r"pick me up from|pick me up at|pick up from|pick up at|pickup from|picked up from|collect me from"
+     r"|pick me up|pick up|pickup|collect me|from"),
+    ("at", r"at|around|by|on"),
+    ("joiner", r"and"),
+    ("thanks", r"thanks|thank you"),
+]
+
+
+def _compile(kinds):
+    return re.compile(
+        r"(?<![a-z0-9'])(?:"
+        + "|".join(f"(?P<{kind}>{alternatives})" for kind, alternatives in kinds)
+        + r")(?![a-z0-9'])"
+    )
+
+
+TIME_TOKEN_RE = _compile(_TOKEN_KINDS)
+TOKEN_RE = _compile(_TOKEN_KINDS + _CUE_KINDS)
+
+# "to book a taxi" / "want to go" aren't the destination
+_NOT_DESTINATION_BEFORE = re.compile(r"(?:want|need|like|have|able|going|wanted|needs?)\s*$")
+_NAME_STOP_WORDS = (
+    "need", "want", "going", "from", "taxi", "booking", "street", "road", "avenue", "lane", "drive",
+    "terrace", "quay", "parade", "crescent", "place", "airport", "hospital", "station",
+)
+
+
+def tokenize(text, pattern=TOKEN_RE):
+    """[(kind, match)] for every date/time phrase and slot cue in text, in one pass"""
+    return [(match.lastgroup, match) for match in pattern.finditer((text or "").lower())]
+
+
+def _is_time_at(tokens, index):
+    """True for "at"/"on"/"by" introducing a time or date ("at noon", "on the 25th")"""
+    if index + 1 >= len(tokens):
+        return False
+    match, next_kind, next_match = tokens[index][1], tokens[index + 1][0], tokens[index + 1][1]
+    return next_kind in _TEMPORAL and match.string[match.end():next_match.start()].strip() in ("", "the")
+
+
+def _span_end(tokens, index, stop_kinds):
+    """End of the span that starts after tokens[index]: the next stop token, time or comma"""
+    lower = tokens[index][1].string
+    end = len(lower)
+    comma = lower.find(",", tokens[index][1].end())
+    if comma != -1:
+        end = comma
+    for i in range(index + 1, len(tokens)):
+        kind, match = tokens[i]
+        if match.start() >= end:
+            break
+        if kind in stop_kinds or kind in _TEMPORAL or (kind == "at" and _is_time_at(tokens, i)):
+            return match.start()
+    return end
+
+
+def _span(text, start, end):
+    while start < end and text[start] == " ":
+        start += 1
+    while end > start and text[end - 1] in " .?!":
+        end -= 1
+    return (start, end, text[start:end]) if end > start else None
+
+
+def slot_spans(text, tokens=None):
+    """
+    Where each booking slot was said: {"name", "pickup", "destination",
+    "date", "time"} -> (start, end, original text), for the slots present.
+    """
+    text = text or ""
+    tokens = tokenize(text) if tokens is None else tokens
+    spans = {}
+
+    for i, (kind, match) in enumerate(tokens):
+        if kind == "name_cue" and "name" not in spans:
+            span = _span(text, match.end(), _span_end(tokens, i, {"pickup_cue", "destination_cue", "joiner", "name_cue"}))
+            if span and not any(ch.isdigit() for ch in span[2]) and not any(w in span[2].lower() for w in _NAME_STOP_WORDS):
+                spans["name"] = span
+        elif kind == "pickup_cue" and "pickup" not in spans:
+            span = _span(text, match.end(), _span_end(tokens, i, {"destination_cue", "name_cue", "joiner"}))
+            if span:
+                spans["pickup"] = span
+        elif kind == "destination_cue" and "destination" not in spans:
+            if match.group() == "to" and _NOT_DESTINATION_BEFORE.search(match.string[:match.start()]):
+                continue
+            span = _span(text, match.end(), _span_end(tokens, i, {"thanks", "pickup_cue"}))
+            if span:
+                spans["destination"] = span
+
+    kinds = {}
+    for token in tokens:
+        kinds.setdefault(token[0], token)
+    for kind in ("immediate", "after_tomorrow", "tomorrow", "ordinal", "today"):
+        if kind in kinds:
+            match = kinds[kind][1]
+            spans["date"] = (match.start(), match.end(), text[match.start():match.end()])
+            break
+    time_token = _time_token(tokens, kinds) or kinds.get("bare_clock")
+    if time_token:
+        match = time_token[1]
+        spans["time"] = (match.start(), match.end(), text[match.start():match.end()])
+    return spans
+
+
+def _time_token(tokens, kinds):
+    """The token that says when, in the same precedence as the original parser"""
+    for kind in ("half_hour", "noon", "immediate", "in_minutes", "in_hours"):
+        if kind in kinds:
+            return kinds[kind]
+    # "at 5pm" / "time 5pm" beats a bare clock time said earlier
+    for token in tokens:
+        if token[0] == "clock" and token[1].group("said_at"):
+            return token
+    return kinds.get("clock")
+
+
+def clock_to_24h(clock, meridiem):
+    """("5", "p.m.") -> "17:00", ("1030", "am") -> "10:30" """
+    clock = clock.replace(":", "")
+    hour, minute = (int(clock[:-2]), clock[-2:]) if len(clock) > 2 else (int(clock), "00")
+    if meridiem.replace(".", "").replace(" ", "").lower() == "pm":
+        if hour != 12:
+            hour += 12
+    elif hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute}"
+
+
+def booking_time(text, now, tokens=None):
+    """
+    {"pickup_date": "DD/MM/YYYY" or "", "pickup_time": "HH:MM", "ASAP" or ""}
+    for an utterance, with relative times worked out from now (NZ time).
+    tokens may be the utterance's tokenize() result, to reuse that pass.
+    """
+    result = {"pickup_date": "", "pickup_time": ""}
+    tokens = tokenize(text, TIME_TOKEN_RE) if tokens is None else tokens
+    if not tokens:
+        return result
+    kinds = {}
+    for token in tokens:
+        kinds.setdefault(token[0], token)
+
+    if "immediate" in kinds:
+        result["pickup_date"] = now.strftime("%d/%m/%Y")
+        result["pickup_time"] = "ASAP"
+    elif "after_tomorrow" in kinds:
+        result["pickup_date"] = (now + timedelta(days=2)).strftime("%d/%m/%Y")
+    elif "tomorrow" in kinds:
+        result["pickup_date"] = (now + timedelta(days=1)).strftime("%d/%m/%Y")
+    elif "ordinal" in kinds:
+        day = int(kinds["ordinal"][1].group("day"))
+        month, year = now.month, now.year
+        # A day that's already passed this month means next month
+        if day < now.day:
+            month, year = (1, year + 1) if month == 12 else (month + 1, year)
+        try:
+            result["pickup_date"] = now.replace(year=year, month=month, day=day).strftime("%d/%m/%Y")
+        except ValueError:
+            pass
+    elif "today" in kinds:
+        result["pickup_date"] = now.strftime("%d/%m/%Y")
+
+    token = _time_token(tokens, kinds)
+    kind = token[0] if token else None
+    if kind == "half_hour":
+        result["pickup_time"] = (now + timedelta(minutes=30)).strftime("%H:%M")
+        result["pickup_date"] = now.strftime("%d/%m/%Y")
+    elif kind == "noon":
+        result["pickup_time"] = "12:00"
+        result["pickup_date"] = result["pickup_date"] or now.strftime("%d/%m/%Y")
+    elif kind in ("in_minutes", "in_hours"):
+        if kind == "in_minutes":
+            later = now + timedelta(minutes=int(token[1].group("minutes")))
+        else:
+            later = now + timedelta(hours=int(token[1].group("hours")))
+        result["pickup_time"] = later.strftime("%H:%M")
+        result["pickup_date"] = now.strftime("%d/%m/%Y")
+    elif kind == "clock":
+        result["pickup_time"] = clock_to_24h(token[1].group("clock_time"), token[1].group("meridiem"))
+    return result
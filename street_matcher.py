@@ -0,0 +1,240 @@
+"""
+Fuzzy street/suburb correction for Kiwi Cabs AI IVR
+Fixes misheard Wellington street and suburb names ("Belrose" → "Melrose",
+"Mirmar" → "Miramar") against the gazetteer's official name list using a
+trigram index, so an LLM call is only needed when the local match is ambiguous.
+Street names are only rewritten against a complete (LINZ-built) list; with the
+seed list alone an unlisted street may simply be real.
+"""
+
+import os
+import re
+import csv
+import threading
+
+import gazetteer
+from shared_cache import canonicalize_query
+
+# Below this the caller should fall back to the LLM
+STREET_MATCH_CONFIDENCE = float(os.getenv("STREET_MATCH_CONFIDENCE", "0.8"))
+
+SPEECH_ALIASES_CSV = os.path.join(gazetteer.DATA_DIR, "speech_aliases.csv")
+
+# Names this short are one letter away from plenty of real ones
+_SHORT_NAME = 5
+_SHORT_NAME_PENALTY = 0.8
+
+STREET_TYPES = {
+    "street", "road", "avenue", "drive", "terrace", "parade", "place",
+    "crescent", "highway", "lane", "quay", "way", "grove", "close", "court",
+    "square", "esplanade", "heights", "rise", "broadway", "mall", "row",
+}
+
+_NUMBER_RE = re.compile(
+    r"^(?P<number>(?:(?:unit|flat|apartment)\s+\w+\s+(?:at\s+)?)?(?:\w+/)?\d+[a-z]?)\s+(?P<rest>.+)$"
+)
+
+_lock = threading.Lock()
+_matchers = None
+_aliases = None
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a, b):
+    """1 - normalised Levenshtein distance"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] if char_a == char_b else previous[j - 1] + 1
+            up = previous[j] + 1
+            left = left + 1
+            if up < cost:
+                cost = up
+            if left < cost:
+                cost = left
+            current.append(cost)
+            left = cost
+        previous = current
+    return 1.0 - previous[-1] / max(len(a), 1)
+
+
+def _core(name):
+    """The name without its street type word: "hill street" → "hill" """
+    tokens = name.split()
+    return " ".join(tokens[:-1]) if len(tokens) > 1 and tokens[-1] in STREET_TYPES else name
+
+
+def _score(query, candidate):
+    """
+    Similarity of a heard name to a listed one. The distinctive part of the
+    name has to match too, so "hall street" isn't 91% "hill street", and one
+    edit in a short name ("hall"/"hill", "mill"/"hill") is marked down again.
+    """
+    score = min(_similarity(query, candidate), _similarity(_core(query), _core(candidate)))
+    if score < 1.0 and len(_core(candidate)) <= _SHORT_NAME:
+        score *= _SHORT_NAME_PENALTY
+    return score
+
+
+class _TrigramIndex:
+    """Inverted trigram index for candidates, re-ranked by edit distance"""
+
+    # Only the best few trigram candidates are worth an edit-distance check
+    SHORTLIST = 4
+
+    def __init__(self, names):
+        # canonical form -> display name
+        self.names = {}
+        self.grams = {}
+        self.postings = {}
+        for display in names:
+            canonical = canonicalize_query(display)
+            if not canonical or canonical in self.names:
+                continue
+            self.names[canonical] = display
+            grams = _trigrams(canonical)
+            self.grams[canonical] = grams
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(canonical)
+
+    def match(self, text):
+        """Best (display_name, confidence) for text, or (None, 0.0)"""
+        canonical = canonicalize_query(text)
+        if not canonical:
+            return None, 0.0
+        if canonical in self.names:
+            return self.names[canonical], 1.0
+
+        query = _trigrams(canonical)
+        shared = {}
+        for gram in query:
+            for candidate in self.postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        if not shared:
+            return None, 0.0
+
+        shortlist = sorted(
+            shared,
+            key=lambda c: 2.0 * shared[c] / (len(query) + len(self.grams[c])),
+            reverse=True,
+        )[:self.SHORTLIST]
+        scored = sorted(((_score(canonical, c), c) for c in shortlist), reverse=True)
+        best_score, best = scored[0]
+        # Two near-equal candidates means we can't tell which one they meant
+        if len(scored) > 1 and scored[1][0] >= best_score - 0.05:
+            best_score *= 0.7
+        return self.names[best], round(best_score, 3)
+
+
+def _get_matchers():
+    global _matchers, _aliases
+    if _matchers is not None:
+        return _matchers
+    with _lock:
+        if _matchers is None:
+            streets = gazetteer.known_names(gazetteer.KIND_STREET)
+            suburbs = gazetteer.known_names(gazetteer.KIND_SUBURB)
+            _matchers = {
+                "street": _TrigramIndex(sorted({street for street, _ in streets})),
+                "suburb": _TrigramIndex(sorted({suburb for suburb, _ in suburbs})),
+            }
+            _aliases = []
+            try:
+                with open(SPEECH_ALIASES_CSV, newline="") as f:
+                    for row in csv.DictReader(f):
+                        _aliases.append((canonicalize_query(row["heard"]), row["meant"]))
+            except OSError as e:
+                print(f"⚠️ Speech aliases not loaded: {e}")
+            print(f"✅ Street matcher ready: {len(_matchers['street'].names)} streets, "
+                  f"{len(_matchers['suburb'].names)} suburbs")
+    return _matchers
+
+
+def match_street(text):
+    """(official street name, confidence) for a possibly misheard street name"""
+    return _get_matchers()["street"].match(text)
+
+
+def match_suburb(text):
+    """(official suburb name, confidence) for a possibly misheard suburb name"""
+    return _get_matchers()["suburb"].match(text)
+
+
+def _apply_aliases(canonical):
+    """A known whole-utterance mishearing ("63rd street melbourne") → what was meant.
+    Never applied inside a longer address - "7 mill street" is a real address."""
+    _get_matchers()
+    for heard, meant in _aliases:
+        if canonical == heard:
+            return canonicalize_query(meant), True
+    return canonical, False
+
+
+def correct_address(text):
+    """
+    Correct the street and suburb names in a spoken address.
+
+    Returns a dict with the corrected "text", the matched "number", "street"
+    and "suburb" (None when not present), an overall "confidence" in 0-1 and
+    "exact" when the street (and suburb) were said exactly as listed. Callers
+    should only trust the correction at or above STREET_MATCH_CONFIDENCE.
+
+    A street that isn't listed is only rewritten to its nearest listed name
+    when the list is complete (gazetteer.street_list_complete()) - otherwise
+    it may just be a real street we don't have, and the text is left alone.
+    """
+    result = {"text": text, "number": None, "street": None, "suburb": None, "confidence": 0.0, "exact": False}
+    if not text:
+        return result
+
+    canonical = canonicalize_query(text)
+    # "flat2 slash 55" / "flat 2/55" → "2/55"
+    canonical = re.sub(r"\b(?:unit|flat|apartment)\s*(\d+[a-z]?)\s*(?:/|slash)\s*(\d+)", r"\1/\2", canonical)
+    canonical = re.sub(r"\b(\d+[a-z]?)\s+slash\s+(\d+)", r"\1/\2", canonical)
+    canonical, aliased = _apply_aliases(canonical)
+
+    match = _NUMBER_RE.match(canonical)
+    number = match.group("number") if match else None
+    tokens = (match.group("rest") if match else canonical).split()
+
+    # The street ends at its type word ("road", "street", ...); anything after is the suburb
+    type_index = max((i for i, token in enumerate(tokens) if token in STREET_TYPES), default=None)
+    if type_index is not None:
+        street_tokens, suburb_tokens = tokens[:type_index + 1], tokens[type_index + 1:]
+    else:
+        street_tokens, suburb_tokens = tokens, []
+        # No type word - see if the tail is a suburb on its own
+        for size in (2, 1):
+            if len(tokens) > size:
+                suburb, confidence = match_suburb(" ".join(tokens[-size:]))
+                if confidence >= STREET_MATCH_CONFIDENCE:
+                    street_tokens, suburb_tokens = tokens[:-size], tokens[-size:]
+                    break
+
+    street, street_confidence = match_street(" ".join(street_tokens)) if street_tokens else (None, 0.0)
+    confidences = [street_confidence]
+    suburb = None
+    if suburb_tokens:
+        suburb, suburb_confidence = match_suburb(" ".join(suburb_tokens))
+        confidences.append(suburb_confidence)
+
+    confidence = min(confidences)
+    exact = bool(street) and confidence == 1.0
+    if street and confidence >= STREET_MATCH_CONFIDENCE and (street_confidence == 1.0 or gazetteer.street_list_complete()):
+        parts = [f"{number} {street}" if number else street]
+        if suburb:
+            parts.append(suburb)
+        result["text"] = ", ".join(parts)
+    elif aliased:
+        result["text"] = canonical
+
+    result.update(number=number, street=street, suburb=suburb, confidence=confidence, exact=exact)
+    return result
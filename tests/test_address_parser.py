@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+import address_parser
+import gazetteer
+import street_matcher
+
+
+@pytest.fixture(autouse=True)
+def seed_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", str(tmp_path / "gazetteer.idx"))
+    monkeypatch.setattr(gazetteer, "_index", None)
+    monkeypatch.setattr(street_matcher, "_matchers", None)
+    monkeypatch.setattr(street_matcher, "_lock", threading.Lock())
+    monkeypatch.setattr(address_parser, "_street_suburbs", None)
+
+
+def test_exact_street_parses_without_the_llm():
+    result = address_parser.parse_address_local("flat 2 slash 55 melrose road melrose")
+    assert result["clean_address"] == "2/55 Melrose Road, Melrose"
+    assert result["exact"]
+    assert result["confidence"] >= address_parser.ADDRESS_PARSER_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", ["40 Hall Street", "7 Mill Street"])
+def test_unlisted_street_is_left_to_the_llm(text):
+    result = address_parser.parse_address_local(text)
+    assert result["clean_address"] is None
+    assert result["corrected_text"] == text
+    assert result["confidence"] < address_parser.ADDRESS_PARSER_CONFIDENCE
+
+
+def test_fuzzy_correction_stays_below_the_threshold(monkeypatch):
+    monkeypatch.setattr(gazetteer, "street_list_complete", lambda: True)
+    result = address_parser.parse_address_local("12 belrose road melrose")
+    assert result["clean_address"] == "12 Melrose Road, Melrose"
+    assert not result["exact"]
+    assert result["confidence"] < address_parser.ADDRESS_PARSER_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", ["10 queens drive", "3 park road", "22 victoria street"])
+def test_suburb_is_not_guessed_from_the_seed_list(text):
+    result = address_parser.parse_address_local(text)
+    assert result["clean_address"] is None
+    assert result["confidence"] == 0
+
+
+def test_only_listed_suburb_is_inferred_from_a_complete_list(monkeypatch):
+    monkeypatch.setattr(gazetteer, "street_list_complete", lambda: True)
+    result = address_parser.parse_address_local("flat 2 slash 55 melrose road")
+    assert result["clean_address"] == "2/55 Melrose Road, Melrose"
@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import eta_estimator
+from eta_estimator import NZ_ZONE, calibrate, estimate_trip, haversine_m, time_bucket
+
+AIRPORT = [174805300, -41327200]
+RAILWAY_STATION = [174780600, -41278900]
+
+
+@pytest.fixture(autouse=True)
+def fresh_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(eta_estimator, "ETA_MODEL_PATH", str(tmp_path / "eta_model.json"))
+    monkeypatch.setattr(eta_estimator, "_model", None)
+
+
+def test_time_buckets():
+    assert time_bucket(datetime(2026, 10, 14, 8, 0, tzinfo=NZ_ZONE)) == "wd-am"  # Wednesday
+    assert time_bucket(datetime(2026, 10, 14, 17, 30, tzinfo=NZ_ZONE)) == "wd-pm"
+    assert time_bucket(datetime(2026, 10, 17, 2, 0, tzinfo=NZ_ZONE)) == "we-night"  # Saturday
+    assert time_bucket(datetime(2026, 10, 18, 21, 0, tzinfo=NZ_ZONE)) == "we-eve"
+
+
+def test_haversine_airport_to_station():
+    assert haversine_m(AIRPORT, RAILWAY_STATION) == pytest.approx(5800, rel=0.05)
+    assert haversine_m(AIRPORT, AIRPORT) == 0
+
+
+def test_estimate_uses_default_band_speed():
+    departure = datetime(2026, 10, 14, 8, 0, tzinfo=NZ_ZONE)
+    distance, duration = estimate_trip(AIRPORT, RAILWAY_STATION, departure)
+    assert distance == int(haversine_m(AIRPORT, RAILWAY_STATION) * 1.35)
+    assert duration == int(distance / (24 / 3.6))
+
+
+def test_next_door_trip_takes_at_least_a_minute():
+    assert estimate_trip(AIRPORT, [AIRPORT[0] + 100, AIRPORT[1]])[1] == 60
+
+
+def test_calibrate_fits_cached_routes(monkeypatch):
+    straight = haversine_m(AIRPORT, RAILWAY_STATION)
+    routes = [
+        (f"airport-station-{i}@wd-am", [straight * 1.5, straight * 1.5 / (20 / 3.6), "", AIRPORT, RAILWAY_STATION])
+        for i in range(eta_estimator.MIN_CALIBRATION_SAMPLES)
+    ]
+    # Too few for its band to be calibrated, and an unusable legacy entry
+    routes.append(("airport-station@we-day", [straight * 1.5, straight * 1.5 / (50 / 3.6), "", AIRPORT, RAILWAY_STATION]))
+    routes.append(("old-entry", [5000, 600, ""]))
+    monkeypatch.setattr(eta_estimator, "cache_items", lambda namespace: iter(routes))
+
+    model = calibrate()
+    assert model["circuity"] == pytest.approx(1.5)
+    assert model["speeds_kmh"]["wd-am"] == pytest.approx(20, abs=0.1)
+    assert model["speeds_kmh"]["we-day"] == eta_estimator.DEFAULT_MODEL["speeds_kmh"]["we-day"]
+    assert model["samples"] == 6
+
+    # Saved model is what a fresh process loads
+    with open(eta_estimator.ETA_MODEL_PATH) as f:
+        assert json.load(f) == model
+    monkeypatch.setattr(eta_estimator, "_model", None)
+    assert eta_estimator.model_info() == model
@@ -0,0 +1,45 @@
+import pytest
+
+import gazetteer
+
+
+@pytest.fixture(autouse=True)
+def seed_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", str(tmp_path / "gazetteer.idx"))
+    monkeypatch.setattr(gazetteer, "_index", None)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("train station", "Wellington Railway Station"),
+    ("the station, Wellington", "Wellington Railway Station"),
+    ("hospital newtown", "Wellington Regional Hospital"),
+    ("the hospital, Riddiford Street, Newtown", "Wellington Regional Hospital"),
+    ("Hutt Hospital, Lower Hutt", "Hutt Hospital"),
+    ("airport", "Wellington International Airport"),
+])
+def test_poi_with_its_own_suburb_or_city(text, expected):
+    assert gazetteer.lookup(text)["formatted_address"].startswith(expected)
+
+
+@pytest.mark.parametrize("text", [
+    "train station, Upper Hutt",
+    "the station petone",
+    "station, Porirua",
+    "hospital, lower hutt",
+])
+def test_generic_poi_in_another_city_falls_through(text):
+    assert gazetteer.lookup(text) is None
+
+
+def test_interpolates_between_same_side_neighbours():
+    points = [(2, 100, 200), (10, 500, 600), (3, 0, 0)]
+    points.sort()
+    assert gazetteer._interpolate(points, 10) == (500, 600, "ROOFTOP")
+    assert gazetteer._interpolate(points, 6) == (300, 400, "RANGE_INTERPOLATED")
+    # No odd-numbered neighbour above 5
+    assert gazetteer._interpolate(points, 5) is None
+
+
+def test_suburb_info():
+    assert gazetteer.suburb_info("te aro") == ("Te Aro", "Wellington", "6011")
+    assert gazetteer.suburb_info("atlantis") is None
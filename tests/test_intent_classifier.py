@@ -0,0 +1,64 @@
+import pytest
+
+import intent_classifier
+
+
+@pytest.mark.parametrize("text", [
+    "I don't want to change anything",
+    "no I don't need to change it",
+    "actually I don't need a different time",
+    "I don't want to cancel",
+])
+def test_negated_change_is_not_a_cancel(text):
+    result = intent_classifier.classify(text)
+    assert result["intent"] == "no_change"
+
+
+@pytest.mark.parametrize("text", ["cancel it", "i don't need the taxi anymore", "don't send the taxi"])
+def test_cancel(text):
+    result = intent_classifier.classify(text)
+    assert result["intent"] == "cancel"
+    assert result["confidence"] >= intent_classifier.INTENT_CONFIDENCE
+
+
+@pytest.mark.parametrize("text, value", [
+    ("I need to go at 6 instead", "6"),
+    ("can we go at 7 pm", "7 pm"),
+])
+def test_bare_hour_after_at_is_a_time(text, value):
+    result = intent_classifier.classify(text)
+    assert (result["intent"], result["new_value"]) == ("change_time", value)
+
+
+@pytest.mark.parametrize("text, intent, value", [
+    ("go to the airport instead", "change_destination", "the airport"),
+    ("pick me up from the james cook hotel", "change_pickup", "the james cook hotel"),
+    ("pick me up at 6", "change_time", "6"),
+])
+def test_values(text, intent, value):
+    result = intent_classifier.classify(text)
+    assert (result["intent"], result["new_value"]) == (intent, value)
+
+
+def test_missing_value_is_not_confident():
+    assert intent_classifier.classify("i want to change my destination")["confidence"] < intent_classifier.INTENT_CONFIDENCE
+
+
+def test_eval_set_is_not_training_data():
+    trained_on = {intent_classifier.normalize(text) for text, _, _ in intent_classifier.load_examples()}
+    held_out = intent_classifier.load_examples(intent_classifier.INTENT_EVAL_CSV)
+    assert held_out
+    assert not trained_on & {intent_classifier.normalize(text) for text, _, _ in held_out}
+
+
+@pytest.mark.parametrize("text", ["no", "no thanks", "nothing that's all", "leave it as it is", "no it's fine"])
+def test_bare_no_is_no_change(text):
+    result = intent_classifier.classify(text)
+    assert result["intent"] == "no_change"
+    assert result["confidence"] >= intent_classifier.INTENT_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", ["no, the hospital", "no, not the airport, the hospital"])
+def test_no_followed_by_a_place_is_left_to_the_llm(text):
+    result = intent_classifier.classify(text)
+    assert result["intent"] != "no_change" or result["confidence"] < intent_classifier.INTENT_CONFIDENCE
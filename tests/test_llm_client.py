@@ -0,0 +1,136 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import requests
+
+import llm_client
+from llm_client import LLMError, chat_completion, llm_stats, stream_chat_completion
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, lines=(), headers=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.lines = lines
+        self.headers = headers or {}
+        self.text = json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "_stats", {})
+    monkeypatch.setattr(llm_client, "_backoff", lambda attempt, retry_after=None: 0)
+    fake = FakeSession()
+    monkeypatch.setattr(llm_client, "_get_session", lambda: fake)
+    return fake
+
+
+def _reply(content, usage=None):
+    return FakeResponse(body={"choices": [{"message": {"content": content}}], "usage": usage or {}})
+
+
+def test_chat_completion_returns_reply_and_counts_tokens(session):
+    session.responses.append(_reply(" 2 Kent Terrace ", {"prompt_tokens": 40, "completion_tokens": 5}))
+    assert chat_completion([{"role": "user", "content": "hi"}], purpose="parse_address", timeout=4) == "2 Kent Terrace"
+    assert session.calls[0]["timeout"] == (llm_client.LLM_CONNECT_TIMEOUT, 4)
+
+    stats = llm_stats()["parse_address"]
+    assert stats["calls"] == 1 and stats["errors"] == 0
+    assert stats["prompt_tokens"] == 40 and stats["completion_tokens"] == 5
+
+
+def test_retries_network_errors_and_5xx(session):
+    session.responses += [requests.ConnectionError("reset"), FakeResponse(503), _reply("ok")]
+    assert chat_completion([], purpose="intent") == "ok"
+    assert llm_stats()["intent"]["retries"] == 2
+
+
+def test_client_errors_are_not_retried(session):
+    session.responses += [FakeResponse(400, {"error": "bad request"}), _reply("unused")]
+    with pytest.raises(LLMError):
+        chat_completion([], purpose="intent")
+    assert len(session.calls) == 1
+    assert llm_stats()["intent"]["errors"] == 1
+
+
+def test_bad_response_body_raises(session):
+    session.responses.append(FakeResponse(body={"choices": []}))
+    with pytest.raises(LLMError):
+        chat_completion([], purpose="intent")
+
+
+def test_missing_api_key_raises(session, monkeypatch):
+    monkeypatch.setattr(llm_client, "OPENAI_API_KEY", None)
+    with pytest.raises(LLMError):
+        chat_completion([])
+    assert session.calls == []
+
+
+def _chunk(text):
+    return b"data: " + json.dumps({"choices": [{"delta": {"content": text}}]}).encode()
+
+
+def test_stream_hands_back_each_line(session):
+    session.responses.append(FakeResponse(lines=[
+        _chunk("pickup: 2 Kent"), _chunk(" Terrace\ndrop"), b"", _chunk("off: airport"),
+        b"data: " + json.dumps({"choices": [], "usage": {"completion_tokens": 9}}).encode(),
+        b"data: [DONE]",
+    ]))
+    lines = []
+    reply = stream_chat_completion([], purpose="parse_address", on_line=lines.append)
+
+    assert reply == "pickup: 2 Kent Terrace\ndropoff: airport"
+    assert lines == ["pickup: 2 Kent Terrace", "dropoff: airport"]
+    stats = llm_stats()["parse_address"]
+    assert stats["streamed"] == 1 and stats["completion_tokens"] == 9
+    assert stats["avg_first_token"] is not None
+
+
+def test_deadline_bounds_read_timeout_and_retries(session, monkeypatch):
+    monkeypatch.setattr(llm_client, "_backoff", lambda attempt, retry_after=None: 1.0)
+    session.responses += [FakeResponse(503), _reply("too late")]
+    with pytest.raises(LLMError):
+        chat_completion([], purpose="parse_address", deadline=time.time() + 0.5)
+    # The read wait is cut to what's left, and a retry that would start after
+    # the deadline isn't made
+    assert len(session.calls) == 1
+    assert session.calls[0]["timeout"][1] <= 0.5
+
+
+def test_deadline_already_passed_makes_no_call(session):
+    with pytest.raises(LLMError):
+        chat_completion([], purpose="parse_address", deadline=0)
+    assert session.calls == []
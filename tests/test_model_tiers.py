@@ -0,0 +1,67 @@
+import pytest
+
+import model_tiers
+from model_tiers import model_tier_stats, run_tiers
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(model_tiers, "_stats", {})
+
+
+def _exact_geocode(answer):
+    return answer if answer.get("exact") else None
+
+
+def test_first_validated_tier_wins():
+    calls = []
+
+    def tier(name, answer):
+        def produce():
+            calls.append(name)
+            return answer
+        return name, produce
+
+    tiers = [
+        tier("cache", None),
+        tier("small", {"address": "Kent Tce", "exact": False}),
+        tier("large", {"address": "2 Kent Terrace", "exact": True}),
+        tier("never", {"address": "unused", "exact": True}),
+    ]
+    assert run_tiers("parse_address", tiers, _exact_geocode) == ("large", {"address": "2 Kent Terrace", "exact": True})
+    assert calls == ["cache", "small", "large"]
+
+    stats = model_tier_stats()["parse_address"]
+    assert stats["cache"]["answered"] == 0 and stats["cache"]["validated"] == 0
+    assert stats["small"]["answered"] == 1 and stats["small"]["success_rate"] == 0.0
+    assert stats["large"]["validated"] == 1 and stats["large"]["success_rate"] == 1.0
+    assert "never" not in stats
+
+
+def test_tier_exception_counts_as_error_and_escalates():
+    def broken():
+        raise TimeoutError("small model timed out")
+
+    tiers = [("small", broken), ("large", lambda: {"exact": True})]
+    assert run_tiers("parse_address", tiers, _exact_geocode) == ("large", {"exact": True})
+    assert model_tier_stats()["parse_address"]["small"]["errors"] == 1
+
+
+def test_every_tier_failing_returns_none():
+    tiers = [("small", lambda: {"exact": False}), ("large", lambda: {"exact": False})]
+    assert run_tiers("parse_address", tiers, _exact_geocode) == (None, None)
+    stats = model_tier_stats()["parse_address"]
+    assert stats["small"]["calls"] == stats["large"]["calls"] == 1
+    assert "total_latency" not in stats["large"]
+
+
+def test_no_tier_starts_after_the_deadline():
+    calls = []
+
+    def slow_small():
+        calls.append("small")
+        return {"exact": False}
+
+    tiers = [("small", slow_small), ("large", lambda: calls.append("large") or {"exact": True})]
+    assert run_tiers("parse_address", tiers, _exact_geocode, deadline=0) == (None, None)
+    assert calls == []
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+import rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def limiter_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_DB_PATH", str(tmp_path / "limits.sqlite3"))
+    monkeypatch.setattr(rate_limiter, "_local", threading.local())
+    # 1 token/s, bucket of 4 - slow enough that refill during a test is negligible
+    monkeypatch.setitem(rate_limiter.ENDPOINT_BUDGETS, "geocode", (1.0, 4.0, 0.005))
+
+
+def test_bucket_allows_a_burst_then_throttles():
+    assert all(rate_limiter.acquire("geocode", max_wait=0) for _ in range(4))
+    assert not rate_limiter.acquire("geocode", max_wait=0)
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+    for _ in range(4):
+        assert rate_limiter.acquire("geocode", max_wait=0)
+    assert not rate_limiter.acquire("geocode", max_wait=0)
+    clock[0] += 2.5
+    assert rate_limiter.acquire("geocode", max_wait=0)
+    assert rate_limiter.acquire("geocode", max_wait=0)
+    assert not rate_limiter.acquire("geocode", max_wait=0)
+
+
+def test_background_work_leaves_the_reserve_for_live_calls():
+    with rate_limiter.api_priority(rate_limiter.PRIORITY_BACKGROUND):
+        granted = sum(rate_limiter.acquire("geocode", max_wait=0) for _ in range(4))
+    assert granted == 4 * (1 - rate_limiter.BACKGROUND_RESERVE)
+    assert rate_limiter.acquire("geocode", max_wait=0)
+
+
+def test_rate_limited_call_raises_and_counts_spend(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "LIVE_MAX_WAIT", 0)
+    for _ in range(4):
+        assert rate_limiter.rate_limited_call("geocode", lambda: "ok") == "ok"
+    with pytest.raises(rate_limiter.RateLimitExceeded):
+        rate_limiter.rate_limited_call("geocode", lambda: "ok")
+
+    stats = rate_limiter.usage_stats()["geocode"]
+    assert (stats["calls"], stats["throttled"]) == (4, 1)
+    assert stats["spend_usd"] == pytest.approx(0.02)
@@ -0,0 +1,68 @@
+import random
+from array import array
+
+import pytest
+
+from route_geometry import (
+    decode_polyline_flat, pack_route, unpack_route, simplify_route, point_count, point_at,
+)
+
+
+def encode_polyline(latlngs):
+    """Google's polyline encoding, for building test input"""
+    out = []
+    prev_lat = prev_lng = 0
+    for lat, lng in latlngs:
+        lat_e5, lng_e5 = round(lat * 1e5), round(lng * 1e5)
+        for delta in (lat_e5 - prev_lat, lng_e5 - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lng = lat_e5, lng_e5
+    return "".join(out)
+
+
+def test_decodes_googles_example():
+    points = decode_polyline_flat("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+    assert points.tolist() == [-120200000, 38500000, -120950000, 40700000, -126453000, 43252000]
+
+
+def test_encode_decode_round_trip():
+    rng = random.Random(3)
+    latlngs = [(round(-41.28 + rng.uniform(-0.1, 0.1), 5), round(174.77 + rng.uniform(-0.1, 0.1), 5)) for _ in range(200)]
+    points = decode_polyline_flat(encode_polyline(latlngs))
+    assert point_count(points) == 200
+    assert [(points[i + 1] / 1e6, points[i] / 1e6) for i in range(0, len(points), 2)] == pytest.approx(latlngs)
+
+
+def test_truncated_polyline_raises():
+    with pytest.raises(ValueError):
+        decode_polyline_flat("_p~iF~ps|U_ulL")
+
+
+def test_pack_unpack_round_trip():
+    points = array("i", [174780600, -41278900, 174807600, -41327600])
+    assert unpack_route(pack_route(points)) == points
+    # Older cache entries stored [[lng, lat], ...]
+    assert unpack_route([[174780600, -41278900], [174807600, -41327600]]) == points
+
+
+def test_simplify_keeps_ends_and_drops_collinear_points():
+    straight = array("i")
+    for i in range(50):
+        straight.extend([174780000 + i * 100, -41280000])
+    simplified = simplify_route(straight, tolerance_m=1, max_points=80)
+    assert simplified.tolist() == [174780000, -41280000, 174784900, -41280000]
+
+
+def test_simplify_caps_points():
+    rng = random.Random(5)
+    wiggly = array("i")
+    for i in range(500):
+        wiggly.extend([174780000 + i * 500, -41280000 + rng.randint(-3000, 3000)])
+    simplified = simplify_route(wiggly, tolerance_m=0, max_points=40)
+    assert point_count(simplified) == 40
+    assert point_at(simplified, 0) == point_at(wiggly, 0)
+    assert point_at(simplified, -1) == point_at(wiggly, -1)
@@ -0,0 +1,65 @@
+import time
+import threading
+
+import pytest
+
+import shared_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(shared_cache, "_local", threading.local())
+    shared_cache._pending_counts.clear()
+    shared_cache._pending_touches.clear()
+    yield
+    shared_cache._pending_counts.clear()
+    shared_cache._pending_touches.clear()
+
+
+def test_round_trip_and_stats():
+    shared_cache.cache_set("geocode", "63 hobart street", {"lat": -41.3, "lng": 174.8}, ttl=60)
+    assert shared_cache.cache_get("geocode", "63 hobart street") == {"lat": -41.3, "lng": 174.8}
+    assert shared_cache.cache_get("geocode", "nowhere") is None
+
+    stats = shared_cache.cache_stats("geocode")["geocode"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_expired_entry_is_a_miss_and_evicted():
+    shared_cache.cache_set("geocode", "old", "value", ttl=-1)
+    assert shared_cache.cache_get("geocode", "old") is None
+
+    shared_cache._evict(shared_cache._get_conn(), "geocode")
+    stats = shared_cache.cache_stats("geocode")["geocode"]
+    assert stats["entries"] == 0
+    assert stats["evictions"] == 1
+
+
+def test_lru_eviction_keeps_recently_read_entries(monkeypatch):
+    monkeypatch.setattr(shared_cache, "CACHE_MAX_ENTRIES", 2)
+    for key in ("a", "b", "c"):
+        shared_cache.cache_set("ns", key, key, ttl=60)
+        time.sleep(0.01)
+    # Reading "a" makes it the most recently used once flushed
+    assert shared_cache.cache_get("ns", "a") == "a"
+    shared_cache.cache_flush()
+
+    shared_cache._evict(shared_cache._get_conn(), "ns")
+    assert dict(shared_cache.cache_items("ns")) == {"a": "a", "c": "c"}
+
+
+def test_read_does_not_take_the_write_lock():
+    shared_cache.cache_set("ns", "k", "v", ttl=60)
+    writer = shared_cache.sqlite3.connect(shared_cache.CACHE_DB_PATH, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.time()
+        assert shared_cache.cache_get("ns", "k") == "v"
+        assert time.time() - started < 0.5
+        # The batched stats wait for the writer rather than losing counts
+        assert shared_cache.cache_flush() is False
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    assert shared_cache.cache_stats("ns")["ns"]["hits"] == 1
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import single_flight
+from single_flight import single_flight as run_once, single_flight_stats
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(single_flight, "_inflight", {})
+    monkeypatch.setattr(single_flight, "_stats", {"leaders": 0, "shared": 0})
+
+
+def _run_concurrently(key, fn, callers):
+    """Start callers threads on key while fn is blocked, then release it"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(run_once(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_joiners(count):
+    while single_flight_stats()["shared"] < count:
+        threading.Event().wait(0.001)
+
+
+def test_concurrent_callers_share_one_call():
+    release = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        release.wait(5)
+        return {"lat": -41.3272, "lng": 174.8053}
+
+    threads, results, errors = _run_concurrently("geocode:wellington airport", lookup, 5)
+    _wait_for_joiners(4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert errors == []
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert single_flight_stats() == {"leaders": 1, "shared": 4, "in_flight": 0}
+
+
+def test_error_reaches_every_joiner():
+    release = threading.Event()
+
+    def lookup():
+        release.wait(5)
+        raise TimeoutError("maps timed out")
+
+    threads, results, errors = _run_concurrently("geocode:kent terrace", lookup, 3)
+    _wait_for_joiners(2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 3 and all(isinstance(e, TimeoutError) for e in errors)
+    assert single_flight_stats()["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_shared():
+    assert run_once("k", lambda: 1) == 1
+    assert run_once("k", lambda: 2) == 2
+    assert single_flight_stats() == {"leaders": 2, "shared": 0, "in_flight": 0}
@@ -0,0 +1,64 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import speech_tokenizer
+
+NOW = datetime(2026, 10, 17, 14, 5, tzinfo=ZoneInfo("Pacific/Auckland"))
+
+
+@pytest.mark.parametrize("text, date, time", [
+    ("right now", "17/10/2026", "ASAP"),
+    ("tomorrow at 5 pm", "18/10/2026", "17:00"),
+    ("tonight at 1030pm", "17/10/2026", "22:30"),
+    ("in 20 minutes", "17/10/2026", "14:25"),
+    ("in half an hour", "17/10/2026", "14:35"),
+    ("tomorrow at noon", "18/10/2026", "12:00"),
+    ("the day after tomorrow at 10am", "19/10/2026", "10:00"),
+    ("on the 3rd at 12 am", "03/11/2026", "00:00"),
+    ("I finish work 5 pm so at 5:30 pm please", "", "17:30"),
+])
+def test_booking_time(text, date, time):
+    assert speech_tokenizer.booking_time(text, NOW) == {"pickup_date": date, "pickup_time": time}
+
+
+@pytest.mark.parametrize("text, time", [
+    ("no, tomorrow at 5pm", "17:00"),
+    ("I don't know, maybe around 5 pm", "17:00"),
+    ("snowing here, 6 pm please", "18:00"),
+])
+def test_no_is_not_asap(text, time):
+    assert speech_tokenizer.booking_time(text, NOW)["pickup_time"] == time
+
+
+def test_nothing_said():
+    assert speech_tokenizer.booking_time("no", NOW) == {"pickup_date": "", "pickup_time": ""}
+
+
+def test_clock_to_24h():
+    assert speech_tokenizer.clock_to_24h("12", "p.m.") == "12:00"
+    assert speech_tokenizer.clock_to_24h("1030", "am") == "10:30"
+    assert speech_tokenizer.clock_to_24h("7:45", "pm") == "19:45"
+
+
+@pytest.mark.parametrize("text, spans", [
+    ("from 2 Kent Terrace to the airport tomorrow at 6 am",
+     {"pickup": "2 Kent Terrace", "destination": "the airport", "date": "tomorrow", "time": "at 6 am"}),
+    ("My name is Aroha and I need a taxi", {"name": "Aroha"}),
+    ("I want to book a taxi from 63 Hobart Street going to Wellington Hospital at noon thanks",
+     {"pickup": "63 Hobart Street", "destination": "Wellington Hospital", "time": "noon"}),
+    ("drop me off at Te Papa on the 25th", {"destination": "Te Papa", "date": "25th"}),
+    ("pick me up at 6:30", {"time": "6:30"}),
+    ("yes please", {}),
+])
+def test_slot_spans(text, spans):
+    found = speech_tokenizer.slot_spans(text)
+    assert {slot: span[2] for slot, span in found.items()} == spans
+    assert all(text[start:end] == said for start, end, said in found.values())
+
+
+def test_one_pass_serves_spans_and_time():
+    text = "from 2 Kent Terrace to the airport tomorrow at 6 am"
+    tokens = speech_tokenizer.tokenize(text)
+    assert speech_tokenizer.booking_time(text, NOW, tokens) == speech_tokenizer.booking_time(text, NOW)
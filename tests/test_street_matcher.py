@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+import gazetteer
+import street_matcher
+
+
+@pytest.fixture(autouse=True)
+def seed_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", str(tmp_path / "gazetteer.idx"))
+    monkeypatch.setattr(gazetteer, "_index", None)
+    monkeypatch.setattr(street_matcher, "_matchers", None)
+    monkeypatch.setattr(street_matcher, "_lock", threading.Lock())
+
+
+@pytest.mark.parametrize("text", ["40 Hall Street", "7 Mill Street"])
+def test_unlisted_street_is_not_rewritten(text):
+    correction = street_matcher.correct_address(text)
+    assert correction["text"] == text
+    assert not correction["exact"]
+    assert correction["confidence"] < street_matcher.STREET_MATCH_CONFIDENCE
+
+
+def test_single_edit_on_short_name_is_penalised():
+    assert street_matcher._score("hall street", "hill street") < 0.8
+    assert street_matcher._score("belrose road", "melrose road") >= 0.8
+
+
+def test_fuzzy_match_only_rewrites_against_a_complete_list(monkeypatch):
+    text = "12 belrose road melrose"
+    assert street_matcher.correct_address(text)["text"] == text
+
+    monkeypatch.setattr(gazetteer, "street_list_complete", lambda: True)
+    correction = street_matcher.correct_address(text)
+    assert correction["text"] == "12 Melrose Road, Melrose"
+    assert not correction["exact"]
+
+
+def test_listed_street_is_exact():
+    correction = street_matcher.correct_address("45 willis st")
+    assert correction["text"] == "45 Willis Street"
+    assert correction["exact"]
+
+
+def test_speech_alias_only_for_the_whole_utterance():
+    assert street_matcher.correct_address("63rd street melbourne")["text"] == "63 Hobart Street"
+    assert street_matcher.correct_address("12 melbourne street")["text"] == "12 melbourne street"
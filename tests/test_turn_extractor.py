@@ -0,0 +1,78 @@
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("requests")
+
+import turn_extractor
+from llm_client import LLMError
+from turn_extractor import NZ_ZONE, extract_booking_slots, mentioned_slots, validate_slots
+
+NOW = datetime(2026, 10, 14, 9, 30, tzinfo=NZ_ZONE)
+
+
+def test_mentioned_slots_from_cues():
+    assert mentioned_slots("from 2 Kent Terrace to the airport tomorrow at 6 am") == {"pickup", "destination", "time"}
+    assert mentioned_slots("my name is Aroha, pick me up from 2 Kent Terrace now") == {"name", "pickup", "time"}
+    assert mentioned_slots("I need to go to the hospital, I have a wheelchair") == {"destination", "driver_instructions"}
+    assert mentioned_slots("yes please") == set()
+
+
+def test_validate_cleans_and_normalises():
+    slots, errors = validate_slots({
+        "name": " aroha smith ", "pickup": "2 Kent Terrace", "destination": "null",
+        "pickup_time": "9:45", "intent": "provide_details",
+    }, NOW)
+    assert errors == []
+    assert slots == {
+        "name": "Aroha Smith", "pickup": "2 Kent Terrace",
+        "pickup_time": "09:45", "pickup_date": "14/10/2026", "intent": "provide_details",
+    }
+
+
+def test_validate_drops_bad_fields():
+    slots, errors = validate_slots({
+        "name": "Flat 3", "pickup_time": "quarter past", "pickup_date": "31/02/2026", "intent": "book",
+        "destination": 42,
+    }, NOW)
+    assert slots == {}
+    assert len(errors) == 5
+
+
+def test_asap_is_today():
+    assert validate_slots({"pickup_time": "asap", "pickup_date": "20/10/2026"}, NOW)[0] == {
+        "pickup_time": "ASAP", "pickup_date": "14/10/2026",
+    }
+
+
+def test_past_times_are_dropped():
+    slots, errors = validate_slots({"pickup_time": "08:00"}, NOW)
+    assert "pickup_time" not in slots and "pickup_date" not in slots
+    assert errors and "in the past" in errors[0]
+    assert validate_slots({"pickup_date": "13/10/2026"}, NOW)[0] == {}
+    assert validate_slots({"pickup_time": "08:00", "pickup_date": "15/10/2026"}, NOW)[0]["pickup_time"] == "08:00"
+
+
+def test_not_an_object():
+    assert validate_slots(["pickup"], NOW) == ({}, ["not a JSON object"])
+
+
+def test_extract_validates_the_reply(monkeypatch):
+    reply = {"pickup": "2 Kent Terrace", "destination": "Wellington Airport", "pickup_time": "18:00", "intent": "nope"}
+    monkeypatch.setattr(turn_extractor, "chat_completion", lambda *args, **kwargs: json.dumps(reply))
+    assert extract_booking_slots("from 2 Kent Terrace to the airport at 6 pm", "pickup", now=NOW) == {
+        "pickup": "2 Kent Terrace", "destination": "Wellington Airport",
+        "pickup_time": "18:00", "pickup_date": "14/10/2026",
+    }
+
+
+@pytest.mark.parametrize("failure", [LLMError("timed out"), "not json"])
+def test_extract_returns_none_when_unusable(monkeypatch, failure):
+    def reply(*args, **kwargs):
+        if isinstance(failure, Exception):
+            raise failure
+        return failure
+
+    monkeypatch.setattr(turn_extractor, "chat_completion", reply)
+    assert extract_booking_slots("from 2 Kent Terrace", "pickup", now=NOW) is None
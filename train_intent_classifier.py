@@ -0,0 +1,90 @@
+"""
+Train the local modification intent classifier.
+
+    python train_intent_classifier.py                 # seed examples only
+    DATABASE_URL=... python train_intent_classifier.py
+
+Uses data/intent_examples.csv plus the modification requests the LLM has
+labelled (conversations rows with role 'intent'), holds out a fifth of them
+to report accuracy, then retrains and writes INTENT_MODEL_PATH. A fixed fifth
+of the logged utterances (is_held_out) is never trained on, so
+eval_intent_classifier.py always has unseen data to score.
+"""
+
+import os
+import sys
+import json
+import zlib
+import random
+
+import intent_classifier
+
+
+def load_logged_examples(database_url=None, source="llm"):
+    """[(text, intent, new_value)] the LLM labelled, from the conversations table"""
+    database_url = database_url or os.environ.get("DATABASE_URL")
+    if not database_url:
+        return []
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+
+    import psycopg2
+
+    examples = []
+    conn = psycopg2.connect(database_url)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT message FROM conversations WHERE role = 'intent' ORDER BY id")
+        for (message,) in cur.fetchall():
+            try:
+                logged = json.loads(message)
+            except (TypeError, ValueError):
+                continue
+            if source and logged.get("source") != source:
+                continue
+            if logged.get("text") and logged.get("intent") in intent_classifier.INTENTS:
+                examples.append((logged["text"], logged["intent"], logged.get("new_value")))
+        cur.close()
+    finally:
+        conn.close()
+    return examples
+
+
+def is_held_out(text):
+    """True for the fifth of logged utterances kept out of training for evaluation"""
+    return zlib.crc32(intent_classifier.normalize(text).encode("utf-8")) % 5 == 0
+
+
+def accuracy(model, examples):
+    correct = 0
+    for text, intent, _ in examples:
+        probabilities = intent_classifier._predict(model, intent_classifier.features(text))
+        correct += max(probabilities, key=probabilities.get) == intent
+    return correct / len(examples) if examples else 0.0
+
+
+def main():
+    seed = intent_classifier.load_examples()
+    try:
+        logged = load_logged_examples()
+    except Exception as e:
+        print(f"⚠️ Logged utterances not loaded: {e}")
+        logged = []
+    held_out = [example for example in logged if is_held_out(example[0])]
+    logged = [example for example in logged if not is_held_out(example[0])]
+    examples = seed + logged
+    print(f"📚 {len(seed)} seed + {len(logged)} logged examples ({len(held_out)} more held out for evaluation)")
+
+    shuffled = list(examples)
+    random.Random(1).shuffle(shuffled)
+    holdout = shuffled[: len(shuffled) // 5]
+    model = intent_classifier.train(shuffled[len(shuffled) // 5:])
+    print(f"🔍 Held-out model accuracy: {accuracy(model, holdout):.1%} on {len(holdout)} examples")
+
+    model = intent_classifier.train(examples)
+    intent_classifier.save_model(model)
+    print(f"✅ Saved {len(model['weights'])} features to {intent_classifier.INTENT_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Multi-slot turn extraction for Kiwi Cabs AI IVR
+Callers often say several things at once ("it's Sam, from 63 Hobart Street to
+the airport at 5 tomorrow"). Instead of taking one slot per turn and
+re-prompting for the rest, one structured LLM call returns every booking slot
+it can find as JSON, and validate_slots() checks it against SLOT_SCHEMA
+before anything is used.
+
+mentioned_slots() is the cheap local check for whether a turn carries more
+than the slot being asked for, so single-slot turns never pay for the call.
+"""
+
+import re
+import json
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import speech_tokenizer
+from llm_client import chat_completion, LLMError, LLM_SMALL_MODEL
+
+NZ_ZONE = ZoneInfo("Pacific/Auckland")
+
+# The one slot speech_tokenizer has no span for
+_DRIVER_INSTRUCTIONS_RE = re.compile(
+    r"\b(?:text|call|ring) (?:me )?(?:on|when)|\bwait for me\b|\bwheelchair\b|\bluggage\b|\bchild seat\b|\bbooster\b"
+)
+
+# Which slot each booking step is asking for
+STEP_SLOTS = {
+    "name": "name",
+    "pickup": "pickup",
+    "destination": "destination",
+    "time": "time",
+    "driver_instructions": "driver_instructions",
+}
+
+INTENTS = [
+    "provide_details", "confirm", "deny",
+    "change_pickup", "change_destination", "change_time", "cancel", "no_change",
+]
+
+# field -> (kind, required format). Every field may also be null.
+SLOT_SCHEMA = {
+    "name": ("text", 60),
+    "pickup": ("text", 120),
+    "destination": ("text", 120),
+    "pickup_when": ("text", 60),
+    "pickup_date": ("date", r"\d{2}/\d{2}/\d{4}"),
+    "pickup_time": ("time", r"(?:[01]\d|2[0-3]):[0-5]\d|ASAP"),
+    "driver_instructions": ("text", 200),
+    "intent": ("enum", INTENTS),
+}
+
+_PROMPT = """You extract taxi booking details from one thing a caller said to a Wellington, New Zealand taxi phone line.
+
+It is now {now} ({weekday}) in Wellington.
+We just asked the caller for: {step}.
+Already known: {known}
+
+CALLER SAID: "{speech}"
+
+Respond ONLY with a JSON object with these keys, using null for anything the caller did not say:
+{{"name": caller's name,
+ "pickup": pickup address or place exactly as said (drop words like "from", "pick me up at"),
+ "destination": destination address or place exactly as said (drop words like "to", "going to"),
+ "pickup_when": the caller's own words for when (e.g. "tomorrow at 5 pm"),
+ "pickup_date": that date as DD/MM/YYYY,
+ "pickup_time": that time as 24-hour HH:MM, or "ASAP" for now / as soon as possible,
+ "driver_instructions": anything for the driver (e.g. "text on arrival"),
+ "intent": one of {intents}}}"""
+
+
+def mentioned_slots(text):
+    """Booking slots a turn appears to mention, from speech_tokenizer's slot spans"""
+    spans = speech_tokenizer.slot_spans(text)
+    slots = {slot for slot in ("name", "pickup", "destination") if slot in spans}
+    if "date" in spans or "time" in spans:
+        slots.add("time")
+    if _DRIVER_INSTRUCTIONS_RE.search((text or "").lower()):
+        slots.add("driver_instructions")
+    return slots
+
+
+def validate_slots(data, now=None):
+    """
+    Check an extraction against SLOT_SCHEMA.
+
+    Returns (slots, errors): slots holds only the fields that passed, with
+    empty values dropped and text stripped; errors says what was dropped and
+    why. A date/time in the past is dropped rather than trusted.
+    """
+    if not isinstance(data, dict):
+        return {}, ["not a JSON object"]
+
+    slots = {}
+    errors = []
+    for field, (kind, rule) in SLOT_SCHEMA.items():
+        value = data.get(field)
+        if value is None or (isinstance(value, str) and value.strip().lower() in ("", "null", "none", "unknown")):
+            continue
+        if not isinstance(value, str):
+            errors.append(f"{field}: expected a string")
+            continue
+        value = value.strip()
+
+        if kind == "text":
+            if len(value) > rule:
+                errors.append(f"{field}: longer than {rule} characters")
+                continue
+            if field == "name" and any(char.isdigit() for char in value):
+                errors.append("name: contains digits")
+                continue
+            if field == "name":
+                value = " ".join(word.capitalize() for word in value.split())
+        elif kind == "enum":
+            if value not in rule:
+                errors.append(f"{field}: '{value}' is not one of {rule}")
+                continue
+        elif kind == "time":
+            value = value.upper() if value.lower() == "asap" else value
+            if len(value) == 4 and value[1] == ":":
+                value = "0" + value
+            if not re.fullmatch(rule, value):
+                errors.append(f"{field}: '{value}' is not HH:MM or ASAP")
+                continue
+        elif kind == "date":
+            if not re.fullmatch(rule, value):
+                errors.append(f"{field}: '{value}' is not DD/MM/YYYY")
+                continue
+            try:
+                datetime.strptime(value, "%d/%m/%Y")
+            except ValueError:
+                errors.append(f"{field}: '{value}' is not a real date")
+                continue
+        slots[field] = value
+
+    now = now or datetime.now(NZ_ZONE)
+    if slots.get("pickup_time") == "ASAP":
+        slots["pickup_date"] = now.strftime("%d/%m/%Y")
+    elif slots.get("pickup_time"):
+        slots.setdefault("pickup_date", now.strftime("%d/%m/%Y"))
+        when = datetime.strptime(f"{slots['pickup_date']} {slots['pickup_time']}", "%d/%m/%Y %H:%M")
+        # A minute or two of slack for "in 5 minutes" worked out from a stale clock
+        if when.replace(tzinfo=NZ_ZONE) < now - timedelta(minutes=2):
+            errors.append(f"pickup_time: {slots['pickup_date']} {slots['pickup_time']} is in the past")
+            del slots["pickup_time"], slots["pickup_date"]
+    elif slots.get("pickup_date"):
+        if datetime.strptime(slots["pickup_date"], "%d/%m/%Y").date() < now.date():
+            errors.append(f"pickup_date: {slots['pickup_date']} is in the past")
+            del slots["pickup_date"]
+
+    return slots, errors
+
+
+def extract_booking_slots(speech, step, known=None, now=None):
+    """
+    One structured LLM extraction of every booking slot in a turn.
+
+    Returns the validated slots (see validate_slots), or None when the LLM
+    is unavailable or its reply isn't usable JSON.
+    """
+    now = now or datetime.now(NZ_ZONE)
+    known = {key: value for key, value in (known or {}).items() if value}
+    prompt = _PROMPT.format(
+        now=now.strftime("%d/%m/%Y %H:%M"),
+        weekday=now.strftime("%A"),
+        step=STEP_SLOTS.get(step, step),
+        known=json.dumps(known) if known else "nothing yet",
+        speech=speech.replace('"', "'"),
+        intents=", ".join(INTENTS),
+    )
+    try:
+        reply = chat_completion(
+            [{"role": "user", "content": prompt}],
+            model=LLM_SMALL_MODEL,
+            purpose="turn_extraction",
+            response_format={"type": "json_object"},
+            max_tokens=200,
+            temperature=0,
+        )
+        data = json.loads(reply)
+    except (LLMError, ValueError) as e:
+        print(f"⚠️ Turn extraction failed: {e}")
+        return None
+
+    slots, errors = validate_slots(data, now)
+    if errors:
+        print(f"⚠️ Turn extraction fields dropped: {errors}")
+    print(f"🧩 Turn extraction: '{speech}' → {slots}")
+    return slots